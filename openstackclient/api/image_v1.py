@@ -13,9 +13,15 @@
 
 """Image v1 API Library"""
 
+import logging
+import time
+
 from openstackclient.api import api
 
 
+LOG = logging.getLogger(__name__)
+
+
 class APIv1(api.BaseAPI):
     """Image v1 API"""
 
@@ -32,6 +38,99 @@ class APIv1(api.BaseAPI):
         if not self.endpoint.endswith(self._endpoint_suffix):
             self.endpoint = self.endpoint + self._endpoint_suffix
 
+    def _next_page(self, body, page, params):
+        """Return the query parameters of the page following ``page``
+
+        The v1 API does not return pagination links, the next page is
+        requested with the ID of the last image as marker until a page is
+        empty. A page shorter than the requested page size does not mean
+        it is the last one, as the server may cap the page size.
+
+        :returns: a dict of parameters, or None after the last page
+        """
+        if not page:
+            return None
+        params = dict(params)
+        params['marker'] = page[-1]['id']
+        return params
+
+    def _paginate(self, url, limit=None, page_size=None, **params):
+        """Iterate over the images of a listing, fetching pages lazily
+
+        Every page is a separate request through the session, so its timing
+        is reported individually with ``--timing``.
+
+        :param string url:
+            The API-specific portion of the URL path
+        :param integer limit:
+            Stop after this many images, without requesting further pages
+        :param integer page_size:
+            Number of images requested per page, the server default if None
+        """
+        remaining = limit
+        while params is not None:
+            if page_size or remaining is not None:
+                params['limit'] = min(
+                    n for n in (page_size, remaining) if n is not None)
+            start = time.time()
+            body = self.list(url, **params)
+            page = body['images']
+            LOG.debug('Fetched page of %d images from %s in %.3fs',
+                      len(page), url, time.time() - start)
+            if remaining is not None:
+                page = page[:remaining]
+                remaining -= len(page)
+            for image in page:
+                yield image
+            if remaining == 0:
+                break
+            params = self._next_page(body, page, params)
+
+    def image_iter(
+        self,
+        detailed=False,
+        public=False,
+        private=False,
+        limit=None,
+        page_size=None,
+        **filter
+    ):
+        """Iterate over available images, following pagination
+
+        Pages are only requested while the returned iterator is consumed.
+        See image_list() for the meaning of the filter arguments.
+
+        :param integer limit:
+            Return at most this many images
+        :param integer page_size:
+            Number of images to request per page
+        """
+
+        url = "/images"
+        if detailed or public or private:
+            # Because we can't all use /details
+            url += "/detail"
+        if limit is not None:
+            limit = int(limit)
+
+        image_iter = self._paginate(
+            url, limit=None if public != private else limit,
+            page_size=page_size, **filter)
+
+        if public != private:
+            # One is True and one is False, so public represents the filter
+            # state in either case
+            count = 0
+            for image in image_iter:
+                if image['is_public'] == public:
+                    if limit is not None and count >= limit:
+                        break
+                    count += 1
+                    yield image
+        else:
+            for image in image_iter:
+                yield image
+
     def image_list(
         self,
         detailed=False,
@@ -53,21 +152,16 @@ class APIv1(api.BaseAPI):
         images are returned.  Both arguments True is a filter that includes
         both public and private images which is the same set as all images.
 
+        All pages are fetched, use ``limit`` to cap the number of images.
+
         http://docs.openstack.org/api/openstack-image-service/1.1/content/requesting-a-list-of-public-vm-images.html
         http://docs.openstack.org/api/openstack-image-service/1.1/content/requesting-detailed-metadata-on-public-vm-images.html
         http://docs.openstack.org/api/openstack-image-service/1.1/content/filtering-images-returned-via-get-images-and-get-imagesdetail.html
         """
 
-        url = "/images"
-        if detailed or public or private:
-            # Because we can't all use /details
-            url += "/detail"
-
-        image_list = self.list(url, **filter)['images']
-
-        if public != private:
-            # One is True and one is False, so public represents the filter
-            # state in either case
-            image_list = [i for i in image_list if i['is_public'] == public]
-
-        return image_list
+        return list(self.image_iter(
+            detailed=detailed,
+            public=public,
+            private=private,
+            **filter
+        ))
@@ -13,6 +13,8 @@
 
 """Image v2 API Library"""
 
+import urllib
+
 from openstackclient.api import image_v1
 
 
@@ -26,6 +28,61 @@ class APIv2(image_v1.APIv1):
         if not self.endpoint.endswith(self._endpoint_suffix):
             self.endpoint = self.endpoint + self._endpoint_suffix
 
+    def _next_page(self, body, page, params):
+        """Return the query parameters of the page following ``page``
+
+        The v2 API returns a ``next`` link as long as there are more images.
+        """
+        next_link = body.get('next')
+        if not next_link or not page:
+            return None
+        return dict(urllib.parse.parse_qsl(
+            urllib.parse.urlsplit(next_link).query))
+
+    def image_iter(
+        self,
+        detailed=False,
+        public=False,
+        private=False,
+        community=False,
+        shared=False,
+        limit=None,
+        page_size=None,
+        **filter
+    ):
+        """Iterate over available images, following pagination
+
+        Pages are only requested while the returned iterator is consumed.
+        See image_list() for the meaning of the filter arguments.
+
+        :param integer limit:
+            Return at most this many images
+        :param integer page_size:
+            Number of images to request per page
+        """
+
+        if not public and not private and not community and not shared:
+            # No filtering for all False
+            filter.pop('visibility', None)
+        elif public:
+            filter['visibility'] = 'public'
+        elif private:
+            filter['visibility'] = 'private'
+        elif community:
+            filter['visibility'] = 'community'
+        elif shared:
+            filter['visibility'] = 'shared'
+
+        url = "/images"
+        if detailed:
+            # Because we can't all use /details
+            url += "/detail"
+        if limit is not None:
+            limit = int(limit)
+
+        return self._paginate(
+            url, limit=limit, page_size=page_size, **filter)
+
     def image_list(
         self,
         detailed=False,
@@ -37,8 +94,6 @@ class APIv2(image_v1.APIv1):
     ):
         """Get available images
 
-        can add limit/marker
-
         :param detailed:
             For v1 compatibility only, ignored as v2 is always 'detailed'
         :param public:
@@ -56,24 +111,16 @@ class APIv2(image_v1.APIv1):
         that includes all public, private, community and shared images which
         is the same set as all images.
 
+        All pages are fetched, use ``limit`` to cap the number of images.
+
         http://docs.openstack.org/api/openstack-image-service/2.0/content/list-images.html
         """
 
-        if not public and not private and not community and not shared:
-            # No filtering for all False
-            filter.pop('visibility', None)
-        elif public:
-            filter['visibility'] = 'public'
-        elif private:
-            filter['visibility'] = 'private'
-        elif community:
-            filter['visibility'] = 'community'
-        elif shared:
-            filter['visibility'] = 'shared'
-
-        url = "/images"
-        if detailed:
-            # Because we can't all use /details
-            url += "/detail"
-
-        return self.list(url, **filter)['images']
+        return list(self.image_iter(
+            detailed=detailed,
+            public=public,
+            private=private,
+            community=community,
+            shared=shared,
+            **filter
+        ))
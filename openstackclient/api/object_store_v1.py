@@ -13,7 +13,6 @@
 
 """Object Store v1 API Library"""
 
-import io
 import logging
 import os
 import sys
@@ -22,6 +21,7 @@ import urllib
 from osc_lib import utils
 
 from openstackclient.api import api
+from openstackclient.common import upload
 
 
 GLOBAL_READ_ACL = ".r:*"
@@ -261,7 +261,7 @@ class APIv1(api.BaseAPI):
 
         full_url = "%s/%s" % (urllib.parse.quote(container),
                               urllib.parse.quote(object_name_str))
-        with io.open(object, 'rb') as f:
+        with upload.open_file(object) as f:
             response = self.create(
                 full_url,
                 method='PUT',
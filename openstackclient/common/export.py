@@ -0,0 +1,84 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Write report rows directly to a file"""
+
+import csv
+import json
+
+from cliff import columns as cliff_columns
+from osc_lib import exceptions
+
+from openstackclient.i18n import _
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+
+def add_export_options(parser):
+    """Add the options writing the rows of a listing to a file"""
+    parser.add_argument(
+        '--output-file',
+        metavar='<file>',
+        help=_("Write the rows to this file as they are produced instead of "
+               "displaying them"),
+    )
+    parser.add_argument(
+        '--output-format',
+        metavar='<format>',
+        choices=EXPORT_FORMATS,
+        default=EXPORT_FORMATS[0],
+        help=_("Format of --output-file, one of %(formats)s "
+               "(default: %(default)s)") % {
+            'formats': ', '.join(EXPORT_FORMATS),
+            'default': EXPORT_FORMATS[0],
+        },
+    )
+
+
+def _machine_readable(value):
+    if isinstance(value, cliff_columns.FormattableColumn):
+        return value.machine_readable()
+    return value
+
+
+def write_rows(path, output_format, column_headers, rows):
+    """Write rows to a file, one at a time
+
+    :param path: the file to write
+    :param output_format: ``csv`` for a header line followed by comma
+        separated values, ``ndjson`` for a JSON object per line
+    :param column_headers: the names of the columns
+    :param rows: an iterable of rows, consumed lazily
+    :returns: the number of rows written
+    """
+    count = 0
+    try:
+        with open(path, 'w', newline='') as f:
+            if output_format == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(column_headers)
+                for row in rows:
+                    writer.writerow([_machine_readable(v) for v in row])
+                    count += 1
+            else:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(
+                        column_headers,
+                        (_machine_readable(v) for v in row),
+                    ))) + '\n')
+                    count += 1
+    except IOError as e:
+        raise exceptions.CommandError(
+            _("Unable to write %(path)s: %(e)s") % {'path': path, 'e': e})
+    return count
@@ -0,0 +1,123 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Helpers to issue independent API calls concurrently"""
+
+from concurrent import futures
+import threading
+import time
+
+from openstackclient.i18n import _
+
+
+DEFAULT_CONCURRENCY = 8
+
+
+def add_concurrency_option(parser, default=DEFAULT_CONCURRENCY):
+    parser.add_argument(
+        '--concurrency',
+        metavar='<count>',
+        type=int,
+        default=default,
+        help=_("Maximum number of API requests issued in parallel "
+               "(default: %s)") % default,
+    )
+
+
+def add_rate_limit_option(parser):
+    parser.add_argument(
+        '--rate-limit',
+        metavar='<calls-per-second>',
+        type=float,
+        default=None,
+        help=_("Maximum number of calls started per second "
+               "(default: no limit)"),
+    )
+
+
+class RateLimiter(object):
+    """Space out calls made from any number of threads
+
+    :param rate: the maximum number of calls per second
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def wait(self):
+        """Block until the next call is allowed"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def run(
+    func, items, concurrency=DEFAULT_CONCURRENCY, ordered=False, rate=None,
+):
+    """Call a function for every item using a bounded pool of threads
+
+    :param func: a function taking a single item as argument
+    :param items: an iterable of items to process
+    :param concurrency: the maximum number of calls running at once
+    :param ordered: yield results in the order of ``items`` instead of the
+        order in which the calls complete
+    :param rate: the maximum number of calls started per second, None
+        for no limit
+    :returns: a generator of ``(item, result, exception)`` tuples, where
+        ``exception`` is None if the call succeeded
+    """
+    items = list(items)
+    if not items:
+        return
+    if rate:
+        limiter = RateLimiter(rate)
+        call = func
+
+        def func(item):
+            limiter.wait()
+            return call(item)
+
+    concurrency = max(1, min(concurrency or 1, len(items)))
+
+    if concurrency == 1:
+        # No point in spinning up a thread for serial work
+        for item in items:
+            try:
+                yield item, func(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {executor.submit(func, item): item for item in items}
+        if ordered:
+            done = (f for f in list(pending))
+        else:
+            done = futures.as_completed(pending)
+        try:
+            for future in done:
+                exc = future.exception()
+                yield (
+                    pending[future],
+                    None if exc else future.result(),
+                    exc,
+                )
+        finally:
+            # Do not start calls nobody is going to look at anymore
+            for future in pending:
+                future.cancel()
@@ -15,6 +15,8 @@
 
 import sys
 
+from openstackclient.common import upload
+
 
 class _ProgressBarBase(object):
     """A progress bar provider for a wrapped obect.
@@ -43,6 +45,13 @@ class _ProgressBarBase(object):
             ))
             sys.stdout.flush()
 
+    def __len__(self):
+        return upload.get_length(self._wrapped)
+
+    def __bool__(self):
+        # Even when the length is not known
+        return True
+
     def __getattr__(self, attr):
         # Forward other attribute access to the wrapped object.
         return getattr(self._wrapped, attr)
@@ -13,17 +13,123 @@
 #   under the License.
 #
 
+import functools
+import json
 import logging
+import threading
 
+from cinderclient import exceptions as cinder_exceptions
+from novaclient import exceptions as nova_exceptions
 from osc_lib.command import command
+from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 from openstackclient.identity import common as identity_common
 
 
 LOG = logging.getLogger(__name__)
 
+# Maximum time to wait for the resources of a layer to be deleted
+DEFAULT_WAIT_TIMEOUT = 600
+
+# Owners of the ports connecting a router to a subnet
+ROUTER_INTERFACE_OWNERS = (
+    'network:router_interface',
+    'network:router_interface_distributed',
+    'network:ha_router_replicated_interface',
+)
+
+
+class ResourceType(object):
+    """A type of resource to purge
+
+    :param name: the name of the resource type, used in messages
+    :param service: the service owning the resources, whose API calls are
+        rate limited together
+    :param list_func: a function returning the resources of the project
+    :param delete_func: a function deleting one of these resources
+    :param get: a function getting a resource by ID to wait for it to be
+        deleted, None if resources are gone as soon as they are deleted
+    :param not_found: the exception class(es) raised by ``get`` for a
+        resource which does not exist anymore
+    :param success_status: statuses of resources which are deleted
+    :param error_status: statuses of resources which failed to be deleted
+    :param after: the names of the resource types to delete first
+    """
+
+    def __init__(
+        self, name, service, list_func, delete_func, get=None, not_found=(),
+        success_status=(), error_status=(), after=(),
+    ):
+        self.name = name
+        self.service = service
+        self.list_func = list_func
+        self.delete_func = delete_func
+        self.get = get
+        self.not_found = not_found
+        self.success_status = success_status
+        self.error_status = error_status
+        self.after = after
+
+
+class Throttle(object):
+    """Bound the API calls made by concurrent purges
+
+    :param concurrency: the maximum number of calls running at once, for
+        all services together
+    :param rate: the maximum number of calls started per second and per
+        service, None for no limit
+    """
+
+    def __init__(self, concurrency=parallel.DEFAULT_CONCURRENCY, rate=None):
+        self._slots = threading.BoundedSemaphore(max(1, concurrency or 1))
+        self._rate = rate
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _get_limiter(self, service):
+        with self._lock:
+            if service not in self._limiters:
+                self._limiters[service] = parallel.RateLimiter(self._rate)
+            return self._limiters[service]
+
+    def call(self, service, func, *args, **kwargs):
+        """Call a function once the limits of the service allow it"""
+        if self._rate:
+            self._get_limiter(service).wait()
+        with self._slots:
+            return func(*args, **kwargs)
+
+    def wrap(self, service, func):
+        """Return a version of a function calling it through the throttle"""
+        return functools.partial(self.call, service, func)
+
+
+def get_layers(resource_types):
+    """Sort resource types into layers which can be deleted in turn
+
+    Every resource type is placed in the first layer following all the
+    layers of the types it must be deleted after. Dependencies on types
+    which are not given are ignored.
+
+    :param resource_types: a list of :class:`ResourceType`
+    :returns: a list of lists of resource types
+    """
+    remaining = list(resource_types)
+    layers = []
+    while remaining:
+        names = set(t.name for t in remaining)
+        layer = [t for t in remaining if not names.intersection(t.after)]
+        if not layer:
+            raise ValueError(
+                'Circular dependency between %s' % ', '.join(sorted(names)))
+        layers.append(layer)
+        remaining = [t for t in remaining if t not in layer]
+    return layers
+
 
 class ProjectPurge(command.Command):
     _description = _("Clean resources associated with a project")
@@ -49,114 +155,492 @@ class ProjectPurge(command.Command):
         project_group.add_argument(
             '--project',
             metavar='<project>',
-            help=_('Project to clean (name or ID)'),
+            action='append',
+            help=_('Project to clean (name or ID) '
+                   '(repeat option to clean multiple projects)'),
+        )
+        project_group.add_argument(
+            '--projects-from',
+            metavar='<file>',
+            help=_('Clean the projects listed in this file (name or ID), '
+                   'one per line'),
+        )
+        project_group.add_argument(
+            '--domain',
+            metavar='<domain>',
+            help=_('Clean all the projects of this domain (name or ID)'),
         )
         identity_common.add_project_domain_option_to_parser(parser)
+        parser.add_argument(
+            '--report',
+            metavar='<file>',
+            help=_('Write a JSON report of the resources deleted and of the '
+                   'failures to this file'),
+        )
+        waiter.add_wait_options(parser, timeout=DEFAULT_WAIT_TIMEOUT)
+        parallel.add_concurrency_option(parser)
+        parallel.add_rate_limit_option(parser)
         return parser
 
-    def take_action(self, parsed_args):
+    def find_project(self, project, domain=None):
+        identity_client = self.app.client_manager.identity
+        try:
+            return identity_common.find_project(
+                identity_client,
+                project,
+                domain,
+            ).id
+        except AttributeError:  # using v2 auth and supplying a domain
+            return utils.find_resource(
+                identity_client.tenants,
+                project,
+            ).id
+
+    def get_project_ids(self, parsed_args):
+        """Return the IDs of the projects to clean"""
         identity_client = self.app.client_manager.identity
 
         if parsed_args.auth_project:
-            project_id = self.app.client_manager.auth_ref.project_id
-        elif parsed_args.project:
+            return [self.app.client_manager.auth_ref.project_id]
+        if parsed_args.domain:
+            domain = identity_common.find_domain(
+                identity_client, parsed_args.domain)
+            return [p.id for p in identity_client.projects.list(
+                domain=domain.id)]
+
+        if parsed_args.projects_from:
+            try:
+                with open(parsed_args.projects_from) as f:
+                    projects = [
+                        line.strip() for line in f
+                        if line.strip() and not line.startswith('#')
+                    ]
+            except IOError as e:
+                msg = _("Unable to read %(file)s: %(e)s") % {
+                    'file': parsed_args.projects_from, 'e': e}
+                raise exceptions.CommandError(msg)
+        else:
+            projects = parsed_args.project
+
+        # Do not clean anything unless all the projects are known
+        project_ids = []
+        failures = 0
+        for project, project_id, e in parallel.run(
+            lambda p: self.find_project(p, parsed_args.project_domain),
+            projects,
+            concurrency=parsed_args.concurrency, ordered=True,
+        ):
+            if e:
+                failures += 1
+                LOG.error(_("Failed to find project with name or "
+                            "ID '%(project)s': %(e)s"),
+                          {'project': project, 'e': e})
+            elif project_id not in project_ids:
+                project_ids.append(project_id)
+        if failures:
+            msg = _("%(failures)s of %(total)s projects could not be "
+                    "found") % {'failures': failures, 'total': len(projects)}
+            raise exceptions.CommandError(msg)
+        return project_ids
+
+    def take_action(self, parsed_args):
+        identity_client = self.app.client_manager.identity
+        project_ids = self.get_project_ids(parsed_args)
+        throttle = Throttle(parsed_args.concurrency, parsed_args.rate_limit)
+
+        def _purge(project_id):
+            # delete all non-identity resources
+            result = {
+                'id': project_id,
+                'resources': self.delete_resources(
+                    parsed_args.dry_run, project_id,
+                    concurrency=parsed_args.concurrency,
+                    throttle=throttle,
+                    **waiter.get_wait_kwargs(parsed_args)
+                ),
+                'deleted': False,
+            }
+
+            # keep the project while any of its resources are left behind
+            failed = sum(
+                len(r['failed']) for r in result['resources'].values())
+            unlisted = [
+                name for name, r in result['resources'].items()
+                if 'error' in r]
+            errors = []
+            if failed:
+                errors.append(_("%s resources failed to be deleted") % failed)
+            if unlisted:
+                errors.append(_("unable to list %s") % ', '.join(
+                    name + 's' for name in unlisted))
+            if errors:
+                result['error'] = '; '.join(errors)
+                if not parsed_args.keep_project:
+                    LOG.error(_('Not deleting project %(project)s: '
+                                '%(error)s'),
+                              {'project': project_id,
+                               'error': result['error']})
+                return result
+
+            # clean up the project
+            if not parsed_args.keep_project:
+                LOG.warning(_('Deleting project: %s'), project_id)
+                if not parsed_args.dry_run:
+                    try:
+                        throttle.call(
+                            'identity', identity_client.projects.delete,
+                            project_id)
+                    except Exception as e:
+                        result['error'] = str(e)
+                        LOG.error(_('Failed to delete project %(project)s: '
+                                    '%(e)s'),
+                                  {'project': project_id, 'e': e})
+                    else:
+                        result['deleted'] = True
+            return result
+
+        report = {'dry_run': parsed_args.dry_run, 'projects': []}
+        failures = 0
+        for project_id, result, e in parallel.run(
+            _purge, project_ids, concurrency=parsed_args.concurrency,
+        ):
+            if e:
+                failures += 1
+                LOG.error(_("Failed to purge project %(project)s: %(e)s"),
+                          {'project': project_id, 'e': e})
+                result = {'id': project_id, 'error': str(e)}
+            elif result.get('error'):
+                failures += 1
+            report['projects'].append(result)
+
+        if parsed_args.report:
             try:
-                project_id = identity_common.find_project(
-                    identity_client,
-                    parsed_args.project,
-                    parsed_args.project_domain,
-                ).id
-            except AttributeError:  # using v2 auth and supplying a domain
-                project_id = utils.find_resource(
-                    identity_client.tenants,
-                    parsed_args.project,
-                ).id
-
-        # delete all non-identity resources
-        self.delete_resources(parsed_args.dry_run, project_id)
-
-        # clean up the project
-        if not parsed_args.keep_project:
-            LOG.warning(_('Deleting project: %s'), project_id)
-            if not parsed_args.dry_run:
-                identity_client.projects.delete(project_id)
-
-    def delete_resources(self, dry_run, project_id):
-        # servers
+                with open(parsed_args.report, 'w') as f:
+                    json.dump(report, f, indent=2, sort_keys=True)
+            except IOError as e:
+                msg = _("Unable to write %(file)s: %(e)s") % {
+                    'file': parsed_args.report, 'e': e}
+                raise exceptions.CommandError(msg)
+
+        if failures:
+            msg = _("%(failures)s of %(total)s projects failed to be "
+                    "purged") % {'failures': failures,
+                                 'total': len(project_ids)}
+            raise exceptions.CommandError(msg)
+
+    def get_resource_types(self, project_id):
+        """Return the types of resources to purge and their dependencies"""
+        client_manager = self.app.client_manager
+        resource_types = []
+
+        # compute
         try:
-            compute_client = self.app.client_manager.compute
-            search_opts = {'tenant_id': project_id, 'all_tenants': True}
-            data = compute_client.servers.list(search_opts=search_opts)
-            self.delete_objects(
-                compute_client.servers.delete, data, 'server', dry_run)
-        except Exception:
-            pass
+            compute_client = client_manager.compute
+            server_search_opts = {
+                'tenant_id': project_id,
+                'all_tenants': True,
+            }
+            resource_types.append(ResourceType(
+                'server', 'compute',
+                lambda: compute_client.servers.list(
+                    search_opts=server_search_opts),
+                lambda i: compute_client.servers.delete(i.id),
+                get=compute_client.servers.get,
+                not_found=nova_exceptions.NotFound,
+                success_status=('deleted', 'soft_deleted'),
+            ))
+        except Exception as e:
+            LOG.debug('Skipping compute resources: %s', e)
 
-        # images
+        # image
         try:
-            image_client = self.app.client_manager.image
+            image_client = client_manager.image
             api_version = int(image_client.version)
             if api_version == 1:
-                data = image_client.images.list(owner=project_id)
+                image_kwargs = {'owner': project_id}
             elif api_version == 2:
-                kwargs = {'filters': {'owner': project_id}}
-                data = image_client.images.list(**kwargs)
+                image_kwargs = {'filters': {'owner': project_id}}
             else:
                 raise NotImplementedError
-            self.delete_objects(
-                image_client.images.delete, data, 'image', dry_run)
-        except Exception:
-            pass
+            resource_types.append(ResourceType(
+                'image', 'image',
+                lambda: image_client.images.list(**image_kwargs),
+                lambda i: image_client.images.delete(i.id),
+            ))
+        except Exception as e:
+            LOG.debug('Skipping image resources: %s', e)
 
-        # volumes, snapshots, backups
-        volume_client = self.app.client_manager.volume
-        search_opts = {'project_id': project_id, 'all_tenants': True}
-        try:
-            data = volume_client.volume_snapshots.list(search_opts=search_opts)
-            self.delete_objects(
-                self.delete_one_volume_snapshot,
-                data,
-                'volume snapshot',
-                dry_run)
-        except Exception:
-            pass
+        # volume
         try:
-            data = volume_client.backups.list(search_opts=search_opts)
-            self.delete_objects(
-                self.delete_one_volume_backup,
-                data,
-                'volume backup',
-                dry_run)
-        except Exception:
-            pass
+            volume_client = client_manager.volume
+            volume_search_opts = {
+                'project_id': project_id,
+                'all_tenants': True,
+            }
+            resource_types.extend([
+                ResourceType(
+                    'volume snapshot', 'volume',
+                    lambda: volume_client.volume_snapshots.list(
+                        search_opts=volume_search_opts),
+                    lambda i: self.delete_one_volume_snapshot(i.id),
+                    get=volume_client.volume_snapshots.get,
+                    not_found=cinder_exceptions.NotFound,
+                    error_status=('error_deleting',),
+                ),
+                ResourceType(
+                    'volume backup', 'volume',
+                    lambda: volume_client.backups.list(
+                        search_opts=volume_search_opts),
+                    lambda i: self.delete_one_volume_backup(i.id),
+                    get=volume_client.backups.get,
+                    not_found=cinder_exceptions.NotFound,
+                    error_status=('error_deleting',),
+                ),
+                ResourceType(
+                    'volume', 'volume',
+                    lambda: volume_client.volumes.list(
+                        search_opts=volume_search_opts),
+                    lambda i: volume_client.volumes.force_delete(i.id),
+                    get=volume_client.volumes.get,
+                    not_found=cinder_exceptions.NotFound,
+                    error_status=('error_deleting',),
+                    # Volumes must be detached and free of dependents
+                    after=('server', 'volume snapshot', 'volume backup'),
+                ),
+            ])
+        except Exception as e:
+            LOG.debug('Skipping volume resources: %s', e)
+
+        # network
         try:
-            data = volume_client.volumes.list(search_opts=search_opts)
-            self.delete_objects(
-                volume_client.volumes.force_delete, data, 'volume', dry_run)
-        except Exception:
-            pass
-
-    def delete_objects(self, func_delete, data, resource, dry_run):
-        result = 0
-        for i in data:
-            LOG.warning(_('Deleting %(resource)s : %(id)s') %
-                        {'resource': resource, 'id': i.id})
-            if not dry_run:
-                try:
-                    func_delete(i.id)
-                except Exception as e:
-                    result += 1
-                    LOG.error(_("Failed to delete %(resource)s with "
-                                "ID '%(id)s': %(e)s")
-                              % {'resource': resource, 'id': i.id, 'e': e})
-        if result > 0:
-            total = len(data)
-            msg = (_("%(result)s of %(total)s %(resource)ss failed "
-                   "to delete.") %
-                   {'result': result,
-                    'total': total,
-                    'resource': resource})
-            LOG.error(msg)
+            if not client_manager.is_network_endpoint_enabled():
+                raise NotImplementedError
+            network_client = client_manager.network
+
+            def _list_ports(router_interfaces):
+                return [
+                    p for p in network_client.ports(project_id=project_id)
+                    if (p.device_owner in ROUTER_INTERFACE_OWNERS) ==
+                    router_interfaces and (
+                        router_interfaces or
+                        # DHCP and gateway ports go with their networks
+                        # and routers
+                        not (p.device_owner or '').startswith('network:'))
+                ]
+
+            resource_types.extend([
+                ResourceType(
+                    'floating IP', 'network',
+                    lambda: network_client.ips(project_id=project_id),
+                    lambda i: network_client.delete_ip(i.id),
+                    after=('server',),
+                ),
+                ResourceType(
+                    'port', 'network',
+                    lambda: _list_ports(False),
+                    lambda i: network_client.delete_port(i.id),
+                    after=('server', 'floating IP'),
+                ),
+                ResourceType(
+                    'router interface', 'network',
+                    lambda: _list_ports(True),
+                    lambda i: network_client.remove_interface_from_router(
+                        i.device_id, port_id=i.id),
+                    after=('port', 'floating IP'),
+                ),
+                ResourceType(
+                    'router', 'network',
+                    lambda: network_client.routers(project_id=project_id),
+                    lambda i: network_client.delete_router(i.id),
+                    after=('router interface',),
+                ),
+                ResourceType(
+                    'subnet', 'network',
+                    lambda: network_client.subnets(project_id=project_id),
+                    lambda i: network_client.delete_subnet(i.id),
+                    after=('port', 'router interface'),
+                ),
+                ResourceType(
+                    'network', 'network',
+                    lambda: network_client.networks(project_id=project_id),
+                    lambda i: network_client.delete_network(i.id),
+                    after=('subnet',),
+                ),
+                ResourceType(
+                    'security group', 'network',
+                    # the default group is removed with the project
+                    lambda: [
+                        sg for sg in network_client.security_groups(
+                            project_id=project_id)
+                        if sg.name != 'default'],
+                    lambda i: network_client.delete_security_group(i.id),
+                    after=('server', 'port'),
+                ),
+            ])
+        except Exception as e:
+            LOG.debug('Skipping network resources: %s', e)
+
+        return resource_types
+
+    def delete_resources(
+        self, dry_run, project_id,
+        concurrency=parallel.DEFAULT_CONCURRENCY, throttle=None,
+        **wait_kwargs
+    ):
+        """Delete the resources of a project, layer by layer
+
+        The resources of all the types of a layer are deleted concurrently,
+        then waited for until they are gone before the next layer, whose
+        resources depend on them, is listed. A line summing up every type
+        of resource found is written as soon as it is done with.
+
+        :param throttle: a :class:`Throttle` shared by the purges running
+            at the same time
+        :param wait_kwargs: arguments for the waiters, such as the ones of
+            :func:`openstackclient.common.waiter.get_wait_kwargs`
+        :returns: a dict mapping the names of the types of resource found
+            to the IDs of the resources ``listed``, ``deleted`` and
+            ``failed``, the latter mapped to the reason of the failure,
+            and to the ``error`` raised by the listing if it failed
+        """
+        if throttle is None:
+            throttle = Throttle(concurrency)
+        results = {}
+        for layer in get_layers(self.get_resource_types(project_id)):
+            for name, result in self.delete_layer(
+                layer, dry_run, concurrency, throttle, wait_kwargs,
+            ):
+                results[name] = result
+                if 'error' in result:
+                    line = _('%(project)s: unable to list %(resource)ss\n')
+                elif dry_run:
+                    line = _('%(project)s: %(total)s %(resource)ss\n')
+                else:
+                    line = _('%(project)s: %(deleted)s of %(total)s '
+                             '%(resource)ss deleted\n')
+                self.app.stdout.write(line % {
+                    'project': project_id,
+                    'resource': name,
+                    'total': len(result['listed']),
+                    'deleted': len(result['deleted']),
+                })
+        return results
+
+    def delete_layer(
+        self, resource_types, dry_run, concurrency, throttle, wait_kwargs,
+    ):
+        """Delete the resources of a layer
+
+        :returns: a generator of the name and result of every type of
+            resource found, as described in :meth:`delete_resources`
+        """
+        results = {}
+        listed = []
+        for resource_type, data, e in parallel.run(
+            # SDK listings are generators paging lazily: consume them
+            # within the throttle
+            lambda t: throttle.call(t.service, lambda: list(t.list_func())),
+            resource_types,
+            concurrency=concurrency, ordered=True,
+        ):
+            if e:
+                # Services missing from the cloud have nothing to purge
+                if type(e).__name__ == 'EndpointNotFound':
+                    LOG.debug('Skipping %ss: %s', resource_type.name, e)
+                    continue
+                LOG.error(_("Unable to list %(resource)ss: %(e)s"),
+                          {'resource': resource_type.name, 'e': e})
+                results[resource_type] = {
+                    'listed': [], 'deleted': [], 'failed': {},
+                    'error': str(e),
+                }
+                continue
+            for i in data:
+                LOG.warning(_('Deleting %(resource)s : %(id)s') %
+                            {'resource': resource_type.name, 'id': i.id})
+            if data:
+                listed.append((resource_type, data))
+                results[resource_type] = {
+                    'listed': [i.id for i in data],
+                    'deleted': [],
+                    'failed': {},
+                }
+
+        if dry_run:
+            for resource_type in resource_types:
+                if resource_type in results:
+                    yield resource_type.name, results[resource_type]
+            return
+
+        for (resource_type, i), _result, e in parallel.run(
+            lambda item: throttle.call(
+                item[0].service, item[0].delete_func, item[1]),
+            [(t, i) for t, data in listed for i in data],
+            concurrency=concurrency, ordered=True,
+        ):
+            if e:
+                results[resource_type]['failed'][i.id] = str(e)
+                LOG.error(_("Failed to delete %(resource)s with "
+                            "ID '%(id)s': %(e)s")
+                          % {'resource': resource_type.name, 'id': i.id,
+                             'e': e})
+            else:
+                results[resource_type]['deleted'].append(i.id)
+
+        for resource_type, data in listed:
+            result = results[resource_type]
+            if resource_type.get and result['deleted']:
+                failed = self.wait_for_deletion(
+                    resource_type, result['deleted'], concurrency, throttle,
+                    wait_kwargs)
+                result['failed'].update(failed)
+                result['deleted'] = [
+                    i for i in result['deleted'] if i not in failed]
+            if result['failed']:
+                msg = (_("%(result)s of %(total)s %(resource)ss failed "
+                       "to delete.") %
+                       {'result': len(result['failed']),
+                        'total': len(data),
+                        'resource': resource_type.name})
+                LOG.error(msg)
+
+        for resource_type in resource_types:
+            if resource_type in results:
+                yield resource_type.name, results[resource_type]
+
+    def wait_for_deletion(
+        self, resource_type, res_ids, concurrency, throttle, wait_kwargs,
+    ):
+        """Wait for deleted resources to be gone
+
+        :returns: a dict mapping the IDs of the resources which failed to
+            be deleted to the reason of the failure
+        """
+
+        def _show_progress(w):
+            done, total = w.progress
+            LOG.info(_('%(done)s of %(total)s %(resource)ss deleted'),
+                     {'done': done, 'total': total,
+                      'resource': resource_type.name})
+
+        delete_waiter = waiter.DeleteWaiter(
+            waiter.fetch_each(
+                throttle.wrap(resource_type.service, resource_type.get),
+                resource_type.not_found,
+                concurrency=concurrency,
+            ),
+            success_status=resource_type.success_status,
+            error_status=resource_type.error_status,
+            callback=_show_progress,
+            **wait_kwargs
+        )
+        delete_waiter.wait(res_ids)
+        for res_id, reason in delete_waiter.failed.items():
+            LOG.error(_("Failed to delete %(resource)s with "
+                        "ID '%(id)s': %(e)s")
+                      % {'resource': resource_type.name, 'id': res_id,
+                         'e': reason})
+        return delete_waiter.failed
 
     def delete_one_volume_snapshot(self, snapshot_id):
         volume_client = self.app.client_manager.volume
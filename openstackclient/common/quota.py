@@ -15,13 +15,18 @@
 
 """Quota action implementations"""
 
+import csv
 import itertools
 import logging
 import sys
 
 from osc_lib.command import command
+from osc_lib import exceptions
 from osc_lib import utils
+import yaml
 
+from openstackclient.common import export
+from openstackclient.common import parallel
 from openstackclient.i18n import _
 from openstackclient.network import common
 
@@ -82,6 +87,20 @@ NETWORK_KEYS = ['floating_ips', 'networks', 'rbac_policies', 'routers',
                 'ports', 'security_group_rules', 'security_groups',
                 'subnet_pools', 'subnets']
 
+# Map the network quota names of the API to the attributes of the quotas
+# returned by the SDK
+NETWORK_QUOTA_ATTRS = {
+    'floatingip': 'floating_ips',
+    'security_group_rule': 'security_group_rules',
+    'security_group': 'security_groups',
+    'network': 'networks',
+    'subnet': 'subnets',
+    'port': 'ports',
+    'router': 'routers',
+    'rbac_policy': 'rbac_policies',
+    'subnetpool': 'subnet_pools',
+}
+
 
 def _xform_get_quota(data, value, keys):
     res = []
@@ -276,10 +295,46 @@ class ListQuota(command.Lister, BaseQuota):
             default=False,
             help=_('List network quota'),
         )
+        parallel.add_concurrency_option(parser)
         return parser
 
+    def _list_quotas(
+        self, project_ids, get_quota, get_defaults, keys, is_missing,
+        concurrency,
+    ):
+        """Yield the quotas of the projects not at the default values
+
+        Default quotas are the same for all projects, so they are fetched
+        once, while the quotas of the projects are fetched concurrently
+        and yielded in the order of the projects as they come in.
+
+        :param get_quota: a function returning the quotas of a project
+        :param get_defaults: a function returning the default quotas, given
+            a project
+        :param is_missing: a function telling whether an exception raised
+            by ``get_quota`` means the project is gone
+        """
+        if not project_ids:
+            return
+        default_data = get_defaults(project_ids[0])
+
+        for p, data, ex in parallel.run(
+            get_quota, project_ids, concurrency=concurrency, ordered=True,
+        ):
+            if ex:
+                if is_missing(ex):
+                    # Project not found, move on to next one
+                    LOG.warning("Project %s not found: %s" % (p, ex))
+                    continue
+                raise ex
+
+            result_data = _xform_get_quota(data, p, keys)
+            result_default = _xform_get_quota(default_data, p, keys)
+            if result_default != result_data:
+                for row in result_data:
+                    yield row
+
     def take_action(self, parsed_args):
-        result = []
         project_ids = []
         if parsed_args.project is None:
             for p in self.app.client_manager.identity.projects.list():
@@ -296,33 +351,17 @@ class ListQuota(command.Lister, BaseQuota):
             if parsed_args.detail:
                 return self._get_detailed_quotas(parsed_args)
             compute_client = self.app.client_manager.compute
-            for p in project_ids:
-                try:
-                    data = compute_client.quotas.get(p)
-                except Exception as ex:
-                    if (
-                        type(ex).__name__ == 'NotFound' or
-                        ex.http_status >= 400 and ex.http_status <= 499
-                    ):
-                        # Project not found, move on to next one
-                        LOG.warning("Project %s not found: %s" % (p, ex))
-                        continue
-                    else:
-                        raise
-
-                result_data = _xform_get_quota(
-                    data,
-                    p,
-                    COMPUTE_QUOTAS.keys(),
-                )
-                default_data = compute_client.quotas.defaults(p)
-                result_default = _xform_get_quota(
-                    default_data,
-                    p,
-                    COMPUTE_QUOTAS.keys(),
-                )
-                if result_default != result_data:
-                    result += result_data
+            result = self._list_quotas(
+                project_ids,
+                compute_client.quotas.get,
+                compute_client.quotas.defaults,
+                COMPUTE_QUOTAS.keys(),
+                lambda ex: (
+                    type(ex).__name__ == 'NotFound' or
+                    ex.http_status >= 400 and ex.http_status <= 499
+                ),
+                parsed_args.concurrency,
+            )
 
             columns = (
                 'id',
@@ -362,30 +401,14 @@ class ListQuota(command.Lister, BaseQuota):
                 LOG.warning("Volume service doesn't provide detailed quota"
                             " information")
             volume_client = self.app.client_manager.volume
-            for p in project_ids:
-                try:
-                    data = volume_client.quotas.get(p)
-                except Exception as ex:
-                    if type(ex).__name__ == 'NotFound':
-                        # Project not found, move on to next one
-                        LOG.warning("Project %s not found: %s" % (p, ex))
-                        continue
-                    else:
-                        raise
-
-                result_data = _xform_get_quota(
-                    data,
-                    p,
-                    VOLUME_QUOTAS.keys(),
-                )
-                default_data = volume_client.quotas.defaults(p)
-                result_default = _xform_get_quota(
-                    default_data,
-                    p,
-                    VOLUME_QUOTAS.keys(),
-                )
-                if result_default != result_data:
-                    result += result_data
+            result = self._list_quotas(
+                project_ids,
+                volume_client.quotas.get,
+                volume_client.quotas.defaults,
+                VOLUME_QUOTAS.keys(),
+                lambda ex: type(ex).__name__ == 'NotFound',
+                parsed_args.concurrency,
+            )
 
             columns = (
                 'id',
@@ -414,30 +437,14 @@ class ListQuota(command.Lister, BaseQuota):
             if parsed_args.detail:
                 return self._get_detailed_quotas(parsed_args)
             client = self.app.client_manager.network
-            for p in project_ids:
-                try:
-                    data = client.get_quota(p)
-                except Exception as ex:
-                    if type(ex).__name__ == 'NotFound':
-                        # Project not found, move on to next one
-                        LOG.warning("Project %s not found: %s" % (p, ex))
-                        continue
-                    else:
-                        raise
-
-                result_data = _xform_get_quota(
-                    data,
-                    p,
-                    NETWORK_KEYS,
-                )
-                default_data = client.get_quota_default(p)
-                result_default = _xform_get_quota(
-                    default_data,
-                    p,
-                    NETWORK_KEYS,
-                )
-                if result_default != result_data:
-                    result += result_data
+            result = self._list_quotas(
+                project_ids,
+                client.get_quota,
+                client.get_quota_default,
+                NETWORK_KEYS,
+                lambda ex: type(ex).__name__ == 'NotFound',
+                parsed_args.concurrency,
+            )
 
             columns = (
                 'id',
@@ -471,6 +478,204 @@ class ListQuota(command.Lister, BaseQuota):
         return ((), ())
 
 
+def _headroom(limit, in_use, reserved):
+    """Return the quota left and the percentage used, None if unlimited"""
+    if limit is None or limit < 0:
+        return None, None
+    used = (in_use or 0) + (reserved or 0)
+    utilization = round(100.0 * used / limit, 1) if limit else None
+    return limit - used, utilization
+
+
+def _utilization_sort_key(row):
+    """Sort the most used quotas first, unlimited quotas last"""
+    headroom, utilization = row[6], row[7]
+    if headroom is None:
+        return (True, 0)
+    if utilization is None:
+        # A limit of zero is reached, or exceeded, by any usage
+        utilization = float('inf') if headroom < 0 else 100.0
+    return (False, -utilization)
+
+
+class ReportQuota(command.Lister, BaseQuota):
+    _description = _(
+        "Report the limit and usage of the compute, volume and network "
+        "quotas of one or more projects")
+
+    def get_parser(self, prog_name):
+        parser = super(ReportQuota, self).get_parser(prog_name)
+        project_group = parser.add_mutually_exclusive_group()
+        project_group.add_argument(
+            '--project',
+            metavar='<project>',
+            action='append',
+            help=_('Report quotas of this project (name or ID) '
+                   '(repeat option to report multiple projects, '
+                   'default: current project)'),
+        )
+        project_group.add_argument(
+            '--all-projects',
+            action='store_true',
+            default=False,
+            help=_('Report quotas of all projects'),
+        )
+        parser.add_argument(
+            '--compute',
+            action='store_true',
+            default=False,
+            help=_('Report compute quotas'),
+        )
+        parser.add_argument(
+            '--volume',
+            action='store_true',
+            default=False,
+            help=_('Report volume quotas'),
+        )
+        parser.add_argument(
+            '--network',
+            action='store_true',
+            default=False,
+            help=_('Report network quotas '
+                   '(default: the quotas of all services)'),
+        )
+        parser.add_argument(
+            '--sort-by-headroom',
+            action='store_true',
+            default=False,
+            help=_('Sort the quotas by the percentage of their limit in '
+                   'use, the quotas closest to their limit first and '
+                   'unlimited quotas last'),
+        )
+        parallel.add_concurrency_option(parser)
+        export.add_export_options(parser)
+        return parser
+
+    def _get_project_ids(self, parsed_args):
+        identity_client = self.app.client_manager.identity
+        if parsed_args.all_projects:
+            return [p.id for p in identity_client.projects.list()]
+        if parsed_args.project:
+            return [
+                utils.find_resource(identity_client.projects, p).id
+                for p in parsed_args.project
+            ]
+        return [self.app.client_manager.auth_ref.project_id]
+
+    def _get_services(self, parsed_args):
+        client_manager = self.app.client_manager
+        services = [
+            service for service in ('compute', 'volume', 'network')
+            if getattr(parsed_args, service)
+        ] or ['compute', 'volume', 'network']
+        if not client_manager.is_compute_endpoint_enabled():
+            services = [s for s in services if s != 'compute']
+        if not client_manager.is_network_endpoint_enabled():
+            services = [s for s in services if s != 'network']
+        return services
+
+    def _get_detailed_quota(self, project_id, service):
+        """Return the detailed quotas of a project for a service
+
+        :returns: a dict mapping resources to dicts with ``limit``,
+            ``in_use`` and ``reserved`` keys
+        """
+        if service == 'compute':
+            quota = self.app.client_manager.compute.quotas.get(
+                project_id, detail=True)._info
+        elif service == 'volume':
+            quota = self.app.client_manager.volume.quotas.get(
+                project_id, usage=True)._info
+        else:
+            quota = self._network_quota_to_dict(
+                self.app.client_manager.network.get_quota(
+                    project_id, details=True))
+        result = {}
+        for resource, values in quota.items():
+            # Skip the project ID and the resources without details
+            if type(values) is dict:
+                result[resource] = {
+                    'limit': values.get('limit'),
+                    # Neutron names "used" what the others name "in_use"
+                    'in_use': values.get('in_use', values.get('used')),
+                    'reserved': values.get('reserved'),
+                }
+        return result
+
+    def run(self, parsed_args):
+        ret = super(ReportQuota, self).run(parsed_args)
+        # Fail once the report was displayed or written, so that a report
+        # missing quotas is detected by scripts
+        if self.error:
+            raise exceptions.CommandError(self.error)
+        return ret
+
+    def _get_rows(self, project_ids, services, concurrency):
+        items = [(p, s) for p in project_ids for s in services]
+        failures = 0
+        for (project_id, service), quota, e in parallel.run(
+            lambda item: self._get_detailed_quota(*item),
+            items,
+            concurrency=concurrency, ordered=True,
+        ):
+            if e:
+                if type(e).__name__ != 'EndpointNotFound':
+                    failures += 1
+                    LOG.error(_("Failed to get %(service)s quotas of "
+                                "project %(project)s: %(e)s"),
+                              {'service': service, 'project': project_id,
+                               'e': e})
+                continue
+            for resource, values in sorted(quota.items()):
+                headroom, utilization = _headroom(
+                    values['limit'], values['in_use'], values['reserved'])
+                yield (
+                    project_id,
+                    service,
+                    resource,
+                    values['in_use'],
+                    values['reserved'],
+                    values['limit'],
+                    headroom,
+                    utilization,
+                )
+
+        if failures:
+            self.error = _(
+                "Failed to get %(failures)s of %(total)s service quotas"
+            ) % {'failures': failures, 'total': len(items)}
+
+    def take_action(self, parsed_args):
+        column_headers = (
+            'Project ID',
+            'Service',
+            'Resource',
+            'In Use',
+            'Reserved',
+            'Limit',
+            'Headroom',
+            'Utilization (%)',
+        )
+        self.error = None
+        rows = self._get_rows(
+            self._get_project_ids(parsed_args),
+            self._get_services(parsed_args),
+            parsed_args.concurrency,
+        )
+        if parsed_args.sort_by_headroom:
+            rows = sorted(rows, key=_utilization_sort_key)
+
+        if parsed_args.output_file:
+            export.write_rows(
+                parsed_args.output_file,
+                parsed_args.output_format,
+                column_headers,
+                rows,
+            )
+            return column_headers, []
+        return column_headers, rows
+
+
 class SetQuota(common.NetDetectionMixin, command.Command):
     _description = _("Set quotas for project or class")
 
@@ -505,11 +710,23 @@ class SetQuota(common.NetDetectionMixin, command.Command):
 
     def get_parser(self, prog_name):
         parser = super(SetQuota, self).get_parser(prog_name)
-        parser.add_argument(
+        project_group = parser.add_mutually_exclusive_group(required=True)
+        project_group.add_argument(
             'project',
             metavar='<project/class>',
+            nargs='?',
             help=_('Set quotas for this project or class (name/ID)'),
         )
+        project_group.add_argument(
+            '--from-file',
+            metavar='<file>',
+            help=_('Set the quotas of many projects from a YAML file mapping '
+                   'projects (name or ID) to quota values, or a CSV file '
+                   'with a "project" column and a column per quota. '
+                   'Quotas are named after the options of this command. '
+                   'Quotas already at the requested values are not '
+                   'updated. Cannot be combined with the quota options.'),
+        )
         parser.add_argument(
             '--class',
             dest='quota_class',
@@ -535,10 +752,210 @@ class SetQuota(common.NetDetectionMixin, command.Command):
             action='store_true',
             help=_('Force quota update (only supported by compute)')
         )
+        parallel.add_concurrency_option(parser)
         return parser
 
+    def _get_quota_keys(self):
+        """Map quota option names to their service and quota name"""
+        keys = {}
+        for k, v in COMPUTE_QUOTAS.items():
+            keys[v] = ('compute', k)
+        for k, v in VOLUME_QUOTAS.items():
+            keys[v] = ('volume', k)
+        if self.app.client_manager.is_network_endpoint_enabled():
+            for k, v in NETWORK_QUOTAS.items():
+                keys[v] = ('network', k)
+        else:
+            for k, v in NOVA_NETWORK_QUOTAS.items():
+                keys[v] = ('compute', k)
+        return keys
+
+    def _read_quota_file(self, path):
+        """Read the quota values of each project from a YAML or CSV file
+
+        :returns: a list of (project, {quota option name: value}) tuples
+        """
+        try:
+            with open(path, newline='') as f:
+                if path.lower().endswith('.csv'):
+                    rows = []
+                    for row in csv.DictReader(f):
+                        project = row.pop('project', None)
+                        rows.append((project, dict(
+                            (k, v) for k, v in row.items() if v)))
+                else:
+                    data = yaml.safe_load(f) or {}
+                    if not isinstance(data, dict):
+                        raise ValueError(_('a mapping of projects to '
+                                           'quotas is expected'))
+                    rows = [
+                        (project, values or {})
+                        for project, values in data.items()
+                    ]
+        except (IOError, ValueError, csv.Error, yaml.YAMLError) as e:
+            msg = _("Unable to read %(file)s: %(e)s") % {'file': path, 'e': e}
+            raise exceptions.CommandError(msg)
+
+        keys = self._get_quota_keys()
+        result = []
+        for project, values in rows:
+            if not project or not isinstance(values, dict):
+                msg = _("Invalid quotas for project %s") % project
+                raise exceptions.CommandError(msg)
+            quotas = {}
+            for name, value in values.items():
+                if name not in keys:
+                    msg = _("Unknown quota %(quota)s for project "
+                            "%(project)s") % {'quota': name,
+                                              'project': project}
+                    raise exceptions.CommandError(msg)
+                try:
+                    quotas[name] = int(value)
+                except (TypeError, ValueError):
+                    msg = _("Invalid value %(value)s of quota %(quota)s for "
+                            "project %(project)s") % {
+                        'value': value, 'quota': name, 'project': project}
+                    raise exceptions.CommandError(msg)
+            result.append((str(project), quotas))
+        return result
+
+    def _find_projects(self, projects, concurrency):
+        """Resolve project names or IDs, each of them once
+
+        All the projects are listed once. The names which are not found
+        there, or which are ambiguous, are looked up concurrently.
+
+        :returns: a dict mapping the given names or IDs to project IDs
+        """
+        identity_client = self.app.client_manager.identity
+        cache = {}
+        try:
+            for p in identity_client.projects.list():
+                cache[p.id] = p.id
+                # None marks names shared by projects of several domains
+                cache[p.name] = None if p.name in cache else p.id
+        except Exception as e:
+            LOG.debug('Unable to list projects: %s', e)
+
+        result = dict(
+            (p, cache[p]) for p in set(projects) if cache.get(p))
+        failures = 0
+        for project, project_obj, e in parallel.run(
+            lambda p: utils.find_resource(identity_client.projects, p),
+            set(projects).difference(result),
+            concurrency=concurrency,
+        ):
+            if e:
+                failures += 1
+                LOG.error(_("Failed to find project with name or "
+                            "ID '%(project)s': %(e)s"),
+                          {'project': project, 'e': e})
+            else:
+                result[project] = project_obj.id
+        if failures:
+            msg = _("%s projects could not be found") % failures
+            raise exceptions.CommandError(msg)
+        return result
+
+    def _update_quotas(self, project_id, service, quotas, force):
+        """Update the quotas of a service which differ from their value
+
+        :returns: the names of the quotas updated
+        """
+        if service == 'compute':
+            manager = self.app.client_manager.compute.quotas
+            current = manager.get(project_id)._info
+        elif service == 'volume':
+            manager = self.app.client_manager.volume.quotas
+            current = manager.get(project_id)._info
+        else:
+            network_client = self.app.client_manager.network
+            current = network_client.get_quota(project_id)
+            if type(current) is not dict:
+                current = current.to_dict()
+
+        changes = {}
+        for key, value in quotas.items():
+            current_value = current.get(
+                key, current.get(NETWORK_QUOTA_ATTRS.get(key)))
+            if current_value != value:
+                changes[key] = value
+        if not changes:
+            return []
+
+        if service == 'network':
+            network_client.update_quota(project_id, **changes)
+        elif service == 'compute' and force:
+            manager.update(project_id, force=True, **changes)
+        else:
+            manager.update(project_id, **changes)
+        return sorted(changes)
+
+    def _set_quotas_from_file(self, parsed_args):
+        if parsed_args.quota_class:
+            msg = _("--class cannot be used with --from-file")
+            raise exceptions.CommandError(msg)
+        # The quotas of every project come from the file only
+        options = [
+            '--%s' % v for k, v in itertools.chain(
+                COMPUTE_QUOTAS.items(),
+                VOLUME_QUOTAS.items(),
+                NETWORK_QUOTAS.items(),
+                NOVA_NETWORK_QUOTAS.items(),
+            ) if getattr(parsed_args, k, None) is not None
+        ]
+        if parsed_args.volume_type:
+            options.append('--volume-type')
+        if options:
+            msg = _("%s cannot be used with --from-file") % ', '.join(
+                sorted(set(options)))
+            raise exceptions.CommandError(msg)
+
+        rows = self._read_quota_file(parsed_args.from_file)
+        project_ids = self._find_projects(
+            [project for project, quotas in rows], parsed_args.concurrency)
+
+        # Merge the rows of the same project, the last value wins
+        keys = self._get_quota_keys()
+        updates = {}
+        for project, quotas in rows:
+            for name, value in quotas.items():
+                service, key = keys[name]
+                updates.setdefault(
+                    (project_ids[project], service), {})[key] = value
+
+        updated = set()
+        failures = 0
+        for (project_id, service), changes, e in parallel.run(
+            lambda item: self._update_quotas(
+                item[0], item[1], updates[item], parsed_args.force),
+            sorted(updates),
+            concurrency=parsed_args.concurrency,
+        ):
+            if e:
+                failures += 1
+                LOG.error(_("Failed to set %(service)s quotas of project "
+                            "%(project)s: %(e)s"),
+                          {'service': service, 'project': project_id,
+                           'e': e})
+            elif changes:
+                updated.add(project_id)
+                LOG.debug('Updated %s quotas of project %s: %s',
+                          service, project_id, ', '.join(changes))
+
+        self.app.stdout.write(
+            _("Updated the quotas of %(updated)s of %(total)s projects\n") %
+            {'updated': len(updated), 'total': len(set(project_ids.values()))})
+        if failures:
+            msg = _("%(failures)s of %(total)s quota updates failed") % {
+                'failures': failures, 'total': len(updates)}
+            raise exceptions.CommandError(msg)
+
     def take_action(self, parsed_args):
 
+        if parsed_args.from_file:
+            return self._set_quotas_from_file(parsed_args)
+
         identity_client = self.app.client_manager.identity
         compute_client = self.app.client_manager.compute
         volume_client = self.app.client_manager.volume
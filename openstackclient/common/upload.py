@@ -0,0 +1,165 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Upload bodies for local files"""
+
+import io
+import logging
+import mmap
+import os
+import stat
+
+
+LOG = logging.getLogger(__name__)
+
+# Size of the chunks produced when the body is iterated over
+CHUNK_SIZE = 1024 * 1024
+
+
+class MappedFile(object):
+    """A read-only file object backed by a memory map of a local file
+
+    ``read()`` returns ``memoryview`` slices of the map, so the data handed
+    to the HTTP layer is never copied into intermediate ``bytes`` objects.
+    The length of the body is known up front and the position can be moved
+    with ``seek()``, so an upload can be retried or restricted to a range of
+    the file.
+
+    :param path: path of the local file
+    :param offset: start of the range of the file to expose
+    :param length: size of the range of the file to expose, defaults to the
+        rest of the file
+    """
+
+    def __init__(self, path, offset=0, length=None):
+        self.name = path
+        self._file = io.open(path, 'rb')
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._map)
+
+        size = len(self._map)
+        self._start = min(offset, size)
+        if length is None:
+            self._end = size
+        else:
+            self._end = min(size, self._start + length)
+        self._pos = self._start
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._view is None
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        if size is None or size < 0:
+            end = self._end
+        else:
+            end = min(self._end, self._pos + size)
+        data = self._view[self._pos:end]
+        self._pos = end
+        return data
+
+    def readinto(self, buf):
+        data = self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            pos = self._start + offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self._end + offset
+        else:
+            raise ValueError('invalid whence (%r)' % whence)
+        self._pos = max(self._start, min(pos, self._end))
+        return self.tell()
+
+    def tell(self):
+        return self._pos - self._start
+
+    def close(self):
+        if self.closed:
+            return
+        self._view.release()
+        self._view = None
+        try:
+            self._map.close()
+        except BufferError:
+            # Slices handed out by read() are still referenced somewhere,
+            # the map is unmapped once they are garbage collected.
+            pass
+        self._file.close()
+
+
+def open_file(path, offset=0, length=None):
+    """Open a local file to be used as an upload body
+
+    Regular files are memory mapped, anything else (empty files, pipes,
+    devices) falls back to a plain file object.
+
+    :param path: path of the local file
+    :param offset: start of the range of the file to upload
+    :param length: size of the range of the file to upload
+    :returns: a file-like object
+    """
+    try:
+        st = os.stat(path)
+        if stat.S_ISREG(st.st_mode) and st.st_size:
+            return MappedFile(path, offset=offset, length=length)
+    except (ValueError, OverflowError, OSError) as e:
+        LOG.debug('Unable to map %s, falling back to read(): %s', path, e)
+
+    if offset or length is not None:
+        raise ValueError('ranges are only supported for regular files')
+    return io.open(path, 'rb')
+
+
+def get_length(f):
+    """Return the total length of a file-like object used as upload body
+
+    For file wrappers forwarding attribute access to the file they wrap:
+    the HTTP layer sizes a body with ``len()``, which is not forwarded.
+
+    :returns: the length, or 0 if it is not known (such as for a pipe), in
+        which case the body is sent chunked
+    """
+    if hasattr(f, '__len__'):
+        return len(f)
+    try:
+        return os.fstat(f.fileno()).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return 0
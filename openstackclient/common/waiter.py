@@ -0,0 +1,301 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Wait for a set of resources to reach a final state"""
+
+import logging
+import random
+import time
+
+from openstackclient.common import parallel
+from openstackclient.i18n import _
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2
+DEFAULT_MAX_POLL_INTERVAL = 15
+
+
+def add_wait_options(parser, timeout=None):
+    """Add the options tuning how --wait polls to a command parser"""
+    parser.add_argument(
+        '--wait-timeout',
+        metavar='<seconds>',
+        type=int,
+        default=timeout,
+        help=_("Give up waiting after this many seconds "
+               "(only meaningful with --wait, default: %s)") % (
+            timeout or _('no timeout')),
+    )
+    parser.add_argument(
+        '--poll-interval',
+        metavar='<seconds>',
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=_("Initial delay between two status checks, which backs off "
+               "while nothing changes (only meaningful with --wait, "
+               "default: %s)") % DEFAULT_POLL_INTERVAL,
+    )
+
+
+def get_wait_kwargs(parsed_args):
+    """Return the waiter arguments set by add_wait_options() options"""
+    return {
+        'timeout': parsed_args.wait_timeout,
+        'poll_interval': parsed_args.poll_interval,
+    }
+
+
+def fetch_each(get, not_found, concurrency=parallel.DEFAULT_CONCURRENCY):
+    """Build a fetch function getting every pending resource concurrently
+
+    For APIs which cannot list resources by ID.  Resources which are not
+    found are reported as gone, other failures as unchanged.
+
+    :param get: a function taking a resource ID and returning the resource
+    :param not_found: the exception class(es) raised by ``get`` for a
+        resource which does not exist
+    """
+
+    def fetch(res_ids):
+        result = {}
+        for res_id, resource, e in parallel.run(
+            get, res_ids, concurrency=concurrency,
+        ):
+            if isinstance(e, not_found):
+                result[res_id] = None
+            elif e:
+                LOG.debug('Unable to refresh %s: %s', res_id, e)
+            else:
+                result[res_id] = resource
+        return result
+
+    return fetch
+
+
+class StatusWaiter(object):
+    """Poll many resources at once until each reaches a final status
+
+    Instead of one sleep/GET loop per resource, all tracked resources are
+    refreshed by a single ``fetch`` call per poll, which is free to use a
+    list call filtered on the pending IDs where the API allows it.  The
+    delay between polls starts at ``poll_interval`` and backs off
+    exponentially (with some jitter) while nothing changes, up to
+    ``max_interval``.
+
+    :param fetch: a function taking a list of resource IDs and returning a
+        dict mapping IDs to the current resource.  A value of None means the
+        resource does not exist anymore; IDs missing from the dict are
+        considered unchanged since the previous poll.
+    :param status_field: the status attribute of the resources
+    :param success_status: a list of status strings for successful completion
+    :param error_status: a list of status strings for error
+    :param poll_interval: initial delay between polls (seconds)
+    :param max_interval: maximum delay between polls (seconds)
+    :param timeout: give up after this long (seconds), None waits forever
+    :param callback: called after every poll with the waiter, useful to
+        display progress
+    """
+
+    def __init__(
+        self,
+        fetch,
+        status_field='status',
+        success_status=('active',),
+        error_status=('error',),
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        max_interval=DEFAULT_MAX_POLL_INTERVAL,
+        timeout=None,
+        callback=None,
+    ):
+        self.fetch = fetch
+        self.status_field = status_field
+        self.success_status = [s.lower() for s in success_status]
+        self.error_status = [s.lower() for s in error_status]
+        self.poll_interval = poll_interval
+        self.max_interval = max(max_interval, poll_interval)
+        self.timeout = timeout
+        self.callback = callback
+
+        #: Latest known state of every tracked resource
+        self.resources = {}
+        #: IDs of the resources which reached a success status
+        self.succeeded = set()
+        #: Map of the IDs of failed resources to a failure reason
+        self.failed = {}
+
+    @property
+    def pending(self):
+        """Return the IDs of the resources not finished yet, in order"""
+        return [
+            res_id for res_id in self.resources
+            if res_id not in self.failed and res_id not in self.succeeded
+        ]
+
+    @property
+    def progress(self):
+        """Return the number of finished and tracked resources"""
+        return len(self.succeeded) + len(self.failed), len(self.resources)
+
+    def get_status(self, resource):
+        return (getattr(resource, self.status_field, None) or '').lower()
+
+    def is_success(self, resource):
+        return self.get_status(resource) in self.success_status
+
+    def is_error(self, resource):
+        return self.get_status(resource) in self.error_status
+
+    def is_gone(self, res_id):
+        """Handle a resource which does not exist anymore
+
+        :returns: True if this is the expected outcome
+        """
+        return False
+
+    def _update(self, res_id, resource):
+        if resource is None:
+            if self.is_gone(res_id):
+                self.succeeded.add(res_id)
+            else:
+                self.failed[res_id] = 'not found'
+            return True
+
+        previous = self.resources.get(res_id)
+        changed = (
+            self.get_status(resource) != self.get_status(previous) or
+            getattr(resource, 'progress', None) !=
+            getattr(previous, 'progress', None)
+        )
+        self.resources[res_id] = resource
+        if self.is_success(resource):
+            self.succeeded.add(res_id)
+        elif self.is_error(resource):
+            self.failed[res_id] = self.get_status(resource)
+        else:
+            return changed
+        return True
+
+    def watch(self, res_ids):
+        """Wait for all given resources to finish, one at a time
+
+        :param res_ids: the IDs of the resources to watch
+        :returns: a generator of the IDs of the resources, in the order in
+            which they reach a final state
+        """
+        for res_id in res_ids:
+            self.resources.setdefault(res_id, None)
+
+        interval = self.poll_interval
+        start = time.time()
+        pending = self.pending
+        while pending:
+            pending_ids = set(pending)
+            changed = False
+            for res_id, resource in self.fetch(pending).items():
+                if res_id in pending_ids:
+                    pending_ids.discard(res_id)
+                    changed = self._update(res_id, resource) or changed
+
+            if self.callback:
+                self.callback(self)
+            still_pending = self.pending
+            still_pending_ids = set(still_pending)
+            for res_id in pending:
+                if res_id not in still_pending_ids:
+                    yield res_id
+            pending = still_pending
+
+            if not pending:
+                break
+            if self.timeout is not None and (
+                time.time() - start >= self.timeout
+            ):
+                for res_id in pending:
+                    self.failed[res_id] = 'timeout'
+                    yield res_id
+                break
+
+            # Poll eagerly while things move, back off while they do not
+            if changed:
+                interval = self.poll_interval
+            else:
+                interval = min(interval * 2, self.max_interval)
+            delay = interval * random.SystemRandom().uniform(0.8, 1.2)
+            if self.timeout is not None:
+                delay = max(0, min(delay, start + self.timeout - time.time()))
+            LOG.debug('%d resources pending, next poll in %.1fs',
+                      len(pending), delay)
+            time.sleep(delay)
+
+    def wait(self, res_ids):
+        """Wait for all given resources to finish
+
+        :param res_ids: the IDs of the resources to watch
+        :returns: True if all resources reached a success status
+        """
+        for res_id in self.watch(res_ids):
+            pass
+        return not self.failed
+
+
+class DeleteWaiter(StatusWaiter):
+    """Poll many resources at once until each of them is gone"""
+
+    def __init__(self, fetch, success_status=(), **kwargs):
+        super(DeleteWaiter, self).__init__(
+            fetch, success_status=success_status, **kwargs)
+
+    def is_gone(self, res_id):
+        return True
+
+
+def wait_for_status(
+    status_f,
+    res_id,
+    status_field='status',
+    success_status=('active',),
+    error_status=('error',),
+    callback=None,
+    **kwargs
+):
+    """Wait for status change on a single resource
+
+    A drop-in replacement for ``osc_lib.utils.wait_for_status`` polling
+    with a :class:`StatusWaiter`.
+
+    :param status_f: a status function that takes a single id argument
+    :param res_id: the resource id to watch
+    :param status_field: the status attribute in the returned resource object
+    :param success_status: a list of status strings for successful completion
+    :param error_status: a list of status strings for error
+    :param callback: called per poll with the progress of the resource
+    :param kwargs: further arguments for the :class:`StatusWaiter`, such as
+        ``timeout`` and ``poll_interval``
+    :rtype: True on success
+    """
+
+    def _callback(w):
+        resource = w.resources.get(res_id)
+        callback(getattr(resource, 'progress', None) or 0)
+
+    status_waiter = StatusWaiter(
+        lambda ids: {res_id: status_f(res_id)},
+        status_field=status_field,
+        success_status=success_status,
+        error_status=error_status,
+        callback=_callback if callback else None,
+        **kwargs
+    )
+    return status_waiter.wait([res_id])
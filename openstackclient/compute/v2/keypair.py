@@ -25,6 +25,7 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
 from openstackclient.i18n import _
 from openstackclient.identity import common as identity_common
 
@@ -258,6 +259,7 @@ class ListKeypair(command.Lister):
             type=int,
             help=_('Maximum number of keypairs to display'),
         )
+        parallel.add_concurrency_option(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -301,10 +303,11 @@ class ListKeypair(command.Lister):
                 msg = _(
                     '--project is not compatible with --marker'
                 )
+                raise exceptions.CommandError(msg)
 
             # NOTE(stephenfin): This is done client side because nova doesn't
-            # currently support doing so server-side. If this is slow, we can
-            # think about spinning up a threadpool or similar.
+            # currently support doing so server-side, so the keypairs of the
+            # users are fetched concurrently.
             project = identity_common.find_project(
                 identity_client,
                 parsed_args.project,
@@ -312,10 +315,22 @@ class ListKeypair(command.Lister):
             ).id
             users = identity_client.users.list(tenant_id=project)
 
-            data = []
-            for user in users:
-                kwargs['user_id'] = user.id
-                data.extend(compute_client.keypairs(**kwargs))
+            def _list_user_keypairs(user):
+                # Any further page is fetched by the worker too
+                return list(compute_client.keypairs(user_id=user.id, **kwargs))
+
+            def _get_project_keypairs():
+                # Keypairs are listed user by user, in the order of the
+                # users, as soon as they are available
+                for user, keypairs, e in parallel.run(
+                    _list_user_keypairs, users,
+                    concurrency=parsed_args.concurrency, ordered=True,
+                ):
+                    if e:
+                        raise e
+                    yield from keypairs
+
+            data = _get_project_keypairs()
         elif parsed_args.user:
             if not sdk_utils.supports_microversion(compute_client, '2.10'):
                 msg = _(
@@ -16,14 +16,19 @@
 """Compute v2 Server action implementations"""
 
 import argparse
+import collections
+import datetime
 import getpass
 import io
+import json
 import logging
 import os
+import time
 
 from cliff import columns as cliff_columns
 import iso8601
 from novaclient import api_versions
+from novaclient import exceptions as nova_exceptions
 from novaclient.v2 import servers
 from openstack import exceptions as sdk_exceptions
 from osc_lib.cli import format_columns
@@ -31,7 +36,10 @@ from osc_lib.cli import parseractions
 from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
+import yaml
 
+from openstackclient.common import parallel
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 from openstackclient.identity import common as identity_common
 from openstackclient.network import common as network_common
@@ -41,6 +49,12 @@ LOG = logging.getLogger(__name__)
 
 IMAGE_STRING_FOR_BFV = 'N/A (booted from volume)'
 
+DEFAULT_WATCH_INTERVAL = 5
+
+# How far changes-since windows starting at the time of the client reach
+# back, so that a server clock lagging behind the client misses no change
+CLOCK_SKEW_MARGIN = datetime.timedelta(minutes=5)
+
 
 class PowerStateColumn(cliff_columns.FormattableColumn):
     """Generate a formatted string of a server's power state."""
@@ -107,7 +121,34 @@ def _prefix_checked_value(prefix):
     return func
 
 
-def _prep_server_detail(compute_client, image_client, server, refresh=True):
+# Image and flavor names are remembered for a little while, so that showing
+# several servers from the same process does not look them up again
+NAME_CACHE_TTL = 60
+_name_cache = {}
+
+
+def _remember_name(kind, res_id, name):
+    _name_cache[(kind, res_id)] = (name, time.monotonic() + NAME_CACHE_TTL)
+
+
+def _lookup_name(kind, res_id, find):
+    """Return the name of an image or flavor, from the cache if possible
+
+    :param kind: the type of resource, ``image`` or ``flavor``
+    :param res_id: the ID of the resource
+    :param find: a function returning the resource with the given ID
+    """
+    name, expires = _name_cache.get((kind, res_id), (None, 0))
+    if expires > time.monotonic():
+        return name
+    name = find(res_id).name
+    _remember_name(kind, res_id, name)
+    return name
+
+
+def _prep_server_detail(
+    compute_client, image_client, server, refresh=True, name_lookup=True,
+):
     """Prepare the detailed server dict for printing
 
     :param compute_client: a compute client instance
@@ -116,6 +157,8 @@ def _prep_server_detail(compute_client, image_client, server, refresh=True):
     :param refresh: Flag indicating if ``server`` is already the latest version
                     or if it needs to be refreshed, for example when showing
                     the latest details of a server after creating it.
+    :param name_lookup: Flag indicating if the image and flavor IDs should be
+                        completed with their names.
     :rtype: a dict of server details
     """
     info = server.to_dict()
@@ -123,14 +166,35 @@ def _prep_server_detail(compute_client, image_client, server, refresh=True):
         server = utils.find_resource(compute_client.servers, info['id'])
         info.update(server.to_dict())
 
-    # Convert the image blob to a name
     image_info = info.get('image', {})
+    image_id = image_info.get('id', '') if image_info else None
+    flavor_info = info.get('flavor', {})
+    # Microversion 2.47 puts the embedded flavor into the server response
+    # body but omits the id, so if not present we just expose the flavor
+    # dict in the server output.
+    flavor_id = flavor_info.get('id', '') if 'id' in flavor_info else None
+
+    # Look the image and flavor names up at the same time
+    lookups = []
+    if name_lookup and image_id:
+        lookups.append(('image', image_id, image_client.get_image))
+    if name_lookup and flavor_id:
+        lookups.append((
+            'flavor', flavor_id,
+            lambda f: utils.find_resource(compute_client.flavors, f),
+        ))
+    names = {}
+    for (kind, res_id, find), name, e in parallel.run(
+        lambda lookup: _lookup_name(*lookup), lookups,
+    ):
+        if e is None:
+            names[kind] = name
+
+    # Convert the image blob to a name
     if image_info:
-        image_id = image_info.get('id', '')
-        try:
-            image = image_client.get_image(image_id)
-            info['image'] = "%s (%s)" % (image.name, image_id)
-        except Exception:
+        if 'image' in names:
+            info['image'] = "%s (%s)" % (names['image'], image_id)
+        else:
             info['image'] = image_id
     else:
         # NOTE(melwitt): An server booted from a volume will have no image
@@ -140,16 +204,10 @@ def _prep_server_detail(compute_client, image_client, server, refresh=True):
         info['image'] = IMAGE_STRING_FOR_BFV
 
     # Convert the flavor blob to a name
-    flavor_info = info.get('flavor', {})
-    # Microversion 2.47 puts the embedded flavor into the server response
-    # body but omits the id, so if not present we just expose the flavor
-    # dict in the server output.
-    if 'id' in flavor_info:
-        flavor_id = flavor_info.get('id', '')
-        try:
-            flavor = utils.find_resource(compute_client.flavors, flavor_id)
-            info['flavor'] = "%s (%s)" % (flavor.name, flavor_id)
-        except Exception:
+    if flavor_id is not None:
+        if 'flavor' in names:
+            info['flavor'] = "%s (%s)" % (names['flavor'], flavor_id)
+        else:
             info['flavor'] = flavor_id
     else:
         info['flavor'] = format_columns.DictColumn(flavor_info)
@@ -193,6 +251,313 @@ def _prep_server_detail(compute_client, image_client, server, refresh=True):
     return info
 
 
+def _fetch_servers(compute_client, servers, since=None, project_id=None):
+    """Build a waiter fetch function for servers
+
+    A single server is refreshed directly. When several servers are
+    tracked, one listing of the servers changed since the oldest of them
+    was last updated is issued per poll instead of a GET per server.
+    Such a listing includes deleted servers, which are reported as gone.
+    It covers all projects when some of the servers belong to another
+    project than the one of the caller.
+
+    :param servers: the server objects being waited on
+    :param since: a time before the last update of all the servers, for
+        servers lacking their update time
+    :param project_id: the project of the caller, if known
+    """
+    if since is None:
+        since = min(
+            (getattr(s, 'updated', None) for s in servers
+             if getattr(s, 'updated', None)),
+            default=None,
+        )
+    projects = set(getattr(s, 'tenant_id', None) for s in servers)
+    projects.discard(None)
+    if project_id:
+        all_tenants = bool(projects - {project_id})
+    else:
+        all_tenants = len(projects) > 1
+
+    def fetch(server_ids):
+        if len(server_ids) == 1 or since is None:
+            result = {}
+            for server_id in server_ids:
+                try:
+                    result[server_id] = compute_client.servers.get(server_id)
+                except nova_exceptions.NotFound:
+                    result[server_id] = None
+            return result
+
+        search_opts = {'changes-since': since}
+        if all_tenants:
+            search_opts['all_tenants'] = True
+        result = {}
+        for server in compute_client.servers.list(
+            search_opts=search_opts, limit=-1,
+        ):
+            if server.id in server_ids:
+                if server.status.lower() in ('deleted', 'soft_deleted'):
+                    result[server.id] = None
+                else:
+                    result[server.id] = server
+        return result
+
+    return fetch
+
+
+# taken from 'task_and_vm_state_from_status' function in nova
+# the API sadly reports these in upper case and while it would be
+# wonderful to plaster over this ugliness client-side, there are
+# already users in the wild doing this in upper case that we need to
+# support
+SERVER_STATUS_CHOICES = (
+    'ACTIVE',
+    'BUILD',
+    'DELETED',
+    'ERROR',
+    'HARD_REBOOT',
+    'MIGRATING',
+    'PASSWORD',
+    'PAUSED',
+    'REBOOT',
+    'REBUILD',
+    'RESCUE',
+    'RESIZE',
+    'REVERT_RESIZE',
+    'SHELVED',
+    'SHELVED_OFFLOADED',
+    'SHUTOFF',
+    'SOFT_DELETED',
+    'SUSPENDED',
+    'VERIFY_RESIZE'
+)
+
+# Attempts at an action throttled by nova before giving up on the server
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+def _add_server_selection_options(parser, server_help):
+    """Add the options selecting the servers a batch action applies to
+
+    Servers can be given by name or ID, selected with a subset of the
+    ``server list`` search options, or both.
+    """
+    parser.add_argument(
+        'server',
+        metavar='<server>',
+        nargs='*',
+        help=server_help,
+    )
+    group = parser.add_argument_group(
+        _('Server selection'),
+        _('Act on all the servers matching these filters, in addition to '
+          'the servers given by name or ID'),
+    )
+    group.add_argument(
+        '--name',
+        metavar='<name-regex>',
+        help=_('Regular expression to match names'),
+    )
+    group.add_argument(
+        '--status',
+        metavar='<status>',
+        choices=SERVER_STATUS_CHOICES,
+        help=_('Search by server status'),
+    )
+    group.add_argument(
+        '--host',
+        metavar='<hostname>',
+        help=_('Search by hostname'),
+    )
+    group.add_argument(
+        '--all-projects',
+        action='store_true',
+        default=False,
+        help=_('Include all projects (admin only)'),
+    )
+    group.add_argument(
+        '--project',
+        metavar='<project>',
+        help=_("Search by project (admin only) (name or ID)")
+    )
+    identity_common.add_project_domain_option_to_parser(group)
+    group.add_argument(
+        '--user',
+        metavar='<user>',
+        help=_(
+            'Search by user (name or ID) '
+            '(admin only before microversion 2.83)'
+        ),
+    )
+    identity_common.add_user_domain_option_to_parser(group)
+    group.add_argument(
+        '--tags',
+        metavar='<tag>',
+        action='append',
+        default=[],
+        dest='tags',
+        help=_(
+            'Only select servers with the specified tag. '
+            'Specify multiple times to filter on multiple tags. '
+            '(supported by --os-compute-api-version 2.26 or above)'
+        ),
+    )
+    parallel.add_concurrency_option(parser)
+    parallel.add_rate_limit_option(parser)
+
+
+def _get_selection_search_opts(compute_client, identity_client, parsed_args):
+    """Build the server list search options of a batch action
+
+    :returns: the search options, or None if no filter was given
+    """
+    search_opts = {}
+    if parsed_args.project:
+        search_opts['tenant_id'] = identity_common.find_project(
+            identity_client,
+            parsed_args.project,
+            parsed_args.project_domain,
+        ).id
+        search_opts['all_tenants'] = True
+    if parsed_args.user:
+        search_opts['user_id'] = identity_common.find_user(
+            identity_client,
+            parsed_args.user,
+            parsed_args.user_domain,
+        ).id
+    if parsed_args.name:
+        search_opts['name'] = parsed_args.name
+    if parsed_args.status:
+        search_opts['status'] = parsed_args.status
+    if parsed_args.host:
+        search_opts['host'] = parsed_args.host
+    if parsed_args.tags:
+        if compute_client.api_version < api_versions.APIVersion('2.26'):
+            msg = _(
+                '--os-compute-api-version 2.26 or greater is required to '
+                'support the --tags option'
+            )
+            raise exceptions.CommandError(msg)
+        search_opts['tags'] = ','.join(parsed_args.tags)
+    if not search_opts:
+        if parsed_args.all_projects:
+            # Do not act on every server of the cloud by mistake
+            msg = _('--all-projects must be combined with another server '
+                    'selection option')
+            raise exceptions.CommandError(msg)
+        return None
+    if parsed_args.all_projects:
+        search_opts['all_tenants'] = True
+    return search_opts
+
+
+class ServerActionCommand(command.Command):
+    """Base class of the commands applying an action to many servers
+
+    The servers given by name or ID and the servers matching the selection
+    filters are acted on concurrently, once each. Failures are logged as
+    they happen and do not stop the action on the other servers.
+    Subclasses implement :meth:`act`.
+    """
+
+    #: Help of the positional server argument
+    server_help = None
+    #: Message reported per server when the servers were selected by filter
+    done_message = None
+    #: Message logged per server the action failed on
+    error_message = _("Failed to act on server '%(server)s': %(e)s")
+
+    def get_parser(self, prog_name):
+        parser = super(ServerActionCommand, self).get_parser(prog_name)
+        _add_server_selection_options(parser, self.server_help)
+        return parser
+
+    def act(self, server, parsed_args):
+        """Apply the action to a server object"""
+        raise NotImplementedError
+
+    def run_action(self, parsed_args):
+        """Apply the action to all selected servers
+
+        :returns: the list of servers the action succeeded on
+        """
+        compute_client = self.app.client_manager.compute
+        search_opts = _get_selection_search_opts(
+            compute_client, self.app.client_manager.identity, parsed_args)
+        if not parsed_args.server and search_opts is None:
+            msg = _('Specify at least one server or a server selection '
+                    'option')
+            raise exceptions.CommandError(msg)
+
+        # Resolve the servers given by name or ID first, so that a server
+        # also matched by the filters is only acted on once
+        targets = []
+        seen = set()
+        failures = 0
+        for name, server, e in parallel.run(
+            lambda name: utils.find_resource(compute_client.servers, name),
+            parsed_args.server,
+            concurrency=parsed_args.concurrency,
+            ordered=True,
+            rate=parsed_args.rate_limit,
+        ):
+            if e:
+                failures += 1
+                LOG.error(self.error_message, {'server': name, 'e': e})
+            elif server.id not in seen:
+                seen.add(server.id)
+                targets.append(server)
+        if search_opts is not None:
+            for server in compute_client.servers.list(
+                search_opts=search_opts, limit=-1,
+            ):
+                if server.id not in seen:
+                    seen.add(server.id)
+                    targets.append(server)
+        unresolved = failures
+
+        def _act(target):
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                try:
+                    self.act(target, parsed_args)
+                    break
+                except nova_exceptions.RetryAfterException as e:
+                    if attempt == MAX_RATE_LIMIT_RETRIES:
+                        raise
+                    delay = e.retry_after or 2 ** attempt
+                    LOG.debug('Server %s throttled, retrying in %ss',
+                              target.id, delay)
+                    time.sleep(delay)
+            return target
+
+        done = []
+        for target, server, e in parallel.run(
+            _act, targets,
+            concurrency=parsed_args.concurrency,
+            rate=parsed_args.rate_limit,
+        ):
+            if e:
+                failures += 1
+                LOG.error(self.error_message, {'server': target.id, 'e': e})
+                continue
+            done.append(server)
+            if search_opts is not None and self.done_message:
+                self.app.stdout.write(
+                    self.done_message % {'name': server.name,
+                                         'id': server.id} + '\n')
+
+        if failures:
+            msg = (_("%(failures)s of %(total)s servers failed")
+                   % {'failures': failures,
+                      'total': len(targets) + unresolved})
+            raise exceptions.CommandError(msg)
+        return done
+
+    def take_action(self, parsed_args):
+        self.run_action(parsed_args)
+
+
 class AddFixedIP(command.Command):
     _description = _("Add fixed IP address to server")
 
@@ -595,6 +960,12 @@ class AddServerVolume(command.Command):
 class CreateServer(command.ShowOne):
     _description = _("Create a new server")
 
+    def __init__(self, app, app_args, cmd_name=None):
+        super(CreateServer, self).__init__(app, app_args, cmd_name=cmd_name)
+        # Resources looked up so far, shared by the lookups of the servers
+        # of a manifest, which run concurrently
+        self._lookup_cache = {}
+
     def get_parser(self, prog_name):
         parser = super(CreateServer, self).get_parser(prog_name)
         parser.add_argument(
@@ -857,6 +1228,13 @@ class CreateServer(command.ShowOne):
             action='store_true',
             help=_('Wait for build to complete'),
         )
+        parser.add_argument(
+            '-n', '--no-name-lookup',
+            action='store_true',
+            default=False,
+            help=_('Skip flavor and image name lookup in the output'),
+        )
+        waiter.add_wait_options(parser)
         parser.add_argument(
             '--tag',
             metavar='<tag>',
@@ -871,22 +1249,117 @@ class CreateServer(command.ShowOne):
         )
         return parser
 
+    def _find(self, kind, name):
+        """Look up a resource the new server refers to by name or ID"""
+        compute_client = self.app.client_manager.compute
+        volume_client = self.app.client_manager.volume
+        if kind == 'image':
+            return self.app.client_manager.image.find_image(
+                name, ignore_missing=False)
+        if kind == 'flavor':
+            return utils.find_resource(compute_client.flavors, name)
+        if kind == 'volume':
+            return utils.find_resource(volume_client.volumes, name)
+        if kind == 'snapshot':
+            return utils.find_resource(volume_client.volume_snapshots, name)
+        if kind == 'network':
+            if self.app.client_manager.is_network_endpoint_enabled():
+                return self.app.client_manager.network.find_network(
+                    name, ignore_missing=False)
+            return compute_client.api.network_find(name)
+        if kind == 'port':
+            return self.app.client_manager.network.find_port(
+                name, ignore_missing=False)
+        if kind == 'security-group':
+            if self.app.client_manager.is_network_endpoint_enabled():
+                return self.app.client_manager.network.find_security_group(
+                    name, ignore_missing=False)
+            return compute_client.api.security_group_find(name)
+        raise ValueError(kind)
+
+    def _lookup(self, kind, name):
+        """Look up a resource, reusing the result of an earlier lookup"""
+        key = (kind, name)
+        if key not in self._lookup_cache:
+            self._lookup_cache[key] = self._find(kind, name)
+        return self._lookup_cache[key]
+
+    def _lookup_keys(self, parsed_args):
+        """Return the resources a server create request refers to
+
+        :returns: a set of ``(kind, name)`` tuples to pass to :meth:`_lookup`
+        """
+        keys = set()
+        if parsed_args.image:
+            keys.add(('image', parsed_args.image))
+        if parsed_args.volume:
+            keys.add(('volume', parsed_args.volume))
+        if parsed_args.flavor:
+            keys.add(('flavor', parsed_args.flavor))
+        for dev_map in parsed_args.block_device_mapping.values():
+            dev_map = dev_map.split(':')
+            if not dev_map[0]:
+                continue
+            if len(dev_map) > 1 and dev_map[1] in ('snapshot', 'image'):
+                keys.add((dev_map[1], dev_map[0]))
+            else:
+                keys.add(('volume', dev_map[0]))
+        for nic_str in parsed_args.nic or []:
+            for kv_str in nic_str.split(','):
+                k, sep, v = kv_str.partition('=')
+                if k == 'net-id' and v:
+                    keys.add(('network', v))
+                elif k == 'port-id' and v:
+                    keys.add(('port', v))
+        for each_sg in parsed_args.security_group:
+            keys.add(('security-group', each_sg))
+        return keys
+
     def take_action(self, parsed_args):
 
-        def _show_progress(progress):
+        def _show_progress(w):
+            progress = getattr(w.resources.get(server.id), 'progress', None)
             if progress:
                 self.app.stdout.write('\rProgress: %s' % progress)
                 self.app.stdout.flush()
 
         compute_client = self.app.client_manager.compute
-        volume_client = self.app.client_manager.volume
+        image_client = self.app.client_manager.image
+
+        server = self.create_server(parsed_args)
+
+        if parsed_args.wait:
+            status_waiter = waiter.StatusWaiter(
+                lambda ids: {server.id: compute_client.servers.get(server.id)},
+                callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            if not status_waiter.wait([server.id]):
+                LOG.error('Error creating server: %s', parsed_args.server_name)
+                self.app.stdout.write(_('Error creating server\n'))
+                raise SystemExit
+            self.app.stdout.write('\n')
+            # the waiter holds the server as fetched by its last poll
+            server = status_waiter.resources[server.id]
+
+        details = _prep_server_detail(
+            compute_client, image_client, server,
+            refresh=not parsed_args.wait,
+            name_lookup=not parsed_args.no_name_lookup)
+        return zip(*sorted(details.items()))
+
+    def create_server(self, parsed_args):
+        """Issue the server create request described by the arguments
+
+        :returns: the new server
+        """
+        compute_client = self.app.client_manager.compute
         image_client = self.app.client_manager.image
 
         # Lookup parsed_args.image
         image = None
         if parsed_args.image:
-            image = image_client.find_image(
-                parsed_args.image, ignore_missing=False)
+            image = self._lookup('image', parsed_args.image)
 
         if not image and parsed_args.image_properties:
             def emit_duplicated_warning(img):
@@ -952,14 +1425,16 @@ class CreateServer(command.ShowOne):
                 msg = _('--volume is not allowed with --boot-from-volume')
                 raise exceptions.CommandError(msg)
 
-            volume = utils.find_resource(
-                volume_client.volumes,
-                parsed_args.volume,
-            ).id
+            volume = self._lookup('volume', parsed_args.volume).id
 
         # Lookup parsed_args.flavor
-        flavor = utils.find_resource(
-            compute_client.flavors, parsed_args.flavor)
+        flavor = self._lookup('flavor', parsed_args.flavor)
+
+        # The names are known already, save looking them up again to display
+        # the new server
+        _remember_name('flavor', flavor.id, flavor.name)
+        if image:
+            _remember_name('image', image.id, image.name)
 
         files = {}
         for f in parsed_args.file:
@@ -1041,12 +1516,10 @@ class CreateServer(command.ShowOne):
                 # 2. check target exist, update target uuid according by
                 #    source type
                 if mapping['source_type'] == 'volume':
-                    volume_id = utils.find_resource(
-                        volume_client.volumes, dev_map[0]).id
+                    volume_id = self._lookup('volume', dev_map[0]).id
                     mapping['uuid'] = volume_id
                 elif mapping['source_type'] == 'snapshot':
-                    snapshot_id = utils.find_resource(
-                        volume_client.volume_snapshots, dev_map[0]).id
+                    snapshot_id = self._lookup('snapshot', dev_map[0]).id
                     mapping['uuid'] = snapshot_id
                 elif mapping['source_type'] == 'image':
                     # NOTE(mriedem): In case --image is specified with the same
@@ -1060,8 +1533,7 @@ class CreateServer(command.ShowOne):
                     # one specified by --image, then the compute service will
                     # create a volume from the image and attach it to the
                     # server as a non-root volume.
-                    image_id = image_client.find_image(dev_map[0],
-                                                       ignore_missing=False).id
+                    image_id = self._lookup('image', dev_map[0]).id
                     mapping['uuid'] = image_id
 
                 # 3. append size and delete_on_termination if exist
@@ -1115,20 +1587,16 @@ class CreateServer(command.ShowOne):
                     raise exceptions.CommandError(msg)
 
                 if self.app.client_manager.is_network_endpoint_enabled():
-                    network_client = self.app.client_manager.network
                     if nic_info["net-id"]:
-                        net = network_client.find_network(
-                            nic_info["net-id"], ignore_missing=False)
+                        net = self._lookup('network', nic_info["net-id"])
                         nic_info["net-id"] = net.id
                     if nic_info["port-id"]:
-                        port = network_client.find_port(
-                            nic_info["port-id"], ignore_missing=False)
+                        port = self._lookup('port', nic_info["port-id"])
                         nic_info["port-id"] = port.id
                 else:
                     if nic_info["net-id"]:
-                        nic_info["net-id"] = compute_client.api.network_find(
-                            nic_info["net-id"]
-                        )['id']
+                        nic_info["net-id"] = self._lookup(
+                            'network', nic_info["net-id"])['id']
                     if nic_info["port-id"]:
                         msg = _(
                             "Can't create server with port specified "
@@ -1161,17 +1629,15 @@ class CreateServer(command.ShowOne):
         # Check security group exist and convert ID to name
         security_group_names = []
         if self.app.client_manager.is_network_endpoint_enabled():
-            network_client = self.app.client_manager.network
             for each_sg in parsed_args.security_group:
-                sg = network_client.find_security_group(each_sg,
-                                                        ignore_missing=False)
+                sg = self._lookup('security-group', each_sg)
                 # Use security group ID to avoid multiple security group have
                 # same name in neutron networking backend
                 security_group_names.append(sg.id)
         else:
             # Handle nova-network case
             for each_sg in parsed_args.security_group:
-                sg = compute_client.api.security_group_find(each_sg)
+                sg = self._lookup('security-group', each_sg)
                 security_group_names.append(sg['name'])
 
         hints = {}
@@ -1251,7 +1717,7 @@ class CreateServer(command.ShowOne):
 
         # Wrap the call to catch exceptions in order to close files
         try:
-            server = compute_client.servers.create(*boot_args, **boot_kwargs)
+            return compute_client.servers.create(*boot_args, **boot_kwargs)
         finally:
             # Clean up open files - make sure they are not strings
             for f in files:
@@ -1260,20 +1726,180 @@ class CreateServer(command.ShowOne):
             if hasattr(userdata, 'close'):
                 userdata.close()
 
-        if parsed_args.wait:
-            if utils.wait_for_status(
-                compute_client.servers.get,
-                server.id,
-                callback=_show_progress,
-            ):
-                self.app.stdout.write('\n')
+
+class CreateServersFromFile(command.Lister):
+    _description = _("""Create the servers described in a manifest.
+
+The manifest is a YAML or JSON file holding a list of servers. Each server is
+a mapping of ``server create`` options, without the leading dashes, to their
+value, plus the ``name`` of the server. Options taking several values, such
+as ``network`` or ``security-group``, accept a list, and key-value options,
+such as ``property`` or ``hint``, a mapping. The manifest can also be a
+mapping with a ``servers`` list and ``defaults`` applied to every server.
+
+Every image, flavor, volume, network, port and security group is looked up
+once, before any server is created.""")
+
+    def get_parser(self, prog_name):
+        parser = super(CreateServersFromFile, self).get_parser(prog_name)
+        parser.add_argument(
+            'manifest',
+            metavar='<manifest>',
+            help=_('YAML or JSON file describing the servers to create'),
+        )
+        parser.add_argument(
+            '--wait',
+            action='store_true',
+            help=_('Wait for the builds to complete'),
+        )
+        waiter.add_wait_options(parser, timeout=1800)
+        parallel.add_concurrency_option(parser)
+        return parser
+
+    def run(self, parsed_args):
+        ret = super(CreateServersFromFile, self).run(parsed_args)
+        # Fail once the outcome of every server was displayed
+        if self.error:
+            raise exceptions.CommandError(self.error)
+        return ret
+
+    def _load_manifest(self, path):
+        try:
+            with open(path) as f:
+                manifest = yaml.safe_load(f)
+        except (IOError, yaml.YAMLError) as e:
+            raise exceptions.CommandError(
+                _("Unable to read manifest %(path)s: %(e)s")
+                % {'path': path, 'e': e})
+
+        defaults = {}
+        if isinstance(manifest, dict):
+            defaults = manifest.get('defaults') or {}
+            manifest = manifest.get('servers')
+        if not isinstance(manifest, list) or not isinstance(
+            defaults, dict,
+        ) or not all(
+            isinstance(e, dict) and 'name' in e for e in manifest
+        ):
+            raise exceptions.CommandError(
+                _("Manifest %s must contain a list of servers, each with a "
+                  "name") % path)
+
+        entries = []
+        for server in manifest:
+            entry = dict(defaults)
+            entry.update(server)
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _entry_argv(entry):
+        """Convert a manifest entry to server create arguments"""
+        argv = []
+        for key, value in entry.items():
+            if key == 'name' or value is None or value is False:
+                continue
+            opt = '--' + key.replace('_', '-')
+            if value is True:
+                argv.append(opt)
+            elif isinstance(value, dict):
+                for k, v in value.items():
+                    argv.extend([opt, '%s=%s' % (k, v)])
+            elif isinstance(value, list):
+                for v in value:
+                    argv.extend([opt, str(v)])
             else:
-                LOG.error('Error creating server: %s', parsed_args.server_name)
-                self.app.stdout.write(_('Error creating server\n'))
-                raise SystemExit
+                argv.extend([opt, str(value)])
+        argv.append(str(entry['name']))
+        return argv
 
-        details = _prep_server_detail(compute_client, image_client, server)
-        return zip(*sorted(details.items()))
+    def take_action(self, parsed_args):
+        compute_client = self.app.client_manager.compute
+        entries = self._load_manifest(parsed_args.manifest)
+
+        create_cmd = CreateServer(self.app, self.app_args)
+        create_parser = create_cmd.get_parser('server create')
+        requests = []
+        for entry in entries:
+            try:
+                request = create_parser.parse_args(self._entry_argv(entry))
+            except SystemExit:
+                msg = _("Invalid server %(name)s in manifest %(path)s") % {
+                    'name': entry['name'], 'path': parsed_args.manifest}
+                raise exceptions.CommandError(msg)
+            # waiting is done once for all servers
+            request.wait = False
+            requests.append(request)
+
+        # Resolve every distinct name once, before creating anything
+        keys = set()
+        for request in requests:
+            keys.update(create_cmd._lookup_keys(request))
+        failures = 0
+        for (kind, name), _resource, e in parallel.run(
+            lambda key: create_cmd._lookup(*key), keys,
+            concurrency=parsed_args.concurrency,
+        ):
+            if e:
+                failures += 1
+                LOG.error(_("Failed to find %(kind)s '%(name)s': %(e)s"),
+                          {'kind': kind, 'name': name, 'e': e})
+        if failures:
+            msg = _("Failed to find %(failures)s of %(total)s resources "
+                    "referenced by the manifest") % {
+                        'failures': failures, 'total': len(keys)}
+            raise exceptions.CommandError(msg)
+
+        columns = ('ID', 'Name', 'Status', 'Message')
+        self.error = None
+
+        def _results():
+            since = (
+                datetime.datetime.utcnow() - CLOCK_SKEW_MARGIN
+            ).strftime('%Y-%m-%dT%H:%M:%SZ')
+            created = []
+            failed = 0
+            for request, server, e in parallel.run(
+                create_cmd.create_server, requests,
+                concurrency=parsed_args.concurrency,
+            ):
+                if e:
+                    failed += 1
+                    yield ('', request.server_name, 'ERROR', str(e))
+                elif parsed_args.wait:
+                    created.append((request.server_name, server))
+                else:
+                    yield (server.id, request.server_name,
+                           getattr(server, 'status', 'BUILD'), '')
+
+            if created:
+                names = {server.id: name for name, server in created}
+                status_waiter = waiter.StatusWaiter(
+                    _fetch_servers(
+                        compute_client, [s for _n, s in created], since,
+                        project_id=getattr(
+                            self.app.client_manager.auth_ref, 'project_id',
+                            None),
+                    ),
+                    **waiter.get_wait_kwargs(parsed_args)
+                )
+                for server_id in status_waiter.watch(list(names)):
+                    server = status_waiter.resources.get(server_id)
+                    status = getattr(server, 'status', '')
+                    message = ''
+                    if server_id in status_waiter.failed:
+                        failed += 1
+                        message = status_waiter.failed[server_id]
+                        fault = getattr(server, 'fault', None)
+                        if fault:
+                            message = fault.get('message', message)
+                    yield (server_id, names[server_id], status, message)
+
+            if failed:
+                self.error = _('%(failed)s of %(total)s servers failed') % {
+                    'failed': failed, 'total': len(requests)}
+
+        return columns, _results()
 
 
 class CreateServerDump(command.Command):
@@ -1327,17 +1953,21 @@ class DeleteServer(command.Command):
             action='store_true',
             help=_('Wait for delete to complete'),
         )
+        waiter.add_wait_options(parser, timeout=300)
+        parallel.add_concurrency_option(parser)
         return parser
 
     def take_action(self, parsed_args):
 
-        def _show_progress(progress):
-            if progress:
-                self.app.stdout.write('\rProgress: %s' % progress)
-                self.app.stdout.flush()
+        def _show_progress(w):
+            done, total = w.progress
+            self.app.stdout.write(
+                _('\rDeleted %(done)s of %(total)s servers') %
+                {'done': done, 'total': total})
 
         compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
+
+        def _delete(server):
             server_obj = utils.find_resource(
                 compute_client.servers, server)
 
@@ -1345,15 +1975,48 @@ class DeleteServer(command.Command):
                 compute_client.servers.force_delete(server_obj.id)
             else:
                 compute_client.servers.delete(server_obj.id)
+            return server_obj
+
+        deleted = []
+        failures = 0
+        for server, server_obj, e in parallel.run(
+            _delete, parsed_args.server,
+            concurrency=parsed_args.concurrency, ordered=True,
+        ):
+            if e:
+                failures += 1
+                LOG.error(_("Failed to delete server with name or "
+                            "ID '%(server)s': %(e)s"),
+                          {'server': server, 'e': e})
+            else:
+                deleted.append(server_obj)
+
+        if parsed_args.wait and deleted:
+            delete_waiter = waiter.DeleteWaiter(
+                _fetch_servers(
+                    compute_client, deleted,
+                    project_id=getattr(
+                        self.app.client_manager.auth_ref, 'project_id', None),
+                ),
+                success_status=('deleted', 'soft_deleted'),
+                callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            if not delete_waiter.wait([s.id for s in deleted]):
+                self.app.stdout.write('\n')
+                for server_id, reason in delete_waiter.failed.items():
+                    LOG.error(_('Error deleting server %(server)s: '
+                                '%(reason)s'),
+                              {'server': server_id, 'reason': reason})
+                self.app.stdout.write(_('Error deleting server\n'))
+                raise SystemExit
+            self.app.stdout.write('\n')
 
-            if parsed_args.wait:
-                if not utils.wait_for_delete(compute_client.servers,
-                                             server_obj.id,
-                                             callback=_show_progress):
-                    LOG.error(_('Error deleting server: %s'),
-                              server_obj.id)
-                    self.app.stdout.write(_('Error deleting server\n'))
-                    raise SystemExit
+        if failures:
+            msg = (_("Failed to delete %(failures)s of %(total)s servers.")
+                   % {'failures': failures,
+                      'total': len(parsed_args.server)})
+            raise exceptions.CommandError(msg)
 
 
 def percent_type(x):
@@ -1397,35 +2060,10 @@ class ListServer(command.Lister):
             metavar='<server-name>',
             help=_('Regular expression to match instance name (admin only)'),
         )
-        # taken from 'task_and_vm_state_from_status' function in nova
-        # the API sadly reports these in upper case and while it would be
-        # wonderful to plaster over this ugliness client-side, there are
-        # already users in the wild doing this in upper case that we need to
-        # support
         parser.add_argument(
             '--status',
             metavar='<status>',
-            choices=(
-                'ACTIVE',
-                'BUILD',
-                'DELETED',
-                'ERROR',
-                'HARD_REBOOT',
-                'MIGRATING',
-                'PASSWORD',
-                'PAUSED',
-                'REBOOT',
-                'REBUILD',
-                'RESCUE',
-                'RESIZE',
-                'REVERT_RESIZE',
-                'SHELVED',
-                'SHELVED_OFFLOADED',
-                'SHUTOFF',
-                'SOFT_DELETED',
-                'SUSPENDED',
-                'VERIFY_RESIZE'
-            ),
+            choices=SERVER_STATUS_CHOICES,
             help=_('Search by server status'),
         )
         parser.add_argument(
@@ -1723,8 +2361,91 @@ class ListServer(command.Lister):
                 '(supported by --os-compute-api-version 2.26 or above)'
             ),
         )
+        parser.add_argument(
+            '--watch',
+            metavar='<seconds>',
+            nargs='?',
+            type=float,
+            const=DEFAULT_WATCH_INTERVAL,
+            default=None,
+            help=_(
+                'Keep listing servers until interrupted, polling every '
+                '<seconds> (default: %s) for the servers changed since the '
+                'previous poll only. The table is displayed again whenever '
+                'it changes, or with ``-f json`` a JSON object is written '
+                'on its own line for every added, updated or deleted '
+                'server. Servers which stop matching the search options '
+                'are only removed once deleted.'
+            ) % DEFAULT_WATCH_INTERVAL,
+        )
         return parser
 
+    def _watch(self, parsed_args, compute_client, search_opts,
+               column_headers, servers, get_rows):
+        """List servers again and again, fetching only what changed
+
+        :param servers: the servers from the initial listing
+        :param get_rows: a function turning servers into table rows
+        """
+        stream = parsed_args.formatter == 'json'
+        index = collections.OrderedDict()
+        since = None
+        first = True
+
+        def _emit(change, row):
+            if stream:
+                event = {'change': change}
+                for header, value in zip(column_headers, row):
+                    if isinstance(value, cliff_columns.FormattableColumn):
+                        value = value.machine_readable()
+                    event[header] = value
+                self.app.stdout.write(json.dumps(event) + '\n')
+
+        def _apply(servers):
+            changed = False
+            for server, row in zip(servers, get_rows(servers)):
+                if not parsed_args.deleted and server.status.lower() in (
+                    'deleted', 'soft_deleted',
+                ):
+                    row = index.pop(server.id, None)
+                    if row is not None:
+                        _emit('delete', row)
+                        changed = True
+                elif index.get(server.id) != row:
+                    _emit('update' if server.id in index else 'add', row)
+                    index[server.id] = row
+                    changed = True
+            return changed
+
+        while True:
+            poll_start = datetime.datetime.utcnow().strftime(
+                '%Y-%m-%dT%H:%M:%SZ')
+            changed = _apply(servers)
+            # Use the clock of the server where possible. As changes-since
+            # is inclusive, the most recently changed servers are listed
+            # again by the next poll, they are ignored if unchanged.
+            since = max(
+                [since or ''] +
+                [getattr(s, 'updated', None) or '' for s in servers]
+            ) or poll_start
+
+            if changed or first:
+                first = False
+                if not stream:
+                    if self.app.stdout.isatty():
+                        # clear the screen
+                        self.app.stdout.write('\033[H\033[2J')
+                    self.produce_output(
+                        parsed_args, column_headers, list(index.values()))
+                self.app.stdout.flush()
+
+            time.sleep(parsed_args.watch)
+            LOG.debug('polling servers changed since %s', since)
+            servers = compute_client.servers.list(
+                search_opts=dict(search_opts, **{'changes-since': since}),
+                limit=-1,
+            )
+
     def take_action(self, parsed_args):
         compute_client = self.app.client_manager.compute
         identity_client = self.app.client_manager.identity
@@ -2018,45 +2739,49 @@ class ListServer(command.Lister):
                 except Exception:
                     pass
 
-        # Populate image_name, image_id, flavor_name and flavor_id attributes
-        # of server objects so that we can display those columns.
-        for s in data:
-            if compute_client.api_version >= api_versions.APIVersion('2.69'):
-                # NOTE(tssurya): From 2.69, we will have the keys 'flavor'
-                # and 'image' missing in the server response during
-                # infrastructure failure situations.
-                # For those servers with partial constructs we just skip the
-                # processing of the image and flavor informations.
-                if not hasattr(s, 'image') or not hasattr(s, 'flavor'):
-                    continue
-            if 'id' in s.image:
-                image = images.get(s.image['id'])
-                if image:
-                    s.image_name = image.name
-                s.image_id = s.image['id']
-            else:
-                # NOTE(melwitt): An server booted from a volume will have no
-                # image associated with it. We fill in the Image Name and ID
-                # with "N/A (booted from volume)" to help users who want to be
-                # able to grep for boot-from-volume servers when using the CLI.
-                s.image_name = IMAGE_STRING_FOR_BFV
-                s.image_id = IMAGE_STRING_FOR_BFV
-            if 'id' in s.flavor:
-                flavor = flavors.get(s.flavor['id'])
-                if flavor:
-                    s.flavor_name = flavor.name
-                s.flavor_id = s.flavor['id']
-            else:
-                # TODO(mriedem): Fix this for microversion >= 2.47 where the
-                # flavor is embedded in the server response without the id.
-                # We likely need to drop the Flavor ID column in that case if
-                # --long is specified.
-                s.flavor_name = ''
-                s.flavor_id = ''
-
-        table = (
-            column_headers,
-            (
+        def _get_rows(data):
+            # Populate image_name, image_id, flavor_name and flavor_id
+            # attributes of server objects so that we can display those
+            # columns.
+            for s in data:
+                if (
+                    compute_client.api_version >=
+                    api_versions.APIVersion('2.69')
+                ):
+                    # NOTE(tssurya): From 2.69, we will have the keys 'flavor'
+                    # and 'image' missing in the server response during
+                    # infrastructure failure situations.
+                    # For those servers with partial constructs we just skip
+                    # the processing of the image and flavor informations.
+                    if not hasattr(s, 'image') or not hasattr(s, 'flavor'):
+                        continue
+                if 'id' in s.image:
+                    image = images.get(s.image['id'])
+                    if image:
+                        s.image_name = image.name
+                    s.image_id = s.image['id']
+                else:
+                    # NOTE(melwitt): An server booted from a volume will have
+                    # no image associated with it. We fill in the Image Name
+                    # and ID with "N/A (booted from volume)" to help users who
+                    # want to be able to grep for boot-from-volume servers
+                    # when using the CLI.
+                    s.image_name = IMAGE_STRING_FOR_BFV
+                    s.image_id = IMAGE_STRING_FOR_BFV
+                if 'id' in s.flavor:
+                    flavor = flavors.get(s.flavor['id'])
+                    if flavor:
+                        s.flavor_name = flavor.name
+                    s.flavor_id = s.flavor['id']
+                else:
+                    # TODO(mriedem): Fix this for microversion >= 2.47 where
+                    # the flavor is embedded in the server response without
+                    # the id. We likely need to drop the Flavor ID column in
+                    # that case if --long is specified.
+                    s.flavor_name = ''
+                    s.flavor_id = ''
+
+            return (
                 utils.get_item_properties(
                     s, columns,
                     mixed_case_fields=mixed_case_fields,
@@ -2066,24 +2791,41 @@ class ListServer(command.Lister):
                         'Metadata': format_columns.DictColumn,
                     },
                 ) for s in data
-            ),
-        )
-        return table
+            )
+
+        if parsed_args.watch:
+            def _get_watch_rows(data):
+                # Look up the images and flavors new servers use, if any
+                if not parsed_args.no_name_lookup:
+                    for s in data:
+                        for kind, cache, get in (
+                            ('image', images, image_client.get_image),
+                            ('flavor', flavors, compute_client.flavors.get),
+                        ):
+                            res_id = (getattr(s, kind, None) or {}).get('id')
+                            if res_id and res_id not in cache:
+                                try:
+                                    cache[res_id] = get(res_id)
+                                except Exception:
+                                    cache[res_id] = None
+                return _get_rows(data)
 
+            self._watch(parsed_args, compute_client, search_opts,
+                        column_headers, data, _get_watch_rows)
 
-class LockServer(command.Command):
+        return column_headers, _get_rows(data)
+
+
+class LockServer(ServerActionCommand):
 
     _description = _("Lock server(s). A non-admin user will not be able to "
                      "execute actions")
+    server_help = _('Server(s) to lock (name or ID)')
+    done_message = _('Locked server %(name)s (%(id)s)')
+    error_message = _("Failed to lock server '%(server)s': %(e)s")
 
     def get_parser(self, prog_name):
         parser = super(LockServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to lock (name or ID)'),
-        )
         parser.add_argument(
             '--reason',
             metavar='<reason>',
@@ -2093,19 +2835,22 @@ class LockServer(command.Command):
         )
         return parser
 
+    def act(self, server, parsed_args):
+        if self.support_reason:
+            server.lock(reason=parsed_args.reason)
+        else:
+            server.lock()
+
     def take_action(self, parsed_args):
 
         compute_client = self.app.client_manager.compute
-        support_reason = compute_client.api_version >= api_versions.APIVersion(
-            '2.73')
-        if not support_reason and parsed_args.reason:
+        self.support_reason = (
+            compute_client.api_version >= api_versions.APIVersion('2.73'))
+        if not self.support_reason and parsed_args.reason:
             msg = _('--os-compute-api-version 2.73 or greater is required to '
                     'use the --reason option.')
             raise exceptions.CommandError(msg)
-        for server in parsed_args.server:
-            serv = utils.find_resource(compute_client.servers, server)
-            (serv.lock(reason=parsed_args.reason) if support_reason
-                else serv.lock())
+        self.run_action(parsed_args)
 
 
 # FIXME(dtroyer): Here is what I want, how with argparse/cliff?
@@ -2204,6 +2949,7 @@ revert to release the new server and restart the old one.""")
             action='store_true',
             help=_('Wait for migrate to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
     def _log_warning_for_live(self, parsed_args):
@@ -2276,11 +3022,12 @@ revert to release the new server and restart the old one.""")
             server.migrate(**kwargs)
 
         if parsed_args.wait:
-            if utils.wait_for_status(
+            if waiter.wait_for_status(
                 compute_client.servers.get,
                 server.id,
                 success_status=['active', 'verify_resize'],
                 callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
             ):
                 self.app.stdout.write(_('Complete\n'))
             else:
@@ -2579,26 +3326,14 @@ class ForceCompleteMigration(command.Command):
             server.id, parsed_args.migration)
 
 
-class PauseServer(command.Command):
+class PauseServer(ServerActionCommand):
     _description = _("Pause server(s)")
+    server_help = _('Server(s) to pause (name or ID)')
+    done_message = _('Paused server %(name)s (%(id)s)')
+    error_message = _("Failed to pause server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(PauseServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to pause (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server
-            ).pause()
+    def act(self, server, parsed_args):
+        server.pause()
 
 
 class RebootServer(command.Command):
@@ -2633,6 +3368,7 @@ class RebootServer(command.Command):
             action='store_true',
             help=_('Wait for reboot to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -2648,10 +3384,11 @@ class RebootServer(command.Command):
         server.reboot(parsed_args.reboot_type)
 
         if parsed_args.wait:
-            if utils.wait_for_status(
+            if waiter.wait_for_status(
                 compute_client.servers.get,
                 server.id,
                 callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
             ):
                 self.app.stdout.write(_('Complete\n'))
             else:
@@ -2804,6 +3541,7 @@ class RebuildServer(command.ShowOne):
             action='store_true',
             help=_('Wait for rebuild to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -2923,10 +3661,11 @@ class RebuildServer(command.ShowOne):
                 userdata.close()
 
         if parsed_args.wait:
-            if utils.wait_for_status(
+            if waiter.wait_for_status(
                 compute_client.servers.get,
                 server.id,
                 callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
             ):
                 self.app.stdout.write(_('Complete\n'))
             else:
@@ -2967,6 +3706,7 @@ host.""")
             '--wait', action='store_true',
             help=_('Wait for evacuation to complete'),
         )
+        waiter.add_wait_options(parser)
         parser.add_argument(
             '--host', metavar='<host>', default=None,
             help=_(
@@ -3035,10 +3775,11 @@ host.""")
         server = server.evacuate(**kwargs)
 
         if parsed_args.wait:
-            if utils.wait_for_status(
+            if waiter.wait_for_status(
                 compute_client.servers.get,
                 server.id,
                 callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
             ):
                 self.app.stdout.write(_('Complete\n'))
             else:
@@ -3326,6 +4067,7 @@ release the new server and restart the old one.""")
             action='store_true',
             help=_('Wait for resize to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -3347,11 +4089,12 @@ release the new server and restart the old one.""")
             )
             compute_client.servers.resize(server, flavor)
             if parsed_args.wait:
-                if utils.wait_for_status(
+                if waiter.wait_for_status(
                     compute_client.servers.get,
                     server.id,
                     success_status=['active', 'verify_resize'],
                     callback=_show_progress,
+                    **waiter.get_wait_kwargs(parsed_args)
                 ):
                     self.app.stdout.write(_('Complete\n'))
                 else:
@@ -3433,49 +4176,24 @@ Revert the migrate operation. Release the new server and restart the old
 one.""")
 
 
-class RestoreServer(command.Command):
+class RestoreServer(ServerActionCommand):
     _description = _("Restore server(s)")
+    server_help = _('Server(s) to restore (name or ID)')
+    done_message = _('Restored server %(name)s (%(id)s)')
+    error_message = _("Failed to restore server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(RestoreServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to restore (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server
-            ).restore()
+    def act(self, server, parsed_args):
+        server.restore()
 
 
-class ResumeServer(command.Command):
+class ResumeServer(ServerActionCommand):
     _description = _("Resume server(s)")
+    server_help = _('Server(s) to resume (name or ID)')
+    done_message = _('Resumed server %(name)s (%(id)s)')
+    error_message = _("Failed to resume server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(ResumeServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to resume (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server,
-            ).resume()
+    def act(self, server, parsed_args):
+        server.resume()
 
 
 class SetServer(command.Command):
@@ -3605,7 +4323,7 @@ class SetServer(command.Command):
                 server.add_tag(tag=tag)
 
 
-class ShelveServer(command.Command):
+class ShelveServer(ServerActionCommand):
     """Shelve and optionally offload server(s).
 
     Shelving a server creates a snapshot of the server and stores this
@@ -3622,14 +4340,12 @@ class ShelveServer(command.Command):
     specified. This is an admin-only operation by default.
     """
 
+    server_help = _('Server(s) to shelve (name or ID)')
+    done_message = _('Shelved server %(name)s (%(id)s)')
+    error_message = _("Failed to shelve server '%(server)s': %(e)s")
+
     def get_parser(self, prog_name):
         parser = super(ShelveServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'servers',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to shelve (name or ID)'),
-        )
         parser.add_argument(
             '--offload',
             action='store_true',
@@ -3646,75 +4362,84 @@ class ShelveServer(command.Command):
             default=False,
             help=_('Wait for shelve and/or offload operation to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
+    def act(self, server, parsed_args):
+        if server.status.lower() not in ('shelved', 'shelved_offloaded'):
+            server.shelve()
+
     def take_action(self, parsed_args):
 
-        def _show_progress(progress):
-            if progress:
-                self.app.stdout.write('\rProgress: %s' % progress)
-                self.app.stdout.flush()
+        def _show_progress(w):
+            done, total = w.progress
+            self.app.stdout.write(
+                _('\rFinished %(done)s of %(total)s servers') %
+                {'done': done, 'total': total})
+
+        def _wait(server_objs, success_status, msg):
+            status_waiter = waiter.StatusWaiter(
+                _fetch_servers(
+                    compute_client, server_objs,
+                    project_id=getattr(
+                        self.app.client_manager.auth_ref, 'project_id', None),
+                ),
+                success_status=success_status,
+                callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            if not status_waiter.wait([s.id for s in server_objs]):
+                self.app.stdout.write('\n')
+                for server_id in status_waiter.failed:
+                    LOG.error(msg, server_id)
+                    self.app.stdout.write(msg % server_id + '\n')
+                raise SystemExit
+            self.app.stdout.write('\n')
 
         compute_client = self.app.client_manager.compute
 
-        for server in parsed_args.servers:
-            server_obj = utils.find_resource(
-                compute_client.servers,
-                server,
-            )
-            if server_obj.status.lower() in ('shelved', 'shelved_offloaded'):
-                continue
-
-            server_obj.shelve()
+        server_objs = self.run_action(parsed_args)
 
         # if we don't hav to wait, either because it was requested explicitly
         # or is required implicitly, then our job is done
         if not parsed_args.wait and not parsed_args.offload:
             return
 
-        for server in parsed_args.servers:
-            # TODO(stephenfin): We should wait for these in parallel using e.g.
-            # https://review.opendev.org/c/openstack/osc-lib/+/762503/
-            if not utils.wait_for_status(
-                compute_client.servers.get, server_obj.id,
-                success_status=('shelved', 'shelved_offloaded'),
-                callback=_show_progress,
-            ):
-                LOG.error(_('Error shelving server: %s'), server_obj.id)
-                self.app.stdout.write(
-                    _('Error shelving server: %s\n') % server_obj.id)
-                raise SystemExit
+        _wait(server_objs, ('shelved', 'shelved_offloaded'),
+              _('Error shelving server: %s'))
 
         if not parsed_args.offload:
             return
 
-        for server in parsed_args.servers:
-            server_obj = utils.find_resource(
-                compute_client.servers,
-                server,
-            )
-            if server_obj.status.lower() == 'shelved_offloaded':
-                continue
+        def _offload(server_obj):
+            server_obj = compute_client.servers.get(server_obj.id)
+            if server_obj.status.lower() != 'shelved_offloaded':
+                server_obj.shelve_offload()
+            return server_obj
+
+        offloaded = []
+        for server_obj, result, e in parallel.run(
+            _offload, server_objs,
+            concurrency=parsed_args.concurrency,
+            rate=parsed_args.rate_limit,
+        ):
+            if e:
+                LOG.error(_("Failed to offload shelved server '%(server)s': "
+                            "%(e)s"), {'server': server_obj.id, 'e': e})
+            else:
+                offloaded.append(result)
 
-            server_obj.shelve_offload()
+        if len(offloaded) != len(server_objs):
+            msg = (_("%(failures)s of %(total)s servers failed")
+                   % {'failures': len(server_objs) - len(offloaded),
+                      'total': len(server_objs)})
+            raise exceptions.CommandError(msg)
 
         if not parsed_args.wait:
             return
 
-        for server in parsed_args.servers:
-            # TODO(stephenfin): We should wait for these in parallel using e.g.
-            # https://review.opendev.org/c/openstack/osc-lib/+/762503/
-            if not utils.wait_for_status(
-                compute_client.servers.get, server_obj.id,
-                success_status=('shelved_offloaded',),
-                callback=_show_progress,
-            ):
-                LOG.error(
-                    _('Error offloading shelved server %s'), server_obj.id)
-                self.app.stdout.write(
-                    _('Error offloading shelved server: %s\n') % (
-                        server_obj.id))
-                raise SystemExit
+        _wait(offloaded, ('shelved_offloaded',),
+              _('Error offloading shelved server: %s'))
 
 
 class ShowServer(command.ShowOne):
@@ -3747,6 +4472,12 @@ class ShowServer(command.ShowOne):
                 '(supported by --os-compute-api-version 2.78 or above)'
             ),
         )
+        parser.add_argument(
+            '-n', '--no-name-lookup',
+            action='store_true',
+            default=False,
+            help=_('Skip flavor and image name lookup'),
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -3776,7 +4507,7 @@ class ShowServer(command.ShowOne):
 
         data = _prep_server_detail(
             compute_client, self.app.client_manager.image, server,
-            refresh=False)
+            refresh=False, name_lookup=not parsed_args.no_name_lookup)
 
         if topology:
             data['topology'] = format_columns.DictColumn(topology)
@@ -3928,117 +4659,54 @@ class SshServer(command.Command):
         os.system(cmd % (login, ip_address))
 
 
-class StartServer(command.Command):
+class StartServer(ServerActionCommand):
     _description = _("Start server(s).")
+    server_help = _('Server(s) to start (name or ID)')
+    done_message = _('Started server %(name)s (%(id)s)')
+    error_message = _("Failed to start server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(StartServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs="+",
-            help=_('Server(s) to start (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server,
-            ).start()
+    def act(self, server, parsed_args):
+        server.start()
 
 
-class StopServer(command.Command):
+class StopServer(ServerActionCommand):
     _description = _("Stop server(s).")
+    server_help = _('Server(s) to stop (name or ID)')
+    done_message = _('Stopped server %(name)s (%(id)s)')
+    error_message = _("Failed to stop server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(StopServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs="+",
-            help=_('Server(s) to stop (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server,
-            ).stop()
+    def act(self, server, parsed_args):
+        server.stop()
 
 
-class SuspendServer(command.Command):
+class SuspendServer(ServerActionCommand):
     _description = _("Suspend server(s)")
+    server_help = _('Server(s) to suspend (name or ID)')
+    done_message = _('Suspended server %(name)s (%(id)s)')
+    error_message = _("Failed to suspend server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(SuspendServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to suspend (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server,
-            ).suspend()
+    def act(self, server, parsed_args):
+        server.suspend()
 
 
-class UnlockServer(command.Command):
+class UnlockServer(ServerActionCommand):
     _description = _("Unlock server(s)")
+    server_help = _('Server(s) to unlock (name or ID)')
+    done_message = _('Unlocked server %(name)s (%(id)s)')
+    error_message = _("Failed to unlock server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(UnlockServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to unlock (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server,
-            ).unlock()
+    def act(self, server, parsed_args):
+        server.unlock()
 
 
-class UnpauseServer(command.Command):
+class UnpauseServer(ServerActionCommand):
     _description = _("Unpause server(s)")
+    server_help = _('Server(s) to unpause (name or ID)')
+    done_message = _('Unpaused server %(name)s (%(id)s)')
+    error_message = _("Failed to unpause server '%(server)s': %(e)s")
 
-    def get_parser(self, prog_name):
-        parser = super(UnpauseServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to unpause (name or ID)'),
-        )
-        return parser
-
-    def take_action(self, parsed_args):
-
-        compute_client = self.app.client_manager.compute
-        for server in parsed_args.server:
-            utils.find_resource(
-                compute_client.servers,
-                server,
-            ).unpause()
+    def act(self, server, parsed_args):
+        server.unpause()
 
 
 class UnrescueServer(command.Command):
@@ -4134,17 +4802,14 @@ class UnsetServer(command.Command):
                 compute_client.servers.delete_tag(server, tag=tag)
 
 
-class UnshelveServer(command.Command):
+class UnshelveServer(ServerActionCommand):
     _description = _("Unshelve server(s)")
+    server_help = _('Server(s) to unshelve (name or ID)')
+    done_message = _('Unshelved server %(name)s (%(id)s)')
+    error_message = _("Failed to unshelve server '%(server)s': %(e)s")
 
     def get_parser(self, prog_name):
         parser = super(UnshelveServer, self).get_parser(prog_name)
-        parser.add_argument(
-            'server',
-            metavar='<server>',
-            nargs='+',
-            help=_('Server(s) to unshelve (name or ID)'),
-        )
         parser.add_argument(
             '--availability-zone',
             default=None,
@@ -4158,14 +4823,20 @@ class UnshelveServer(command.Command):
             default=False,
             help=_('Wait for unshelve operation to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
+    def act(self, server, parsed_args):
+        if server.status.lower() in ('shelved', 'shelved_offloaded'):
+            server.unshelve(**self.unshelve_kwargs)
+
     def take_action(self, parsed_args):
 
-        def _show_progress(progress):
-            if progress:
-                self.app.stdout.write('\rProgress: %s' % progress)
-                self.app.stdout.flush()
+        def _show_progress(w):
+            done, total = w.progress
+            self.app.stdout.write(
+                _('\rFinished %(done)s of %(total)s servers') %
+                {'done': done, 'total': total})
 
         compute_client = self.app.client_manager.compute
         kwargs = {}
@@ -4179,27 +4850,31 @@ class UnshelveServer(command.Command):
                 raise exceptions.CommandError(msg)
 
             kwargs['availability_zone'] = parsed_args.availability_zone
+        self.unshelve_kwargs = kwargs
 
-        for server in parsed_args.server:
-            server_obj = utils.find_resource(
-                compute_client.servers,
-                server,
-            )
-
-            if server_obj.status.lower() not in (
-                'shelved', 'shelved_offloaded',
-            ):
-                continue
-
-            server_obj.unshelve(**kwargs)
+        # servers which were not shelved are left alone, there is nothing
+        # to wait for
+        server_objs = [
+            s for s in self.run_action(parsed_args)
+            if s.status.lower() in ('shelved', 'shelved_offloaded')
+        ]
 
-            if parsed_args.wait:
-                if not utils.wait_for_status(
-                    compute_client.servers.get, server_obj.id,
-                    success_status=('active', 'shutoff'),
-                    callback=_show_progress,
-                ):
-                    LOG.error(_('Error unshelving server %s'), server_obj.id)
+        if parsed_args.wait and server_objs:
+            status_waiter = waiter.StatusWaiter(
+                _fetch_servers(
+                    compute_client, server_objs,
+                    project_id=getattr(
+                        self.app.client_manager.auth_ref, 'project_id', None),
+                ),
+                success_status=('active', 'shutoff'),
+                callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            if not status_waiter.wait([s.id for s in server_objs]):
+                self.app.stdout.write('\n')
+                for server_id in status_waiter.failed:
+                    LOG.error(_('Error unshelving server %s'), server_id)
                     self.app.stdout.write(
-                        _('Error unshelving server: %s\n') % server_obj.id)
-                    raise SystemExit
+                        _('Error unshelving server: %s\n') % server_id)
+                raise SystemExit
+            self.app.stdout.write('\n')
@@ -21,6 +21,7 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 
 
@@ -63,6 +64,7 @@ class CreateServerBackup(command.ShowOne):
             action='store_true',
             help=_('Wait for backup image create to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -104,10 +106,11 @@ class CreateServerBackup(command.ShowOne):
         image = image_client.find_image(backup_name, ignore_missing=False)
 
         if parsed_args.wait:
-            if utils.wait_for_status(
+            if waiter.wait_for_status(
                 image_client.get_image,
                 image.id,
                 callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
             ):
                 self.app.stdout.write('\n')
             else:
@@ -15,12 +15,19 @@
 
 """Compute v2 Server operation event implementations"""
 
+import heapq
 import logging
 
+import iso8601
+from novaclient import api_versions
+from osc_lib.cli import format_columns
 from osc_lib.command import command
+from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
 from openstackclient.i18n import _
+from openstackclient.identity import common as identity_common
 
 
 LOG = logging.getLogger(__name__)
@@ -29,6 +36,8 @@ LOG = logging.getLogger(__name__)
 class ListServerEvent(command.Lister):
     _description = _(
         "List recent events of a server. "
+        "Without a server, the events of all the servers matching the "
+        "selection options are merged in a single chronological timeline. "
         "Specify ``--os-compute-api-version 2.21`` "
         "or higher to show events for a deleted server.")
 
@@ -37,6 +46,7 @@ class ListServerEvent(command.Lister):
         parser.add_argument(
             'server',
             metavar='<server>',
+            nargs='?',
             help=_('Server to list events (name or ID)'),
         )
         parser.add_argument(
@@ -45,13 +55,147 @@ class ListServerEvent(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        parser.add_argument(
+            '--changes-since',
+            metavar='<changes-since>',
+            default=None,
+            help=_(
+                "List only events changed after a certain point of time, "
+                "and without <server>, only of the servers changed after "
+                "it. The provided time should be an ISO 8061 formatted time "
+                "(e.g., 2016-03-04T06:27:59Z)."
+            ),
+        )
+        parser.add_argument(
+            '--details',
+            action='store_true',
+            default=False,
+            help=_("Include the steps of every event, fetched with one "
+                   "more request per event")
+        )
+        group = parser.add_argument_group(
+            _('Server selection'),
+            _('Without <server>, list the events of all the servers '
+              'matching these filters'),
+        )
+        group.add_argument(
+            '--host',
+            metavar='<hostname>',
+            help=_('Search by hostname'),
+        )
+        group.add_argument(
+            '--all-projects',
+            action='store_true',
+            default=False,
+            help=_('Include all projects (admin only)'),
+        )
+        group.add_argument(
+            '--project',
+            metavar='<project>',
+            help=_("Search by project (admin only) (name or ID)")
+        )
+        identity_common.add_project_domain_option_to_parser(group)
+        parallel.add_concurrency_option(parser)
         return parser
 
+    def _list_actions(self, server_id, changes_since):
+        compute_client = self.app.client_manager.compute
+        if not changes_since:
+            return compute_client.instance_action.list(server_id)
+        if compute_client.api_version >= api_versions.APIVersion('2.58'):
+            return compute_client.instance_action.list(
+                server_id, changes_since=changes_since)
+        # Older microversions cannot filter, actions are always listed in
+        # full and only the ones which started after the date are kept
+        since = iso8601.parse_date(changes_since)
+        return [
+            a for a in compute_client.instance_action.list(server_id)
+            if iso8601.parse_date(a.start_time) >= since
+        ]
+
+    def _get_timeline(self, parsed_args):
+        """List the actions of many servers as a single timeline"""
+        compute_client = self.app.client_manager.compute
+        identity_client = self.app.client_manager.identity
+
+        search_opts = {'all_tenants': parsed_args.all_projects}
+        if parsed_args.project:
+            search_opts['tenant_id'] = identity_common.find_project(
+                identity_client,
+                parsed_args.project,
+                parsed_args.project_domain,
+            ).id
+            search_opts['all_tenants'] = True
+        if parsed_args.host:
+            search_opts['host'] = parsed_args.host
+        if parsed_args.changes_since:
+            search_opts['changes-since'] = parsed_args.changes_since
+        servers = compute_client.servers.list(
+            search_opts=search_opts, limit=-1)
+
+        timelines = []
+        for server, actions, e in parallel.run(
+            lambda s: self._list_actions(s.id, parsed_args.changes_since),
+            servers,
+            concurrency=parsed_args.concurrency,
+        ):
+            if e:
+                LOG.warning(
+                    _("Failed to list events of server %(server)s: %(e)s"),
+                    {'server': server.id, 'e': e})
+                continue
+            # Servers list their most recent action first
+            timelines.append(sorted(actions, key=lambda a: a.start_time))
+
+        return heapq.merge(*timelines, key=lambda a: a.start_time)
+
+    def _get_details(self, actions, concurrency):
+        """Replace actions by their details, including their events"""
+        compute_client = self.app.client_manager.compute
+        for action, detail, e in parallel.run(
+            lambda a: compute_client.instance_action.get(
+                a.instance_uuid, a.request_id),
+            actions,
+            concurrency=concurrency,
+            ordered=True,
+        ):
+            if e:
+                LOG.warning(
+                    _("Failed to get details of event %(request)s of server "
+                      "%(server)s: %(e)s"),
+                    {'request': action.request_id,
+                     'server': action.instance_uuid, 'e': e})
+                detail = action
+            yield detail
+
     def take_action(self, parsed_args):
         compute_client = self.app.client_manager.compute
-        server_id = utils.find_resource(compute_client.servers,
-                                        parsed_args.server).id
-        data = compute_client.instance_action.list(server_id)
+
+        if parsed_args.changes_since:
+            try:
+                iso8601.parse_date(parsed_args.changes_since)
+            except (TypeError, iso8601.ParseError):
+                raise exceptions.CommandError(
+                    _('Invalid changes-since value: %s') %
+                    parsed_args.changes_since
+                )
+
+        if parsed_args.server:
+            if (
+                parsed_args.host or parsed_args.project or
+                parsed_args.all_projects
+            ):
+                msg = _('The server selection options cannot be used with '
+                        '<server>')
+                raise exceptions.CommandError(msg)
+            server_id = utils.find_resource(compute_client.servers,
+                                            parsed_args.server).id
+            data = self._list_actions(server_id, parsed_args.changes_since)
+        else:
+            data = self._get_timeline(parsed_args)
+
+        if parsed_args.details:
+            data = self._get_details(data, parsed_args.concurrency)
 
         if parsed_args.long:
             columns = (
@@ -86,9 +230,14 @@ class ListServerEvent(command.Lister):
                 'Start Time',
             )
 
+        if parsed_args.details:
+            columns += ('events',)
+            column_headers += ('Events',)
+
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
+                    formatters={'events': format_columns.ListDictColumn},
                 ) for s in data))
 
 
@@ -23,6 +23,7 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 
 
@@ -64,6 +65,7 @@ class CreateServerImage(command.ShowOne):
             action='store_true',
             help=_('Wait for operation to complete'),
         )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -94,10 +96,11 @@ class CreateServerImage(command.ShowOne):
         image = image_client.find_image(image_id)
 
         if parsed_args.wait:
-            if utils.wait_for_status(
+            if waiter.wait_for_status(
                 image_client.get_image,
                 image_id,
                 callback=_show_progress,
+                **waiter.get_wait_kwargs(parsed_args)
             ):
                 self.app.stdout.write('\n')
             else:
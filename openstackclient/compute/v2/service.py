@@ -15,18 +15,25 @@
 
 """Service action implementations"""
 
+import collections
 import logging
+import time
 
 from novaclient import api_versions
 from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 
 
 LOG = logging.getLogger(__name__)
 
+# Live migration statuses meaning the migration is over
+MIGRATION_DONE_STATUS = ('completed',)
+MIGRATION_ERROR_STATUS = ('error', 'failed', 'cancelled')
+
 
 class DeleteService(command.Command):
     _description = _("Delete compute service(s)")
@@ -62,6 +69,329 @@ class DeleteService(command.Command):
             raise exceptions.CommandError(msg)
 
 
+class _DrainState(object):
+    """Progress of moving one server away from the drained host"""
+
+    def __init__(self, server):
+        self.server = server
+        self.status = 'pending'
+        self.attempts = 0
+        self.started = None
+        # time before which a failed migration is not retried
+        self.retry_at = 0
+        self.migration = None
+        # migrations of the server which belong to earlier attempts
+        self.ignored = set()
+        self.message = ''
+
+    def row(self):
+        dest = ''
+        if self.status == 'migrated':
+            dest = getattr(self.migration, 'dest_compute', '')
+        return (
+            self.server.id,
+            self.server.name,
+            self.status,
+            dest,
+            self.attempts,
+            self.message,
+        )
+
+
+class DrainService(command.Lister):
+    _description = _("""Live migrate all servers away from a compute host.
+
+The nova-compute service of the host is disabled first so no new servers are
+scheduled to it. Servers are then live migrated with a bounded number of
+migrations in flight, and the progress of all of them is tracked with a single
+listing of the host migrations per poll. A summary of the outcome for every
+server is displayed at the end, and the command fails if any server is left on
+the host.""")
+
+    def get_parser(self, prog_name):
+        parser = super(DrainService, self).get_parser(prog_name)
+        parser.add_argument(
+            "host",
+            metavar="<host>",
+            help=_("Name of the compute host to drain")
+        )
+        parser.add_argument(
+            "--target-host",
+            metavar="<host>",
+            help=_("Migrate the servers to this host instead of letting the "
+                   "scheduler pick one. Requires "
+                   "``--os-compute-api-version`` 2.30 or greater.")
+        )
+        parser.add_argument(
+            "--block-migration",
+            action="store_true",
+            default=False,
+            help=_("Perform block live migrations (default: shared, or "
+                   "automatic detection with ``--os-compute-api-version`` "
+                   "2.25 or greater)")
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            metavar="<count>",
+            type=int,
+            default=2,
+            help=_("Maximum number of live migrations running at once "
+                   "(default: 2)")
+        )
+        parser.add_argument(
+            "--retries",
+            metavar="<count>",
+            type=int,
+            default=1,
+            help=_("Number of times a failed migration of a server is "
+                   "retried, waiting longer before each new attempt "
+                   "(default: 1)")
+        )
+        parser.add_argument(
+            "--migration-timeout",
+            metavar="<seconds>",
+            type=int,
+            default=None,
+            help=_("Abort the live migration of a server which takes longer "
+                   "than this, giving up on the server. Aborting requires "
+                   "``--os-compute-api-version`` 2.24 or greater "
+                   "(default: no timeout)")
+        )
+        parser.add_argument(
+            "--poll-interval",
+            metavar="<seconds>",
+            type=float,
+            default=waiter.DEFAULT_POLL_INTERVAL,
+            help=_("Delay between two checks of the migrations "
+                   "(default: %s)") % waiter.DEFAULT_POLL_INTERVAL
+        )
+        disable_group = parser.add_mutually_exclusive_group()
+        disable_group.add_argument(
+            "--disable-reason",
+            metavar="<reason>",
+            default=None,
+            help=_("Reason for disabling the compute service (in quotes)")
+        )
+        disable_group.add_argument(
+            "--no-disable",
+            dest="disable",
+            action="store_false",
+            default=True,
+            help=_("Do not disable the compute service of the host")
+        )
+        return parser
+
+    def _disable_service(self, compute_client, parsed_args):
+        cs = compute_client.services
+        if compute_client.api_version >= api_versions.APIVersion('2.53'):
+            args = (SetService._find_service_by_host_and_binary(
+                cs, parsed_args.host, 'nova-compute').id,)
+        else:
+            args = (parsed_args.host, 'nova-compute')
+        if parsed_args.disable_reason:
+            cs.disable_log_reason(*(args + (parsed_args.disable_reason,)))
+        else:
+            cs.disable(*args)
+
+    def _list_migrations(self, compute_client, parsed_args, since):
+        """Return the live migrations of the host, grouped by server"""
+        kwargs = {
+            'host': parsed_args.host,
+            'migration_type': 'live-migration',
+        }
+        if compute_client.api_version >= api_versions.APIVersion('2.59'):
+            kwargs['changes_since'] = since
+        migrations = collections.defaultdict(list)
+        for migration in compute_client.migrations.list(**kwargs):
+            migrations[migration.instance_uuid].append(migration)
+        return migrations
+
+    def _start(self, compute_client, parsed_args, state, migrations):
+        state.attempts += 1
+        state.started = time.time()
+        state.migration = None
+        state.ignored.update(
+            m.id for m in migrations.get(state.server.id, []))
+
+        kwargs = {'host': parsed_args.target_host}
+        if compute_client.api_version >= api_versions.APIVersion('2.25'):
+            kwargs['block_migration'] = parsed_args.block_migration or 'auto'
+        else:
+            kwargs['block_migration'] = parsed_args.block_migration
+            kwargs['disk_over_commit'] = False
+        try:
+            state.server.live_migrate(**kwargs)
+        except Exception as e:
+            self._failed(state, str(e))
+            return
+        state.status = 'migrating'
+
+    def _failed(self, state, reason):
+        LOG.warning(_('Live migration %(attempt)s of server %(server)s '
+                      'failed: %(reason)s'),
+                    {'attempt': state.attempts, 'server': state.server.id,
+                     'reason': reason})
+        state.message = reason
+        if state.attempts > self.retries or state.status == 'aborted':
+            state.status = 'failed'
+        else:
+            state.status = 'pending'
+            # back off so a migration which failed right away, e.g. for
+            # lack of a destination host, is not retried in a tight loop
+            state.retry_at = time.time() + (
+                self.poll_interval * 2 ** (state.attempts - 1))
+
+    def _update(self, compute_client, state, migrations):
+        """Update a migrating server from the latest migration listing"""
+        current = [
+            m for m in migrations.get(state.server.id, [])
+            if m.id not in state.ignored
+        ]
+        if current:
+            state.migration = max(current, key=lambda m: m.id)
+            status = (state.migration.status or '').lower()
+            if status in MIGRATION_DONE_STATUS:
+                state.status = 'migrated'
+                state.message = ''
+                return
+            if status in MIGRATION_ERROR_STATUS:
+                self._failed(state, _('migration %s') % status)
+                return
+
+        timeout = self.migration_timeout
+        if timeout is None or time.time() - state.started < timeout:
+            return
+        state.status = 'aborted'
+        if state.migration is not None and (
+            compute_client.api_version >= api_versions.APIVersion('2.24')
+        ):
+            try:
+                compute_client.server_migrations.live_migration_abort(
+                    state.server.id, state.migration.id)
+            except Exception as e:
+                LOG.error(_('Failed to abort the live migration of server '
+                            '%(server)s: %(e)s'),
+                          {'server': state.server.id, 'e': e})
+        self._failed(state, _('timed out'))
+
+    def run(self, parsed_args):
+        ret = super(DrainService, self).run(parsed_args)
+        # Fail once the outcome of every server was displayed, so that a
+        # drain which left servers on the host is detected by scripts
+        if self.error:
+            raise exceptions.CommandError(self.error)
+        return ret
+
+    def take_action(self, parsed_args):
+        compute_client = self.app.client_manager.compute
+        if parsed_args.target_host and (
+            compute_client.api_version < api_versions.APIVersion('2.30')
+        ):
+            msg = _('--os-compute-api-version 2.30 or greater is required '
+                    'when using --target-host')
+            raise exceptions.CommandError(msg)
+        if parsed_args.max_in_flight < 1:
+            msg = _('--max-in-flight must be at least 1')
+            raise exceptions.CommandError(msg)
+        self.retries = parsed_args.retries
+        self.migration_timeout = parsed_args.migration_timeout
+        self.poll_interval = parsed_args.poll_interval
+
+        if parsed_args.disable:
+            self._disable_service(compute_client, parsed_args)
+
+        # leave some slack for clock skew, older migrations of the servers
+        # are ignored anyway
+        since = time.strftime(
+            '%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - 300))
+        states = []
+        queue = []
+        for server in compute_client.servers.list(
+            search_opts={'host': parsed_args.host, 'all_tenants': True},
+            limit=-1,
+        ):
+            state = _DrainState(server)
+            states.append(state)
+            if server.status.lower() in ('active', 'paused'):
+                queue.append(state)
+            else:
+                # only running servers can be live migrated
+                state.status = 'skipped'
+                state.message = _('server is %s') % server.status
+
+        migrations = {}
+        if queue:
+            migrations = self._list_migrations(
+                compute_client, parsed_args, since)
+        in_flight = []
+        finished = len(states) - len(queue)
+        now = time.time()
+        while queue or in_flight:
+            for state in list(queue):
+                if len(in_flight) >= parsed_args.max_in_flight:
+                    break
+                if state.retry_at > now:
+                    continue
+                queue.remove(state)
+                self._start(compute_client, parsed_args, state, migrations)
+                if state.status == 'migrating':
+                    in_flight.append(state)
+                elif state.status == 'pending':
+                    queue.append(state)
+                else:
+                    finished += 1
+            if not in_flight:
+                if queue:
+                    # nothing to poll, wait for the next retry to be due
+                    retry_at = min(s.retry_at for s in queue)
+                    time.sleep(max(retry_at - now, 0))
+                    now = max(retry_at, time.time())
+                continue
+
+            time.sleep(parsed_args.poll_interval)
+            migrations = self._list_migrations(
+                compute_client, parsed_args, since)
+            for state in list(in_flight):
+                self._update(compute_client, state, migrations)
+                if state.status == 'migrating':
+                    continue
+                in_flight.remove(state)
+                if state.status == 'pending':
+                    queue.append(state)
+                else:
+                    finished += 1
+            now = time.time()
+            self.app.stderr.write(
+                _('\rDrained %(done)s of %(total)s servers') %
+                {'done': finished, 'total': len(states)})
+        if states:
+            self.app.stderr.write('\n')
+
+        # servers which cannot be live migrated are reported apart from
+        # the migrations which failed, both are left on the host though
+        failed = [s for s in states if s.status == 'failed']
+        skipped = [s for s in states if s.status == 'skipped']
+        errors = []
+        if failed:
+            errors.append(
+                _('%(failed)s of %(total)s servers failed to migrate')
+                % {'failed': len(failed), 'total': len(states)})
+        if skipped:
+            errors.append(
+                _('%(skipped)s of %(total)s servers cannot be live migrated')
+                % {'skipped': len(skipped), 'total': len(states)})
+        self.error = None
+        if errors:
+            self.error = (
+                _('%(errors)s, they are still on host %(host)s')
+                % {'errors': '; '.join(errors), 'host': parsed_args.host})
+
+        columns = (
+            'ID', 'Name', 'Status', 'Destination Host', 'Attempts', 'Message',
+        )
+        return columns, (state.row() for state in states)
+
+
 class ListService(command.Lister):
     _description = _("List compute services. Using "
                      "``--os-compute-api-version`` 2.53 or greater will "
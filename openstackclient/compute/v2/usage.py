@@ -22,8 +22,11 @@ import functools
 from cliff import columns as cliff_columns
 from novaclient import api_versions
 from osc_lib.command import command
+from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import export
+from openstackclient.common import parallel
 from openstackclient.i18n import _
 
 
@@ -108,6 +111,74 @@ def _merge_usage_list(usages, next_usage_list):
             usages[next_usage.tenant_id] = next_usage
 
 
+class _UsageTotals(object):
+    """Running usage totals of a project
+
+    The server usages are only counted, so the totals keep the same size
+    whatever the number of servers. A server used during several time
+    ranges is counted once in each of them.
+    """
+
+    def __init__(self, tenant_id):
+        self.tenant_id = tenant_id
+        self.server_count = 0
+        self.total_hours = 0
+        self.total_memory_mb_usage = 0
+        self.total_vcpus_usage = 0
+        self.total_local_gb_usage = 0
+
+    def add(self, usage):
+        self.server_count += len(getattr(usage, 'server_usages', None) or [])
+        self.total_hours += usage.total_hours
+        self.total_memory_mb_usage += usage.total_memory_mb_usage
+        self.total_vcpus_usage += usage.total_vcpus_usage
+        self.total_local_gb_usage += usage.total_local_gb_usage
+
+    def merge(self, totals):
+        """Add the totals of the same project over another time range"""
+        self.server_count += totals.server_count
+        self.total_hours += totals.total_hours
+        self.total_memory_mb_usage += totals.total_memory_mb_usage
+        self.total_vcpus_usage += totals.total_vcpus_usage
+        self.total_local_gb_usage += totals.total_local_gb_usage
+
+
+def _get_windows(start, end, days):
+    """Split a time range in consecutive windows of some days"""
+    windows = []
+    step = datetime.timedelta(days=days)
+    while start < end:
+        windows.append((start, min(start + step, end)))
+        start += step
+    return windows
+
+
+def _list_window_usage(compute_client, window):
+    """Return the usage totals of the projects over a time range
+
+    Pages are merged into the totals as they are received.
+    """
+    start, end = window
+    totals = collections.OrderedDict()
+
+    def _add(usage_list):
+        for usage in usage_list:
+            if usage.tenant_id not in totals:
+                totals[usage.tenant_id] = _UsageTotals(usage.tenant_id)
+            totals[usage.tenant_id].add(usage)
+
+    usage_list = compute_client.usage.list(start, end, detailed=True)
+    _add(usage_list)
+    if compute_client.api_version >= api_versions.APIVersion("2.40"):
+        marker = _get_usage_list_marker(usage_list)
+        while marker:
+            usage_list = compute_client.usage.list(
+                start, end, detailed=True, marker=marker)
+            _add(usage_list)
+            marker = _get_usage_list_marker(usage_list)
+    return totals
+
+
 class ListUsage(command.Lister):
     _description = _("List resource usage per project")
 
@@ -126,8 +197,44 @@ class ListUsage(command.Lister):
             default=None,
             help=_("Usage range end date, ex 2012-01-20 (default: tomorrow)")
         )
+        parser.add_argument(
+            "--window",
+            metavar="<days>",
+            type=int,
+            default=None,
+            help=_("Split the usage range in windows of this many days, "
+                   "fetched concurrently, and add the usage of every window "
+                   "up. The server usages are not kept in memory, only the "
+                   "totals of every project, so a server used during several "
+                   "windows is counted once per window.")
+        )
+        parallel.add_concurrency_option(parser)
+        export.add_export_options(parser)
         return parser
 
+    def _list_usage_totals(self, parsed_args, start, end):
+        """Return the usage totals of the projects, window by window"""
+        compute_client = self.app.client_manager.compute
+        windows = [(start, end)]
+        if parsed_args.window:
+            windows = _get_windows(start, end, parsed_args.window)
+
+        totals = collections.OrderedDict()
+        for window, window_totals, e in parallel.run(
+            functools.partial(_list_window_usage, compute_client),
+            windows,
+            concurrency=parsed_args.concurrency,
+            ordered=True,
+        ):
+            if e:
+                raise e
+            for tenant_id, usage in window_totals.items():
+                if tenant_id not in totals:
+                    totals[tenant_id] = usage
+                else:
+                    totals[tenant_id].merge(usage)
+        return list(totals.values())
+
     def take_action(self, parsed_args):
 
         def _format_project(project):
@@ -167,7 +274,15 @@ class ListUsage(command.Lister):
         else:
             end = now + datetime.timedelta(days=1)
 
-        if compute_client.api_version < api_versions.APIVersion("2.40"):
+        if parsed_args.window is not None and parsed_args.window < 1:
+            msg = _("--window must be at least one day")
+            raise exceptions.CommandError(msg)
+
+        if parsed_args.window or parsed_args.output_file:
+            usage_list = self._list_usage_totals(parsed_args, start, end)
+            # the totals only hold the number of servers
+            columns = ("tenant_id", "server_count") + columns[2:]
+        elif compute_client.api_version < api_versions.APIVersion("2.40"):
             usage_list = compute_client.usage.list(start, end, detailed=True)
         else:
             # If the number of instances used to calculate the usage is greater
@@ -194,6 +309,34 @@ class ListUsage(command.Lister):
             # Just forget it if there's any trouble
             pass
 
+        if parsed_args.output_file:
+            export_headers = (
+                "Project ID",
+                "Project",
+                "Servers",
+                "Hours",
+                "RAM MB-Hours",
+                "CPU Hours",
+                "Disk GB-Hours",
+            )
+            export.write_rows(
+                parsed_args.output_file,
+                parsed_args.output_format,
+                export_headers,
+                (
+                    (
+                        u.tenant_id,
+                        _format_project(u.tenant_id),
+                        u.server_count,
+                        u.total_hours,
+                        u.total_memory_mb_usage,
+                        u.total_vcpus_usage,
+                        u.total_local_gb_usage,
+                    ) for u in usage_list
+                ),
+            )
+            return column_headers, []
+
         if parsed_args.formatter == 'table' and len(usage_list) > 0:
             self.app.stdout.write(_("Usage from %(start)s to %(end)s: \n") % {
                 "start": start.strftime(dateformat),
@@ -15,6 +15,8 @@
 
 """Common identity code"""
 
+import logging
+
 from keystoneclient import exceptions as identity_exc
 from keystoneclient.v3 import domains
 from keystoneclient.v3 import groups
@@ -23,9 +25,19 @@ from keystoneclient.v3 import users
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
 from openstackclient.i18n import _
 
 
+LOG = logging.getLogger(__name__)
+
+# Above this many resources to look up by ID, listing them all is assumed
+# to be cheaper than fetching them one at a time, unless --lookup-by-id is
+# given. The Identity API cannot limit listings, so the size of the
+# collection cannot be checked first.
+RESOURCE_LIST_THRESHOLD = 100
+
+
 def find_service_in_list(service_list, service_id):
     """Find a service by id in service list."""
 
@@ -87,6 +99,44 @@ def get_resource(manager, name_type_or_id):
         raise exceptions.CommandError(msg % name_type_or_id)
 
 
+def iter_resources_by_id(
+    manager, resource_ids, concurrency=parallel.DEFAULT_CONCURRENCY,
+    list_all=True, **list_kwargs
+):
+    """Yield the resources with the given IDs as they are found
+
+    When there are many resources, they are listed once and picked from the
+    listing, and the ones missing from it are fetched. Otherwise they are
+    all fetched, concurrently. Resources which cannot be found are skipped.
+
+    :param manager: the client manager of the resources
+    :param resource_ids: an iterable of resource IDs, possibly with
+        duplicates
+    :param list_all: whether many resources may be listed rather than
+        fetched, False when listing the whole collection is expensive
+    :param list_kwargs: filters of the listing, such as a domain
+    :returns: a generator of the resources, in no particular order
+    """
+    resource_ids = set(resource_ids)
+    if list_all and len(resource_ids) > RESOURCE_LIST_THRESHOLD:
+        try:
+            for resource in manager.list(**list_kwargs):
+                if resource.id in resource_ids:
+                    resource_ids.discard(resource.id)
+                    yield resource
+        except Exception as e:
+            LOG.debug('Unable to list resources: %s', e)
+
+    for resource_id, resource, e in parallel.run(
+        manager.get, resource_ids, concurrency=concurrency,
+    ):
+        if e:
+            LOG.warning(_('Unable to get %(id)s: %(e)s'),
+                        {'id': resource_id, 'e': e})
+        else:
+            yield resource
+
+
 def _get_token_resource(client, resource, parsed_name, parsed_domain=None):
     """Peek into the user's auth token to get resource IDs
 
@@ -272,6 +322,18 @@ def add_inherited_option_to_parser(parser):
     )
 
 
+def add_lookup_by_id_option_to_parser(parser):
+    parser.add_argument(
+        '--lookup-by-id',
+        action='store_true',
+        default=False,
+        help=_('Look resources up one at a time by ID, even when there are '
+               'so many of them that listing them all is usually faster. '
+               'Listing is slow on very large domains, such as LDAP-backed '
+               'ones.'),
+    )
+
+
 def add_resource_option_to_parser(parser):
     enable_group = parser.add_mutually_exclusive_group()
     enable_group.add_argument(
@@ -13,13 +13,105 @@
 
 """Identity v3 Assignment action implementations"""
 
+import logging
+
 from osc_lib.command import command
 from osc_lib import utils
 
+from openstackclient.common import parallel
 from openstackclient.i18n import _
 from openstackclient.identity import common
 
 
+LOG = logging.getLogger(__name__)
+
+
+def _name_at_domain(ref):
+    domain_name = ref['domain']['name']
+    if not domain_name:
+        return ref['name']
+    return '@'.join([ref['name'], domain_name])
+
+
+def _get_names(identity_client, ids, concurrency, list_all=True):
+    """Look up the names of the resources referenced by role assignments
+
+    Every kind of resource is looked up at the same time, then the domains
+    of the users, groups and projects found which were not looked up yet.
+
+    :param ids: a dict mapping a kind of resource (``users``, ``groups``,
+        ``projects``, ``domains`` or ``roles``) to a set of IDs
+    :param list_all: whether the resources may be listed when there are
+        many of them
+    :returns: a dict mapping the same kinds to dicts mapping the IDs of the
+        resources found to the resources
+    """
+
+    def fetch(kind):
+        return {
+            resource.id: resource
+            for resource in common.iter_resources_by_id(
+                getattr(identity_client, kind), ids[kind],
+                concurrency=concurrency, list_all=list_all,
+            )
+        }
+
+    resources = {}
+    for kind, found, e in parallel.run(fetch, ids, concurrency=len(ids)):
+        if e:
+            # Just display the IDs
+            LOG.debug('Unable to look up %s: %s', kind, e)
+        resources[kind] = found or {}
+
+    domain_ids = set(
+        getattr(resource, 'domain_id', None)
+        for kind in ('users', 'groups', 'projects')
+        for resource in resources[kind].values()
+    )
+    domain_ids.discard(None)
+    domain_ids.difference_update(resources['domains'])
+    if domain_ids:
+        resources['domains'].update(
+            (domain.id, domain) for domain in common.iter_resources_by_id(
+                identity_client.domains, domain_ids, concurrency=concurrency,
+                list_all=list_all,
+            )
+        )
+    return resources
+
+
+def _add_names(assignments, resources):
+    """Add names to role assignments listed without them
+
+    The references of the assignments get the ``name`` and ``domain`` keys
+    the Identity API fills in when asked to include names. Resources which
+    could not be found keep their ID as name.
+    """
+
+    def name(kind, res_id):
+        resource = resources[kind].get(res_id)
+        return getattr(resource, 'name', None) or res_id
+
+    def add_name(kind, ref):
+        ref['name'] = name(kind, ref['id'])
+        if kind != 'domains' and kind != 'roles':
+            domain_id = getattr(resources[kind].get(ref['id']), 'domain_id',
+                                None)
+            ref['domain'] = {
+                'id': domain_id,
+                'name': name('domains', domain_id) or '',
+            }
+
+    for assignment in assignments:
+        for kind in ('project', 'domain'):
+            if kind in assignment.scope:
+                add_name(kind + 's', assignment.scope[kind])
+        for kind in ('user', 'group', 'role'):
+            if hasattr(assignment, kind):
+                add_name(kind + 's', getattr(assignment, kind))
+        yield assignment
+
+
 class ListRoleAssignment(command.Lister):
     _description = _("List role assignments")
 
@@ -37,11 +129,22 @@ class ListRoleAssignment(command.Lister):
             help=_('Role to filter (name or ID)'),
         )
         common.add_role_domain_option_to_parser(parser)
-        parser.add_argument(
+        names = parser.add_mutually_exclusive_group()
+        names.add_argument(
             '--names',
             action="store_true",
             help=_('Display names instead of IDs'),
         )
+        names.add_argument(
+            '--client-names',
+            action="store_true",
+            help=_('Display names instead of IDs, looking them up from the '
+                   'client rather than having the server include them, '
+                   'which is faster on large deployments and works with '
+                   'older Identity servers'),
+        )
+        parallel.add_concurrency_option(parser)
+        common.add_lookup_by_id_option_to_parser(parser)
         user_or_group = parser.add_mutually_exclusive_group()
         user_or_group.add_argument(
             '--user',
@@ -157,7 +260,8 @@ class ListRoleAssignment(command.Lister):
                 parsed_args.group_domain,
             )
 
-        include_names = True if parsed_args.names else False
+        client_names = parsed_args.client_names
+        include_names = bool(parsed_args.names or client_names)
         effective = True if parsed_args.effective else False
         columns = (
             'Role', 'User', 'Group', 'Project', 'Domain', 'System', 'Inherited'
@@ -173,16 +277,32 @@ class ListRoleAssignment(command.Lister):
             role=role,
             effective=effective,
             os_inherit_extension_inherited_to=inherited_to,
-            include_names=include_names)
+            include_names=bool(parsed_args.names))
 
-        data_parsed = []
+        if client_names:
+            data = list(data)
+            ids = {kind: set() for kind in (
+                'users', 'groups', 'projects', 'domains', 'roles')}
+            for assignment in data:
+                for kind in ('project', 'domain'):
+                    if kind in assignment.scope:
+                        ids[kind + 's'].add(assignment.scope[kind]['id'])
+                for kind in ('user', 'group', 'role'):
+                    if hasattr(assignment, kind):
+                        ids[kind + 's'].add(getattr(assignment, kind)['id'])
+            data = _add_names(data, _get_names(
+                identity_client, ids, parsed_args.concurrency,
+                list_all=not parsed_args.lookup_by_id))
+
+        return columns, self._iter_rows(data, include_names)
+
+    def _iter_rows(self, data, include_names):
         for assignment in data:
             # Removing the extra "scope" layer in the assignment json
             scope = assignment.scope
             if 'project' in scope:
                 if include_names:
-                    prj = '@'.join([scope['project']['name'],
-                                    scope['project']['domain']['name']])
+                    prj = _name_at_domain(scope['project'])
                     setattr(assignment, 'project', prj)
                 else:
                     setattr(assignment, 'project', scope['project']['id'])
@@ -215,16 +335,14 @@ class ListRoleAssignment(command.Lister):
 
             if hasattr(assignment, 'user'):
                 if include_names:
-                    usr = '@'.join([assignment.user['name'],
-                                    assignment.user['domain']['name']])
+                    usr = _name_at_domain(assignment.user)
                     setattr(assignment, 'user', usr)
                 else:
                     setattr(assignment, 'user', assignment.user['id'])
                 assignment.group = ''
             elif hasattr(assignment, 'group'):
                 if include_names:
-                    grp = '@'.join([assignment.group['name'],
-                                    assignment.group['domain']['name']])
+                    grp = _name_at_domain(assignment.group)
                     setattr(assignment, 'group', grp)
                 else:
                     setattr(assignment, 'group', assignment.group['id'])
@@ -249,6 +367,4 @@ class ListRoleAssignment(command.Lister):
 
             # Creating a tuple from data object fields
             # (including the blank ones)
-            data_parsed.append(self._as_tuple(assignment))
-
-        return columns, tuple(data_parsed)
+            yield self._as_tuple(assignment)
@@ -23,6 +23,7 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
 from openstackclient.i18n import _
 from openstackclient.identity import common
 
@@ -324,6 +325,8 @@ class ListUser(command.Lister):
             default=False,
             help=_('List additional fields in output'),
         )
+        parallel.add_concurrency_option(parser)
+        common.add_lookup_by_id_option_to_parser(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -346,15 +349,15 @@ class ListUser(command.Lister):
                     identity_client.projects,
                     parsed_args.project,
                     domain_id=domain
-                ).id
+                )
             else:
                 project = utils.find_resource(
                     identity_client.projects,
                     parsed_args.project,
-                ).id
+                )
 
             assignments = identity_client.role_assignments.list(
-                project=project)
+                project=project.id)
 
             # NOTE(stevemar): If a user has more than one role on a project
             # then they will have two entries in the returned data. Since we
@@ -364,12 +367,17 @@ class ListUser(command.Lister):
                 if hasattr(assignment, 'user'):
                     user_ids.add(assignment.user['id'])
 
-            # NOTE(stevemar): Call find_resource once we have unique IDs, so
-            # it's fewer trips to the Identity API, then collect the data.
-            data = []
-            for user_id in user_ids:
-                user = utils.find_resource(identity_client.users, user_id)
-                data.append(user)
+            # Look the users up once we have unique IDs, streaming them as
+            # they come in. Users of the domain, or of the project's domain,
+            # are listed at once if there are many of them; users of other
+            # domains are then fetched one by one.
+            data = common.iter_resources_by_id(
+                identity_client.users,
+                user_ids,
+                concurrency=parsed_args.concurrency,
+                list_all=not parsed_args.lookup_by_id,
+                domain=domain or getattr(project, 'domain_id', None),
+            )
 
         else:
             data = identity_client.users.list(
@@ -17,11 +17,13 @@
 
 import argparse
 from base64 import b64encode
+import io
 import logging
 import os
 import sys
 
 import openstack.cloud._utils
+from openstack import exceptions as sdk_exceptions
 from openstack.image import image_signer
 from osc_lib.api import utils as api_utils
 from osc_lib.cli import format_columns
@@ -29,9 +31,13 @@ from osc_lib.cli import parseractions
 from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
+import yaml
 
+from openstackclient.common import parallel
 from openstackclient.common import progressbar
 from openstackclient.common import sdk_utils
+from openstackclient.common import upload
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 from openstackclient.identity import common
 
@@ -47,6 +53,8 @@ DEFAULT_DISK_FORMAT = 'raw'
 DISK_CHOICES = ["ami", "ari", "aki", "vhd", "vmdk", "raw", "qcow2", "vhdx",
                 "vdi", "iso", "ploop"]
 MEMBER_STATUS_CHOICES = ["accepted", "pending", "rejected", "all"]
+# Maximum time to wait for image imports, in seconds
+DEFAULT_IMPORT_TIMEOUT = 3600
 
 
 LOG = logging.getLogger(__name__)
@@ -110,7 +118,7 @@ def _get_member_columns(item):
 
 def get_data_file(args):
     if args.file:
-        return (open(args.file, 'rb'), args.file)
+        return (upload.open_file(args.file), args.file)
     else:
         # distinguish cases where:
         # (1) stdin is not valid (as in cron jobs):
@@ -138,6 +146,249 @@ def get_data_file(args):
             return (None, None)
 
 
+def _get_image_stores(image, key):
+    """Return the list of stores in a comma separated image property"""
+    value = (getattr(image, 'properties', None) or {}).get(key) or ''
+    return [store for store in value.split(',') if store]
+
+
+def _add_import_options(parser):
+    store_group = parser.add_mutually_exclusive_group()
+    store_group.add_argument(
+        "--stores",
+        metavar="<store1,store2,...>",
+        help=_("Comma separated list of stores to import the image data "
+               "to (implies --import)"),
+    )
+    store_group.add_argument(
+        "--all-stores",
+        action="store_true",
+        default=False,
+        help=_("Import the image data to all available stores "
+               "(implies --import)"),
+    )
+    parser.add_argument(
+        "--allow-failure",
+        action="store_true",
+        default=False,
+        help=_("Consider the import successful if the image data reached "
+               "at least one store (only meaningful with --stores or "
+               "--all-stores)"),
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        default=False,
+        help=_("Wait for the image import to complete on all stores"),
+    )
+    waiter.add_wait_options(parser, timeout=DEFAULT_IMPORT_TIMEOUT)
+
+
+def _get_import_kwargs(parsed_args):
+    kwargs = {}
+    if parsed_args.stores:
+        kwargs['stores'] = [
+            s.strip() for s in parsed_args.stores.split(',') if s.strip()]
+    if parsed_args.all_stores:
+        kwargs['all_stores'] = True
+    if kwargs and parsed_args.allow_failure:
+        kwargs['all_stores_must_succeed'] = False
+    return kwargs
+
+
+class _ImportWaiter(waiter.StatusWaiter):
+    """Wait for image imports to finish on all their target stores"""
+
+    def __init__(self, fetch, allow_failure=False, **kwargs):
+        super(_ImportWaiter, self).__init__(
+            fetch,
+            success_status=('active',),
+            error_status=('killed', 'deleted'),
+            **kwargs)
+        self.allow_failure = allow_failure
+
+    def get_status(self, resource):
+        status = super(_ImportWaiter, self).get_status(resource)
+        if status == 'active' and _get_image_stores(
+            resource, 'os_glance_importing_to_stores'
+        ):
+            # The data is available in a first store, but the import to
+            # the remaining ones is still running
+            return 'importing'
+        if status == 'active' and not self.allow_failure and (
+            _get_image_stores(resource, 'os_glance_failed_import')
+        ):
+            return 'import failed'
+        return status
+
+    def is_error(self, resource):
+        return (
+            super(_ImportWaiter, self).is_error(resource) or
+            self.get_status(resource) == 'import failed'
+        )
+
+
+# Polls between two checks of the images missing from the listings
+MISSING_IMAGES_CHECK_INTERVAL = 5
+
+
+def _fetch_images(image_client, images=()):
+    """Build a waiter fetch function for images
+
+    A single image is refreshed directly; when several images are tracked,
+    one listing of the images updated since the oldest pending change is
+    issued per poll instead of a GET per image.  Images which do not show
+    up in the listings, such as deleted ones, are fetched every few polls
+    so they are reported as gone.
+    """
+    known = {image.id: image for image in images}
+    fetch_each = waiter.fetch_each(
+        image_client.get_image, sdk_exceptions.ResourceNotFound)
+    polls = [0]
+
+    def fetch(image_ids):
+        if len(image_ids) == 1:
+            try:
+                image = image_client.get_image(image_ids[0])
+            except sdk_exceptions.ResourceNotFound:
+                image = None
+            known[image_ids[0]] = image
+            return {image_ids[0]: image}
+
+        stamps = [
+            known[i].updated_at for i in image_ids
+            if known.get(i) is not None and known[i].updated_at
+        ]
+        query = {}
+        if len(stamps) == len(image_ids):
+            query['updated_at'] = 'gte:%s' % min(stamps)
+        result = {}
+        for image in image_client.images(**query):
+            if image.id in image_ids:
+                known[image.id] = result[image.id] = image
+
+        polls[0] += 1
+        missing = [i for i in image_ids if i not in result]
+        if missing and (
+            not query or polls[0] % MISSING_IMAGES_CHECK_INTERVAL == 0
+        ):
+            for image_id, image in fetch_each(missing).items():
+                known[image_id] = result[image_id] = image
+        return result
+
+    return fetch
+
+
+def _wait_for_import(image_client, images, parsed_args, stdout):
+    """Wait for the import of images and report per store progress
+
+    :returns: the list of refreshed images and a dict mapping the IDs of
+        the images which failed to import to a reason
+    """
+    reported = {}
+    names = {image.id: image.name for image in images}
+
+    def _show_progress(w):
+        for image_id, image in w.resources.items():
+            if image is None:
+                continue
+            line = _('%(name)s: %(status)s') % {
+                'name': names[image_id] or image_id,
+                'status': w.get_status(image),
+            }
+            importing = _get_image_stores(
+                image, 'os_glance_importing_to_stores')
+            failed = _get_image_stores(image, 'os_glance_failed_import')
+            if importing:
+                line += _(', importing to %s') % ','.join(importing)
+            if failed:
+                line += _(', failed on %s') % ','.join(failed)
+            if reported.get(image_id) != line:
+                reported[image_id] = line
+                stdout.write(line + '\n')
+
+    import_waiter = _ImportWaiter(
+        _fetch_images(image_client, images),
+        allow_failure=parsed_args.allow_failure,
+        callback=_show_progress,
+        **waiter.get_wait_kwargs(parsed_args)
+    )
+    for image in images:
+        import_waiter.resources[image.id] = image
+    import_waiter.wait([image.id for image in images])
+    for image_id, reason in import_waiter.failed.items():
+        LOG.error(_('Failed to import image %(image)s: %(reason)s'),
+                  {'image': names[image_id] or image_id,
+                   'reason': reason})
+    return [
+        import_waiter.resources.get(image.id) or image for image in images
+    ], import_waiter.failed
+
+
+class _SigningFileWrapper(object):
+    """A file wrapper computing an image signature digest on the fly.
+
+    Every byte read from the wrapped file is fed to the signer's hasher, so
+    the signature is available once the upload has consumed the data,
+    without a separate pass over the file.
+
+    :param wrapped: File object holding the image data.
+    :param signer: An ``ImageSigner`` with its private key loaded.
+    """
+
+    def __init__(self, wrapped, signer):
+        self._wrapped = wrapped
+        self._signer = signer
+        # Logical read position and number of bytes hashed so far; data
+        # which is read again (e.g. when an upload is retried after a seek)
+        # must not be hashed twice.
+        self._offset = 0
+        self._hashed = 0
+
+    def read(self, *args, **kwargs):
+        data = self._wrapped.read(*args, **kwargs)
+        if data:
+            end = self._offset + len(data)
+            if self._offset <= self._hashed < end:
+                self._signer.hasher.update(data[self._hashed - self._offset:])
+                self._hashed = end
+            self._offset = end
+        return data
+
+    def seek(self, *args, **kwargs):
+        ret = self._wrapped.seek(*args, **kwargs)
+        self._offset = self._wrapped.tell()
+        return ret
+
+    def signature_properties(self, cert_id):
+        """Return the image properties describing the signature
+
+        :param cert_id: UUID of the signing certificate in the key manager
+        """
+        # The hasher already holds the digest of the uploaded data, so an
+        # empty file object makes generate_signature() just finalize it.
+        signature = self._signer.generate_signature(io.BytesIO())
+        props = {
+            'img_signature': b64encode(signature),
+            'img_signature_certificate_uuid': cert_id,
+            'img_signature_hash_method': self._signer.hash_method,
+        }
+        if self._signer.padding_method:
+            props['img_signature_key_type'] = self._signer.padding_method
+        return props
+
+    def __len__(self):
+        return upload.get_length(self._wrapped)
+
+    def __bool__(self):
+        # Even when the length is not known
+        return True
+
+    def __getattr__(self, attr):
+        # Forward other attribute access to the wrapped object.
+        return getattr(self._wrapped, attr)
+
+
 class AddProjectToImage(command.ShowOne):
     _description = _("Associate project with image")
 
@@ -339,6 +590,7 @@ class CreateImage(command.ShowOne):
                 "Force the use of glance image import instead of"
                 " direct upload")
         )
+        _add_import_options(parser)
         common.add_project_domain_option_to_parser(parser)
         for deadopt in self.deadopts:
             parser.add_argument(
@@ -403,7 +655,9 @@ class CreateImage(command.ShowOne):
                 parsed_args.project_domain,
             ).id
 
-        if parsed_args.use_import:
+        # the data is imported to the stores once it is staged
+        import_kwargs = _get_import_kwargs(parsed_args)
+        if parsed_args.use_import or import_kwargs:
             kwargs['use_import'] = True
 
         # open the file first to ensure any failures are handled before the
@@ -419,23 +673,19 @@ class CreateImage(command.ShowOne):
         if fp is None and parsed_args.file:
             LOG.warning(_("Failed to get an image file."))
             return {}, {}
-        if fp is not None and parsed_args.progress:
-            filesize = os.path.getsize(fname)
-            if filesize is not None:
-                kwargs['validate_checksum'] = False
-                kwargs['data'] = progressbar.VerboseFileWrapper(fp, filesize)
-        elif fname:
-            kwargs['filename'] = fname
-        elif fp:
-            kwargs['validate_checksum'] = False
-            kwargs['data'] = fp
+        if parsed_args.wait and (fp is None or not kwargs.get('use_import')):
+            # an image without data stays queued, there is nothing to wait
+            # for
+            msg = _("--wait requires image data to import, with --import, "
+                    "--stores or --all-stores")
+            raise exceptions.CommandError(msg)
 
         # sign an image using a given local private key file
+        signer = None
         if parsed_args.sign_key_path or parsed_args.sign_cert_id:
-            if not parsed_args.file:
-                msg = (_("signing an image requires the --file option, "
-                         "passing files via stdin when signing is not "
-                         "supported."))
+            if fp is None:
+                msg = (_("signing an image requires image data, passed "
+                         "either with the --file option or via stdin."))
                 raise exceptions.CommandError(msg)
             if (len(parsed_args.sign_key_path) < 1 or
                     len(parsed_args.sign_cert_id) < 1):
@@ -444,7 +694,6 @@ class CreateImage(command.ShowOne):
                 raise exceptions.CommandError(msg)
             else:
                 sign_key_path = parsed_args.sign_key_path
-                sign_cert_id = parsed_args.sign_cert_id
                 signer = image_signer.ImageSigner()
                 try:
                     pw = utils.get_password(
@@ -468,14 +717,18 @@ class CreateImage(command.ShowOne):
                              "could not be loaded."))
                     raise exceptions.CommandError(msg)
 
-                signature = signer.generate_signature(fp)
-                signature_b64 = b64encode(signature)
-                kwargs['img_signature'] = signature_b64
-                kwargs['img_signature_certificate_uuid'] = sign_cert_id
-                kwargs['img_signature_hash_method'] = signer.hash_method
-                if signer.padding_method:
-                    kwargs['img_signature_key_type'] = \
-                        signer.padding_method
+                # The digest is computed while the data is uploaded, so the
+                # image data is read only once and can come from stdin.
+                fp = _SigningFileWrapper(fp, signer)
+
+        if fp is not None and parsed_args.progress:
+            filesize = os.path.getsize(fname)
+            if filesize is not None:
+                kwargs['validate_checksum'] = False
+                kwargs['data'] = progressbar.VerboseFileWrapper(fp, filesize)
+        elif fp:
+            kwargs['validate_checksum'] = False
+            kwargs['data'] = fp
 
         # If a volume is specified.
         if parsed_args.volume:
@@ -497,7 +750,35 @@ class CreateImage(command.ShowOne):
             except TypeError:
                 info['volume_type'] = None
         else:
-            image = image_client.create_image(**kwargs)
+            # create_image of openstacksdk does not pass the target stores
+            # on when it imports the data it uploads: stage the data and
+            # import it separately
+            data = None
+            if import_kwargs and fp is not None:
+                data = kwargs.pop('data', fp)
+                kwargs.pop('validate_checksum', None)
+                del kwargs['use_import']
+            try:
+                image = image_client.create_image(**kwargs)
+                if data is not None:
+                    image_client.stage_image(image, data=data)
+            finally:
+                if fname:
+                    fp.close()
+            if signer:
+                image = image_client.update_image(
+                    image,
+                    **fp.signature_properties(parsed_args.sign_cert_id)
+                )
+            if data is not None:
+                image_client.import_image(
+                    image, method='glance-direct', **import_kwargs)
+            if parsed_args.wait:
+                images, failed = _wait_for_import(
+                    image_client, [image], parsed_args, self.app.stdout)
+                if failed:
+                    raise exceptions.CommandError(_('Error importing image'))
+                image = images[0]
 
         if not info:
             info = _format_image(image)
@@ -540,6 +821,152 @@ class DeleteImage(command.Command):
             raise exceptions.CommandError(msg)
 
 
+class ImportImageManifest(command.Lister):
+    _description = _("Create and import images described in a manifest")
+
+    def get_parser(self, prog_name):
+        parser = super(ImportImageManifest, self).get_parser(prog_name)
+        parser.add_argument(
+            "manifest",
+            metavar="<manifest>",
+            help=_("YAML or JSON file holding a list of images. Each entry "
+                   "takes a 'name' and either a local 'file' to upload or a "
+                   "'uri' for the web-download import method, or the "
+                   "'image' (name or ID) of an existing image to copy to "
+                   "other stores. The 'disk_format', 'container_format', "
+                   "'visibility', 'min_disk', 'min_ram', 'tags', "
+                   "'properties', 'stores', 'all_stores' and 'import' keys "
+                   "are optional."),
+        )
+        _add_import_options(parser)
+        parallel.add_concurrency_option(parser, default=4)
+        return parser
+
+    def _load_manifest(self, path):
+        try:
+            with open(path) as f:
+                entries = yaml.safe_load(f)
+        except (IOError, yaml.YAMLError) as e:
+            raise exceptions.CommandError(
+                _("Unable to read manifest %(path)s: %(e)s")
+                % {'path': path, 'e': e})
+        if not isinstance(entries, list) or not all(
+            isinstance(e, dict) and ('name' in e or 'image' in e)
+            for e in entries
+        ):
+            raise exceptions.CommandError(
+                _("Manifest %s must contain a list of images, each with a "
+                  "name or an image") % path)
+        return entries
+
+    def take_action(self, parsed_args):
+        image_client = self.app.client_manager.image
+        entries = self._load_manifest(parsed_args.manifest)
+        defaults = _get_import_kwargs(parsed_args)
+
+        def _import(entry):
+            import_kwargs = dict(defaults)
+            stores = entry.get('stores')
+            if isinstance(stores, str):
+                stores = [s.strip() for s in stores.split(',') if s.strip()]
+            if stores:
+                import_kwargs.pop('all_stores', None)
+                import_kwargs['stores'] = stores
+            elif entry.get('all_stores'):
+                import_kwargs.pop('stores', None)
+                import_kwargs['all_stores'] = True
+            if parsed_args.allow_failure and (
+                'stores' in import_kwargs or 'all_stores' in import_kwargs
+            ):
+                import_kwargs['all_stores_must_succeed'] = False
+
+            if 'image' in entry:
+                # copy the data of an existing image to more stores
+                image = image_client.find_image(
+                    entry['image'], ignore_missing=False)
+                image_client.import_image(
+                    image, method='copy-image', **import_kwargs)
+                return image
+
+            kwargs = {
+                'name': entry['name'],
+                'allow_duplicates': True,
+                'container_format': entry.get(
+                    'container_format', DEFAULT_CONTAINER_FORMAT),
+                'disk_format': entry.get(
+                    'disk_format', DEFAULT_DISK_FORMAT),
+            }
+            for attr in ('visibility', 'min_disk', 'min_ram', 'tags'):
+                if entry.get(attr) is not None:
+                    kwargs[attr] = entry[attr]
+            for k, v in (entry.get('properties') or {}).items():
+                kwargs[k] = str(v)
+
+            if 'uri' in entry:
+                image = image_client.create_image(**kwargs)
+                image_client.import_image(
+                    image, method='web-download', uri=entry['uri'],
+                    **import_kwargs)
+                return image
+
+            if 'file' in entry and import_kwargs:
+                # as with image create, stage the data and import it to the
+                # stores separately
+                image = image_client.create_image(**kwargs)
+                with open(entry['file'], 'rb') as f:
+                    image_client.stage_image(image, data=f)
+                image_client.import_image(
+                    image, method='glance-direct', **import_kwargs)
+                return image
+
+            if 'file' in entry:
+                kwargs['filename'] = entry['file']
+                if entry.get('import'):
+                    kwargs['use_import'] = True
+            return image_client.create_image(**kwargs)
+
+        columns = ('ID', 'Name', 'Status', 'Stores', 'Failed Stores')
+
+        def _row(image):
+            return (
+                image.id,
+                image.name,
+                image.status,
+                format_columns.ListColumn(
+                    _get_image_stores(image, 'stores')),
+                format_columns.ListColumn(
+                    _get_image_stores(image, 'os_glance_failed_import')),
+            )
+
+        failures = []
+        images = []
+        for entry, image, e in parallel.run(
+            _import, entries, concurrency=parsed_args.concurrency,
+            ordered=True,
+        ):
+            if e:
+                failures.append(entry)
+                LOG.error(_("Failed to create image %(image)s: %(e)s"),
+                          {'image': entry.get('name') or entry.get('image'),
+                           'e': e})
+            else:
+                images.append(image)
+
+        import_failures = {}
+        if parsed_args.wait and images:
+            images, import_failures = _wait_for_import(
+                image_client, images, parsed_args, self.app.stdout)
+
+        if failures or import_failures:
+            msg = (_("Failed to create or import %(failed)s of %(total)s "
+                     "images.")
+                   % {'failed': len(failures) + len(import_failures),
+                      'total': len(entries)})
+            raise exceptions.CommandError(msg)
+
+        return (columns, (_row(image) for image in images))
+
+
 class ListImage(command.Lister):
     _description = _("List available images")
 
@@ -775,6 +1202,121 @@ class ListImageProjects(command.Lister):
                 ) for s in data))
 
 
+class ListImageUsage(command.Lister):
+    _description = _("List the servers and volumes using images")
+
+    def get_parser(self, prog_name):
+        parser = super(ListImageUsage, self).get_parser(prog_name)
+        parser.add_argument(
+            "image",
+            metavar="<image>",
+            nargs="?",
+            help=_("Only report the usage of this image (name or ID), "
+                   "all images are reported by default"),
+        )
+        parser.add_argument(
+            "--all-projects",
+            action="store_true",
+            default=False,
+            help=_("Include servers and volumes of all projects "
+                   "(admin only)"),
+        )
+        parser.add_argument(
+            "--long",
+            action="store_true",
+            default=False,
+            help=_("List every server and volume using the images instead "
+                   "of counting them"),
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        image_client = self.app.client_manager.image
+        compute_client = self.app.client_manager.compute
+        volume_client = self.app.client_manager.volume
+
+        image = None
+        if parsed_args.image:
+            image = image_client.find_image(parsed_args.image,
+                                            ignore_missing=False)
+
+        server_opts = {'all_tenants': parsed_args.all_projects}
+        if image:
+            # Let the compute service do the filtering
+            server_opts['image'] = image.id
+        volume_opts = {'all_tenants': parsed_args.all_projects}
+
+        def _fetch(kind):
+            if kind == 'servers':
+                return compute_client.servers.list(
+                    search_opts=server_opts, limit=-1)
+            if kind == 'volumes':
+                return volume_client.volumes.list(search_opts=volume_opts)
+            return list(image_client.images())
+
+        kinds = ['servers', 'volumes']
+        if not image:
+            kinds.append('images')
+        fetched = {}
+        for kind, result, e in parallel.run(_fetch, kinds):
+            if e:
+                raise e
+            fetched[kind] = result
+
+        # Build an index of image ID to the resources using the image
+        usage = {}
+        for server in fetched['servers']:
+            # The image is an empty string for servers booted from volume
+            image_id = (getattr(server, 'image', None) or {}).get('id')
+            if image_id:
+                usage.setdefault(image_id, []).append((
+                    'server', server.id, server.name,
+                    getattr(server, 'tenant_id', ''),
+                ))
+        for volume in fetched['volumes']:
+            image_id = (
+                getattr(volume, 'volume_image_metadata', None) or {}
+            ).get('image_id')
+            if image_id:
+                usage.setdefault(image_id, []).append((
+                    'volume', volume.id, volume.name,
+                    getattr(volume, 'os-vol-tenant-attr:tenant_id', ''),
+                ))
+
+        if image:
+            images = [(image.id, image.name)]
+        else:
+            images = [(i.id, i.name) for i in fetched['images']]
+            # images not visible to the caller are still reported
+            known = set(i[0] for i in images)
+            images.extend(
+                (image_id, '') for image_id in sorted(usage)
+                if image_id not in known)
+
+        if parsed_args.long:
+            columns = ('Image ID', 'Image Name', 'Resource Type',
+                       'Resource ID', 'Resource Name', 'Project')
+            data = (
+                (image_id, name) + ref
+                for image_id, name in images
+                for ref in usage.get(image_id, [])
+            )
+        else:
+            columns = ('Image ID', 'Image Name', 'Servers', 'Volumes')
+            data = (
+                (
+                    image_id,
+                    name,
+                    sum(1 for r in usage.get(image_id, [])
+                        if r[0] == 'server'),
+                    sum(1 for r in usage.get(image_id, [])
+                        if r[0] == 'volume'),
+                )
+                for image_id, name in images
+            )
+        return (columns, data)
+
+
 class RemoveProjectImage(command.Command):
     _description = _("Disassociate project with image")
 
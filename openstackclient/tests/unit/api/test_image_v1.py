@@ -71,8 +71,10 @@ class TestImage(TestImageAPIv1):
         self.requests_mock.register_uri(
             'GET',
             FAKE_URL + '/v1/images',
-            json={'images': self.LIST_IMAGE_RESP},
-            status_code=200,
+            [
+                {'json': {'images': self.LIST_IMAGE_RESP}},
+                {'json': {'images': []}},
+            ],
         )
         ret = self.api.image_list()
         self.assertEqual(self.LIST_IMAGE_RESP, ret)
@@ -81,8 +83,10 @@ class TestImage(TestImageAPIv1):
         self.requests_mock.register_uri(
             'GET',
             FAKE_URL + '/v1/images/detail',
-            json={'images': self.LIST_IMAGE_RESP},
-            status_code=200,
+            [
+                {'json': {'images': self.LIST_IMAGE_RESP}},
+                {'json': {'images': []}},
+            ],
         )
         ret = self.api.image_list(public=True)
         self.assertEqual([self.PUB_PROT, self.PUB_NOPROT], ret)
@@ -91,8 +95,65 @@ class TestImage(TestImageAPIv1):
         self.requests_mock.register_uri(
             'GET',
             FAKE_URL + '/v1/images/detail',
-            json={'images': self.LIST_IMAGE_RESP},
-            status_code=200,
+            [
+                {'json': {'images': self.LIST_IMAGE_RESP}},
+                {'json': {'images': []}},
+            ],
         )
         ret = self.api.image_list(private=True)
         self.assertEqual([self.NOPUB_PROT, self.NOPUB_NOPROT], ret)
+
+    def test_image_iter_pages(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/v1/images',
+            [
+                {'json': {'images': self.LIST_IMAGE_RESP[:2]}},
+                {'json': {'images': self.LIST_IMAGE_RESP[2:]}},
+                {'json': {'images': []}},
+            ],
+        )
+        ret = self.api.image_iter(page_size=2)
+        # nothing is fetched until the iterator is consumed
+        self.assertEqual(0, self.requests_mock.call_count)
+        self.assertEqual(self.LIST_IMAGE_RESP, list(ret))
+        self.assertEqual(3, self.requests_mock.call_count)
+        history = self.requests_mock.request_history
+        self.assertEqual({'limit': ['2']}, history[0].qs)
+        self.assertEqual({'limit': ['2'], 'marker': ['2']}, history[1].qs)
+        self.assertEqual({'limit': ['2'], 'marker': ['4']}, history[2].qs)
+
+    def test_image_iter_server_page_cap(self):
+        # The server returns fewer images per page than requested
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/v1/images',
+            [
+                {'json': {'images': self.LIST_IMAGE_RESP[:1]}},
+                {'json': {'images': self.LIST_IMAGE_RESP[1:]}},
+                {'json': {'images': []}},
+            ],
+        )
+        ret = self.api.image_list(page_size=2)
+        self.assertEqual(self.LIST_IMAGE_RESP, ret)
+        self.assertEqual(3, self.requests_mock.call_count)
+        self.assertEqual(
+            {'limit': ['2'], 'marker': ['1']},
+            self.requests_mock.request_history[1].qs)
+
+    def test_image_iter_limit(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/v1/images',
+            [
+                {'json': {'images': self.LIST_IMAGE_RESP[:2]}},
+                {'json': {'images': self.LIST_IMAGE_RESP[2:3]}},
+            ],
+        )
+        ret = self.api.image_list(limit=3, page_size=2)
+        self.assertEqual(self.LIST_IMAGE_RESP[:3], ret)
+        # the last page only asks for what is missing and nothing more
+        self.assertEqual(2, self.requests_mock.call_count)
+        self.assertEqual(
+            {'limit': ['1'], 'marker': ['2']},
+            self.requests_mock.request_history[1].qs)
@@ -96,3 +96,39 @@ class TestImage(TestImageAPIv2):
         )
         ret = self.api.image_list(public=True)
         self.assertEqual([self.NOPUB_PROT, self.NOPUB_NOPROT], ret)
+
+    def test_image_iter_next_link(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/v2/images',
+            [
+                {'json': {
+                    'images': self.LIST_IMAGE_RESP[:2],
+                    'next': '/v2/images?marker=2&visibility=public',
+                }},
+                {'json': {'images': self.LIST_IMAGE_RESP[2:]}},
+            ],
+        )
+        ret = self.api.image_list(public=True)
+        self.assertEqual(self.LIST_IMAGE_RESP, ret)
+        self.assertEqual(2, self.requests_mock.call_count)
+        self.assertEqual(
+            {'marker': ['2'], 'visibility': ['public']},
+            self.requests_mock.request_history[1].qs)
+
+    def test_image_iter_limit(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + '/v2/images',
+            json={
+                'images': self.LIST_IMAGE_RESP[:2],
+                'next': '/v2/images?marker=2',
+            },
+        )
+        ret = list(self.api.image_iter(limit=2))
+        self.assertEqual(self.LIST_IMAGE_RESP[:2], ret)
+        # the next page is not requested once the limit is reached
+        self.assertEqual(1, self.requests_mock.call_count)
+        self.assertEqual(
+            {'limit': ['2']},
+            self.requests_mock.request_history[0].qs)
@@ -176,7 +176,7 @@ class TestObject(TestObjectAPIv1):
     def setUp(self):
         super(TestObject, self).setUp()
 
-    @mock.patch('openstackclient.api.object_store_v1.io.open')
+    @mock.patch('openstackclient.api.object_store_v1.upload.open_file')
     def base_object_create(self, file_contents, mock_open):
         mock_open.read.return_value = file_contents
 
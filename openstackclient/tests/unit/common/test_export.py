@@ -0,0 +1,61 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import fixtures
+from osc_lib.cli import format_columns
+from osc_lib import exceptions
+
+from openstackclient.common import export
+from openstackclient.tests.unit import utils
+
+
+class TestWriteRows(utils.TestCase):
+
+    def setUp(self):
+        super(TestWriteRows, self).setUp()
+        self.path = self.useFixture(fixtures.TempDir()).join('rows')
+        self.rows = [
+            ('a', 1, format_columns.ListColumn(['x', 'y'])),
+            ('b', 2.5, None),
+        ]
+
+    def _read(self):
+        with open(self.path, newline='') as f:
+            return f.read()
+
+    def test_write_csv(self):
+        count = export.write_rows(
+            self.path, 'csv', ('Name', 'Count', 'Items'), iter(self.rows))
+
+        self.assertEqual(2, count)
+        self.assertEqual(
+            'Name,Count,Items\r\n'
+            'a,1,"[\'x\', \'y\']"\r\n'
+            'b,2.5,\r\n',
+            self._read())
+
+    def test_write_ndjson(self):
+        count = export.write_rows(
+            self.path, 'ndjson', ('Name', 'Count', 'Items'), iter(self.rows))
+
+        self.assertEqual(2, count)
+        self.assertEqual(
+            '{"Name": "a", "Count": 1, "Items": ["x", "y"]}\n'
+            '{"Name": "b", "Count": 2.5, "Items": null}\n',
+            self._read())
+
+    def test_write_error(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            export.write_rows,
+            self.path + '/missing/rows', 'csv', ('Name',), [])
@@ -0,0 +1,83 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import argparse
+from unittest import mock
+
+from openstackclient.common import parallel
+from openstackclient.tests.unit import utils
+
+
+def _square(x):
+    if x < 0:
+        raise ValueError(x)
+    return x * x
+
+
+class TestParallelRun(utils.TestCase):
+
+    def test_run_ordered(self):
+        result = list(parallel.run(_square, range(20), concurrency=4,
+                                   ordered=True))
+        self.assertEqual(
+            [(x, x * x, None) for x in range(20)],
+            result,
+        )
+
+    def test_run_unordered(self):
+        result = list(parallel.run(_square, range(20), concurrency=4))
+        self.assertEqual(
+            [(x, x * x, None) for x in range(20)],
+            sorted(result),
+        )
+
+    def test_run_serial(self):
+        result = list(parallel.run(_square, [1, -1], concurrency=1))
+        self.assertEqual((1, 1, None), result[0])
+        self.assertEqual(-1, result[1][0])
+        self.assertIsInstance(result[1][2], ValueError)
+
+    def test_run_exception(self):
+        result = dict(
+            (item, exc) for item, _, exc in
+            parallel.run(_square, [2, -2, 3], concurrency=3)
+        )
+        self.assertIsNone(result[2])
+        self.assertIsNone(result[3])
+        self.assertIsInstance(result[-2], ValueError)
+
+    def test_run_empty(self):
+        self.assertEqual([], list(parallel.run(_square, [])))
+
+    def test_concurrency_option(self):
+        parser = argparse.ArgumentParser()
+        parallel.add_concurrency_option(parser, default=3)
+        self.assertEqual(3, parser.parse_args([]).concurrency)
+        self.assertEqual(
+            10, parser.parse_args(['--concurrency', '10']).concurrency)
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.monotonic', return_value=100.0)
+    def test_run_rate_limited(self, monotonic_mock, sleep_mock):
+        result = list(parallel.run(_square, [1, 2, 3], concurrency=1,
+                                   rate=2))
+        self.assertEqual([(1, 1, None), (2, 4, None), (3, 9, None)], result)
+        # the clock does not move, so the calls are spaced out by sleeping
+        sleep_mock.assert_has_calls([mock.call(0.5), mock.call(1.0)])
+
+    def test_rate_limit_option(self):
+        parser = argparse.ArgumentParser()
+        parallel.add_rate_limit_option(parser)
+        self.assertIsNone(parser.parse_args([]).rate_limit)
+        self.assertEqual(
+            2.5, parser.parse_args(['--rate-limit', '2.5']).rate_limit)
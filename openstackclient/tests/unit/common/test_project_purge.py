@@ -10,8 +10,13 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
+import json
 from unittest import mock
 
+from cinderclient import exceptions as cinder_exceptions
+import fixtures
+from keystoneauth1 import exceptions as ks_exc
+from novaclient import exceptions as nova_exceptions
 from osc_lib import exceptions
 
 from openstackclient.common import project_purge
@@ -90,6 +95,17 @@ class TestProjectPurge(TestProjectPurgeInit):
         self.snapshots_mock.delete.return_value = None
         self.backups_mock.list.return_value = [self.backup]
         self.backups_mock.delete.return_value = None
+        # Deleted resources are gone right away
+        self.servers_mock.get.side_effect = nova_exceptions.NotFound(404)
+        self.volumes_mock.get.side_effect = cinder_exceptions.NotFound(404)
+        self.snapshots_mock.get.side_effect = (
+            cinder_exceptions.NotFound(404))
+        self.backups_mock.get.side_effect = cinder_exceptions.NotFound(404)
+        self.app.client_manager.network = mock.Mock()
+        for list_func in ('ips', 'ports', 'routers', 'subnets', 'networks',
+                          'security_groups'):
+            getattr(self.app.client_manager.network,
+                    list_func).return_value = []
 
         self.cmd = project_purge.ProjectPurge(self.app, None)
 
@@ -108,7 +124,7 @@ class TestProjectPurge(TestProjectPurgeInit):
             ('dry_run', False),
             ('keep_project', False),
             ('auth_project', False),
-            ('project', self.project.id),
+            ('project', [self.project.id]),
             ('project_domain', None),
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
@@ -144,7 +160,7 @@ class TestProjectPurge(TestProjectPurgeInit):
             ('dry_run', True),
             ('keep_project', False),
             ('auth_project', False),
-            ('project', self.project.id),
+            ('project', [self.project.id]),
             ('project_domain', None),
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
@@ -180,7 +196,7 @@ class TestProjectPurge(TestProjectPurgeInit):
             ('dry_run', False),
             ('keep_project', True),
             ('auth_project', False),
-            ('project', self.project.id),
+            ('project', [self.project.id]),
             ('project_domain', None),
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
@@ -254,14 +270,16 @@ class TestProjectPurge(TestProjectPurgeInit):
             ('dry_run', False),
             ('keep_project', False),
             ('auth_project', False),
-            ('project', self.project.id),
+            ('project', [self.project.id]),
             ('project_domain', None),
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
-        result = self.cmd.take_action(parsed_args)
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 1 projects failed to be purged', str(e))
         self.projects_mock.get.assert_called_once_with(self.project.id)
-        self.projects_mock.delete.assert_called_once_with(self.project.id)
+        self.projects_mock.delete.assert_not_called()
         self.servers_mock.list.assert_called_once_with(
             search_opts={'tenant_id': self.project.id, 'all_tenants': True})
         kwargs = {'filters': {'owner': self.project.id}}
@@ -279,8 +297,11 @@ class TestProjectPurge(TestProjectPurgeInit):
         self.volumes_mock.force_delete.assert_called_once_with(self.volume.id)
         self.snapshots_mock.delete.assert_called_once_with(self.snapshot.id)
         self.backups_mock.delete.assert_called_once_with(self.backup.id)
-        mock_error.assert_called_with("1 of 1 servers failed to delete.")
-        self.assertIsNone(result)
+        mock_error.assert_any_call("1 of 1 servers failed to delete.")
+        mock_error.assert_any_call(
+            'Not deleting project %(project)s: %(error)s',
+            {'project': self.project.id,
+             'error': '1 resources failed to be deleted'})
 
     def test_project_purge_with_force_delete_backup(self):
         self.backups_mock.delete.side_effect = [exceptions.CommandError, None]
@@ -291,7 +312,7 @@ class TestProjectPurge(TestProjectPurgeInit):
             ('dry_run', False),
             ('keep_project', False),
             ('auth_project', False),
-            ('project', self.project.id),
+            ('project', [self.project.id]),
             ('project_domain', None),
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
@@ -318,3 +339,334 @@ class TestProjectPurge(TestProjectPurgeInit):
         self.assertEqual(2, self.backups_mock.delete.call_count)
         self.backups_mock.delete.assert_called_with(self.backup.id, force=True)
         self.assertIsNone(result)
+
+    @mock.patch.object(project_purge.LOG, 'error')
+    def test_project_purge_with_volume_error_deleting(self, mock_error):
+        self.volumes_mock.get.side_effect = None
+        self.volumes_mock.get.return_value = (
+            volume_fakes.FakeVolume.create_one_volume(
+                attrs={'id': self.volume.id, 'status': 'error_deleting'}))
+        arglist = [
+            '--project', self.project.id,
+        ]
+        verifylist = [
+            ('project', [self.project.id]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+        self.volumes_mock.get.assert_called_once_with(self.volume.id)
+        mock_error.assert_any_call("1 of 1 volumes failed to delete.")
+        self.projects_mock.delete.assert_not_called()
+
+    @mock.patch.object(project_purge.LOG, 'error')
+    def test_project_purge_list_error(self, mock_error):
+        self.volumes_mock.list.side_effect = cinder_exceptions.Forbidden(403)
+        path = self.useFixture(fixtures.TempDir()).join('report.json')
+        arglist = [
+            '--project', self.project.id,
+            '--report', path,
+        ]
+        verifylist = [
+            ('project', [self.project.id]),
+            ('report', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 1 projects failed to be purged', str(e))
+        self.servers_mock.delete.assert_called_once_with(self.server.id)
+        self.volumes_mock.force_delete.assert_not_called()
+        self.projects_mock.delete.assert_not_called()
+        mock_error.assert_any_call(
+            'Not deleting project %(project)s: %(error)s',
+            {'project': self.project.id, 'error': 'unable to list volumes'})
+        self.assertIn(
+            '%s: unable to list volumes\n' % self.project.id,
+            self.app.stdout.make_string())
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual({
+            'listed': [],
+            'deleted': [],
+            'failed': {},
+            'error': str(cinder_exceptions.Forbidden(403)),
+        }, report['projects'][0]['resources']['volume'])
+
+    def test_project_purge_endpoint_not_found(self):
+        self.volumes_mock.list.side_effect = ks_exc.EndpointNotFound()
+        arglist = [
+            '--project', self.project.id,
+        ]
+        verifylist = [
+            ('project', [self.project.id]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.volumes_mock.force_delete.assert_not_called()
+        self.projects_mock.delete.assert_called_once_with(self.project.id)
+
+    def test_project_purge_network_list_throttled(self):
+        throttled = []
+        paged = []
+        call = project_purge.Throttle.call
+
+        def _call(throttle, service, func, *args, **kwargs):
+            throttled.append(service)
+            try:
+                return call(throttle, service, func, *args, **kwargs)
+            finally:
+                throttled.pop()
+
+        def _ips(**kwargs):
+            # The pages of a listing are only fetched once it is iterated
+            paged.append(list(throttled))
+            return
+            yield
+
+        self.app.client_manager.network.ips.side_effect = _ips
+        arglist = [
+            '--project', self.project.id,
+        ]
+        verifylist = [
+            ('project', [self.project.id]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(project_purge.Throttle, 'call', _call):
+            self.cmd.take_action(parsed_args)
+
+        self.assertEqual([['network']], paged)
+
+    def test_project_purge_network(self):
+        calls = []
+
+        def _record(name):
+            return lambda *args, **kwargs: calls.append((name,) + args)
+
+        network_client = mock.Mock()
+        self.app.client_manager.network = network_client
+        fip = mock.Mock(id='fip-id')
+        port = mock.Mock(id='port-id', device_owner='compute:nova')
+        dhcp_port = mock.Mock(id='dhcp-id', device_owner='network:dhcp')
+        interface = mock.Mock(
+            id='interface-id', device_owner='network:router_interface',
+            device_id='router-id')
+        network_client.ips.return_value = [fip]
+        network_client.ports.return_value = [port, dhcp_port, interface]
+        network_client.routers.return_value = [mock.Mock(id='router-id')]
+        network_client.subnets.return_value = [mock.Mock(id='subnet-id')]
+        network_client.networks.return_value = [mock.Mock(id='network-id')]
+        network_client.security_groups.return_value = [
+            mock.Mock(id='default-id'), mock.Mock(id='sg-id')]
+        network_client.security_groups.return_value[0].name = 'default'
+        self.servers_mock.delete.side_effect = _record('server')
+        self.volumes_mock.force_delete.side_effect = _record('volume')
+        network_client.delete_ip.side_effect = _record('floating IP')
+        network_client.delete_port.side_effect = _record('port')
+        network_client.remove_interface_from_router.side_effect = (
+            _record('router interface'))
+        network_client.delete_router.side_effect = _record('router')
+        network_client.delete_subnet.side_effect = _record('subnet')
+        network_client.delete_network.side_effect = _record('network')
+        arglist = [
+            '--keep-project',
+            '--project', self.project.id,
+        ]
+        verifylist = [
+            ('keep_project', True),
+            ('project', [self.project.id]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        # Each layer is deleted after the one it depends on
+        names = [c[0] for c in calls]
+        self.assertLess(names.index('server'), names.index('floating IP'))
+        self.assertLess(names.index('server'), names.index('volume'))
+        self.assertEqual(
+            ['port', 'router interface', 'router', 'network'],
+            [n for n in names if n in
+             ('port', 'router interface', 'router', 'network')])
+        self.assertLess(
+            names.index('router interface'), names.index('subnet'))
+        network_client.ips.assert_called_once_with(
+            project_id=self.project.id)
+        network_client.delete_port.assert_called_once_with(port.id)
+        network_client.remove_interface_from_router.assert_called_once_with(
+            'router-id', port_id=interface.id)
+        network_client.delete_network.assert_called_once_with('network-id')
+        network_client.delete_security_group.assert_called_once_with('sg-id')
+        self.projects_mock.delete.assert_not_called()
+
+    def test_project_purge_multiple_projects_report(self):
+        projects = identity_fakes.FakeProject.create_projects(count=2)
+        self.projects_mock.get.side_effect = projects
+        path = self.useFixture(fixtures.TempDir()).join('report.json')
+        arglist = [
+            '--project', projects[0].id,
+            '--project', projects[1].id,
+            '--report', path,
+        ]
+        verifylist = [
+            ('project', [p.id for p in projects]),
+            ('report', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.projects_mock.delete.assert_has_calls(
+            [mock.call(p.id) for p in projects], any_order=True)
+        self.assertEqual(2, self.servers_mock.delete.call_count)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertFalse(report['dry_run'])
+        self.assertEqual(
+            sorted(p.id for p in projects),
+            sorted(p['id'] for p in report['projects']))
+        self.assertEqual({
+            'listed': [self.volume.id],
+            'deleted': [self.volume.id],
+            'failed': {},
+        }, report['projects'][0]['resources']['volume'])
+        self.assertTrue(report['projects'][0]['deleted'])
+        self.assertIn(
+            '%s: 1 of 1 servers deleted\n' % projects[1].id,
+            self.app.stdout.make_string())
+
+    def test_project_purge_project_delete_error_report(self):
+        self.projects_mock.delete.side_effect = exceptions.CommandError(
+            'forbidden')
+        path = self.useFixture(fixtures.TempDir()).join('report.json')
+        arglist = [
+            '--project', self.project.id,
+            '--report', path,
+        ]
+        verifylist = [
+            ('project', [self.project.id]),
+            ('report', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 1 projects failed to be purged', str(e))
+        with open(path) as f:
+            report = json.load(f)
+        entry = report['projects'][0]
+        self.assertEqual('forbidden', entry['error'])
+        self.assertFalse(entry['deleted'])
+        self.assertEqual(
+            [self.server.id], entry['resources']['server']['deleted'])
+
+    def test_project_purge_projects_from(self):
+        path = self.useFixture(fixtures.TempDir()).join('projects')
+        with open(path, 'w') as f:
+            f.write('# decommissioned\n%s\n\n' % self.project.name)
+        arglist = [
+            '--dry-run',
+            '--projects-from', path,
+        ]
+        verifylist = [
+            ('dry_run', True),
+            ('projects_from', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.projects_mock.get.assert_called_once_with(self.project.name)
+        self.servers_mock.delete.assert_not_called()
+        self.assertIn(
+            '%s: 1 servers\n' % self.project.id,
+            self.app.stdout.make_string())
+
+    def test_project_purge_domain(self):
+        domain = identity_fakes.FakeDomain.create_one_domain()
+        self.domains_mock.get.return_value = domain
+        self.projects_mock.list.return_value = [self.project]
+        arglist = [
+            '--domain', domain.id,
+        ]
+        verifylist = [
+            ('domain', domain.id),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.projects_mock.list.assert_called_once_with(domain=domain.id)
+        self.projects_mock.delete.assert_called_once_with(self.project.id)
+
+    def test_project_purge_project_not_found(self):
+        self.projects_mock.get.side_effect = [
+            self.project, exceptions.NotFound(404)]
+        self.projects_mock.find.side_effect = exceptions.NotFound(404)
+        arglist = [
+            '--project', self.project.id,
+            '--project', 'unexist_project',
+        ]
+        verifylist = [
+            ('project', [self.project.id, 'unexist_project']),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 2 projects could not be found', str(e))
+        self.servers_mock.list.assert_not_called()
+        self.projects_mock.delete.assert_not_called()
+
+
+class TestGetLayers(tests_utils.TestCase):
+
+    def _resource_type(self, name, after=()):
+        return project_purge.ResourceType(
+            name, 'compute', mock.Mock(), mock.Mock(), after=after)
+
+    def test_get_layers(self):
+        server = self._resource_type('server')
+        port = self._resource_type('port', after=('server',))
+        network = self._resource_type('network', after=('subnet', 'port'))
+        volume = self._resource_type('volume', after=('server',))
+
+        self.assertEqual(
+            [[server], [port, volume], [network]],
+            project_purge.get_layers([network, port, server, volume]))
+
+    def test_get_layers_cycle(self):
+        self.assertRaises(ValueError, project_purge.get_layers, [
+            self._resource_type('port', after=('network',)),
+            self._resource_type('network', after=('port',)),
+        ])
+
+
+class TestThrottle(tests_utils.TestCase):
+
+    @mock.patch.object(project_purge.parallel, 'RateLimiter')
+    def test_throttle_rate_per_service(self, limiter_mock):
+        throttle = project_purge.Throttle(concurrency=2, rate=5)
+        func = mock.Mock(return_value='result')
+
+        self.assertEqual('result', throttle.call('compute', func, 'id'))
+        throttle.wrap('compute', func)('id')
+        throttle.call('volume', func, 'id')
+
+        func.assert_called_with('id')
+        self.assertEqual(
+            [mock.call(5), mock.call(5)], limiter_mock.call_args_list)
+        self.assertEqual(3, limiter_mock.return_value.wait.call_count)
+
+    @mock.patch.object(project_purge.parallel, 'RateLimiter')
+    def test_throttle_no_rate(self, limiter_mock):
+        throttle = project_purge.Throttle()
+
+        self.assertEqual(1, throttle.call('compute', len, 'a'))
+        limiter_mock.assert_not_called()
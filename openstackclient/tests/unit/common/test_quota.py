@@ -11,8 +11,11 @@
 #   under the License.
 
 import copy
+import json
 from unittest import mock
 
+import fixtures
+from keystoneauth1 import exceptions as ks_exc
 from osc_lib import exceptions
 
 from openstackclient.common import quota
@@ -197,6 +200,16 @@ class TestQuotaList(TestQuota):
 
         self.cmd = quota.ListQuota(self.app, None)
 
+    def _by_project(self, quotas):
+        # Quotas are fetched concurrently, match them with their project
+        quotas = dict(zip((p.id for p in self.projects), quotas))
+
+        def get(project_id, *args, **kwargs):
+            if isinstance(quotas[project_id], Exception):
+                raise quotas[project_id]
+            return quotas[project_id]
+        return get
+
     @staticmethod
     def _get_detailed_reference_data(quota):
         reference_data = []
@@ -279,7 +292,7 @@ class TestQuotaList(TestQuota):
     def test_quota_list_compute(self):
         # Two projects with non-default quotas
         self.compute.quotas.get = mock.Mock(
-            side_effect=self.compute_quotas,
+            side_effect=self._by_project(self.compute_quotas),
         )
 
         arglist = [
@@ -300,10 +313,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_compute_default(self):
         # One of the projects is at defaults
         self.compute.quotas.get = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.compute_quotas[0],
                 compute_fakes.FakeQuota.create_one_default_comp_quota(),
-            ],
+            ]),
         )
 
         arglist = [
@@ -324,10 +337,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_compute_no_project_not_found(self):
         # Make one of the projects disappear
         self.compute.quotas.get = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.compute_quotas[0],
                 exceptions.NotFound("NotFound"),
-            ],
+            ]),
         )
 
         arglist = [
@@ -348,10 +361,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_compute_no_project_4xx(self):
         # Make one of the projects disappear
         self.compute.quotas.get = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.compute_quotas[0],
                 exceptions.BadRequest("Bad request"),
-            ],
+            ]),
         )
 
         arglist = [
@@ -372,10 +385,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_compute_no_project_5xx(self):
         # Make one of the projects disappear
         self.compute.quotas.get = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.compute_quotas[0],
                 exceptions.HTTPNotImplemented("Not implemented??"),
-            ],
+            ]),
         )
 
         arglist = [
@@ -386,16 +399,18 @@ class TestQuotaList(TestQuota):
         ]
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
+        # Rows are fetched as they are displayed
+        columns, data = self.cmd.take_action(parsed_args)
         self.assertRaises(
             exceptions.HTTPNotImplemented,
-            self.cmd.take_action,
-            parsed_args,
+            list,
+            data,
         )
 
     def test_quota_list_compute_by_project(self):
         # Two projects with non-default quotas
         self.compute.quotas.get = mock.Mock(
-            side_effect=self.compute_quotas,
+            side_effect=self._by_project(self.compute_quotas),
         )
 
         arglist = [
@@ -415,10 +430,33 @@ class TestQuotaList(TestQuota):
         self.assertEqual(self.compute_reference_data, ret_quotas[0])
         self.assertEqual(1, len(ret_quotas))
 
+    def test_quota_list_compute_defaults_once(self):
+        self.compute.quotas.get = mock.Mock(
+            side_effect=self._by_project(self.compute_quotas),
+        )
+
+        arglist = [
+            '--compute',
+            '--concurrency', '2',
+        ]
+        verifylist = [
+            ('compute', True),
+            ('concurrency', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            [p.id for p in self.projects], [row[0] for row in data])
+        self.compute.quotas.defaults.assert_called_once_with(
+            self.projects[0].id)
+        self.assertEqual(2, self.compute.quotas.get.call_count)
+
     def test_quota_list_network(self):
         # Two projects with non-default quotas
         self.network.get_quota = mock.Mock(
-            side_effect=self.network_quotas,
+            side_effect=self._by_project(self.network_quotas),
         )
 
         arglist = [
@@ -439,10 +477,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_network_default(self):
         # Two projects with non-default quotas
         self.network.get_quota = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.network_quotas[0],
                 network_fakes.FakeQuota.create_one_default_net_quota(),
-            ],
+            ]),
         )
 
         arglist = [
@@ -463,10 +501,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_network_no_project(self):
         # Two projects with non-default quotas
         self.network.get_quota = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.network_quotas[0],
                 exceptions.NotFound("NotFound"),
-            ],
+            ]),
         )
 
         arglist = [
@@ -487,7 +525,7 @@ class TestQuotaList(TestQuota):
     def test_quota_list_network_by_project(self):
         # Two projects with non-default quotas
         self.network.get_quota = mock.Mock(
-            side_effect=self.network_quotas,
+            side_effect=self._by_project(self.network_quotas),
         )
 
         arglist = [
@@ -510,7 +548,7 @@ class TestQuotaList(TestQuota):
     def test_quota_list_volume(self):
         # Two projects with non-default quotas
         self.volume.quotas.get = mock.Mock(
-            side_effect=self.volume_quotas,
+            side_effect=self._by_project(self.volume_quotas),
         )
 
         arglist = [
@@ -531,10 +569,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_volume_default(self):
         # Two projects with non-default quotas
         self.volume.quotas.get = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.volume_quotas[0],
                 volume_fakes.FakeQuota.create_one_default_vol_quota(),
-            ],
+            ]),
         )
 
         arglist = [
@@ -555,10 +593,10 @@ class TestQuotaList(TestQuota):
     def test_quota_list_volume_no_project(self):
         # Two projects with non-default quotas
         self.volume.quotas.get = mock.Mock(
-            side_effect=[
+            side_effect=self._by_project([
                 self.volume_quotas[0],
                 volume_fakes.FakeQuota.create_one_default_vol_quota(),
-            ],
+            ]),
         )
 
         arglist = [
@@ -579,7 +617,7 @@ class TestQuotaList(TestQuota):
     def test_quota_list_volume_by_project(self):
         # Two projects with non-default quotas
         self.volume.quotas.get = mock.Mock(
-            side_effect=self.volume_quotas,
+            side_effect=self._by_project(self.volume_quotas),
         )
 
         arglist = [
@@ -600,6 +638,203 @@ class TestQuotaList(TestQuota):
         self.assertEqual(1, len(ret_quotas))
 
 
+class TestQuotaReport(TestQuota):
+    """Test cases for quota report command"""
+
+    column_headers = (
+        'Project ID',
+        'Service',
+        'Resource',
+        'In Use',
+        'Reserved',
+        'Limit',
+        'Headroom',
+        'Utilization (%)',
+    )
+
+    def setUp(self):
+        super(TestQuotaReport, self).setUp()
+
+        self.compute_quotas_mock.get.return_value = (
+            compute_fakes.FakeQuota.create_one_comp_detailed_quota(
+                attrs={'cores': {'reserved': 2, 'in_use': 8, 'limit': 20},
+                       'ram': {'reserved': 0, 'in_use': 0, 'limit': -1}}))
+        self.volume_quotas_mock.get.return_value = fakes.FakeResource(
+            info={
+                'id': self.projects[0].id,
+                'volumes': {'reserved': 0, 'in_use': 9, 'limit': 10,
+                            'allocated': 0},
+            },
+            loaded=True,
+        )
+        self.network = self.app.client_manager.network
+        self.network.get_quota = mock.Mock(
+            return_value=network_fakes.FakeQuota.
+            create_one_net_detailed_quota(
+                attrs={'ports': {'used': 1, 'reserved': 0, 'limit': 11}}))
+
+        self.cmd = quota.ReportQuota(self.app, None)
+
+    def _get_row(self, data, service, resource):
+        for row in data:
+            if row[1] == service and row[2] == resource:
+                return row
+
+    def test_quota_report(self):
+        arglist = [
+            '--project', self.projects[0].id,
+        ]
+        verifylist = [
+            ('project', [self.projects[0].id]),
+            ('all_projects', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = list(data)
+
+        self.assertEqual(self.column_headers, columns)
+        self.compute_quotas_mock.get.assert_called_once_with(
+            self.projects[0].id, detail=True)
+        self.volume_quotas_mock.get.assert_called_once_with(
+            self.projects[0].id, usage=True)
+        self.network.get_quota.assert_called_once_with(
+            self.projects[0].id, details=True)
+        self.assertEqual(
+            (self.projects[0].id, 'compute', 'cores', 8, 2, 20, 10, 50.0),
+            self._get_row(data, 'compute', 'cores'))
+        self.assertEqual(
+            (self.projects[0].id, 'compute', 'ram', 0, 0, -1, None, None),
+            self._get_row(data, 'compute', 'ram'))
+        self.assertEqual(
+            (self.projects[0].id, 'volume', 'volumes', 9, 0, 10, 1, 90.0),
+            self._get_row(data, 'volume', 'volumes'))
+        self.assertEqual(
+            (self.projects[0].id, 'network', 'ports', 1, 0, 11, 10, 9.1),
+            self._get_row(data, 'network', 'ports'))
+        self.assertEqual(11 + 1 + 9, len(data))
+
+    def test_quota_report_sort_by_headroom(self):
+        self.projects_mock.list.return_value = self.projects
+        self.compute_quotas_mock.get.return_value = (
+            compute_fakes.FakeQuota.create_one_comp_detailed_quota(
+                attrs={'cores': {'reserved': 0, 'in_use': 950,
+                                 'limit': 1000},
+                       'instances': {'reserved': 0, 'in_use': 0,
+                                     'limit': 0},
+                       'ram': {'reserved': 0, 'in_use': 0, 'limit': -1}}))
+        arglist = [
+            '--all-projects',
+            '--compute',
+            '--volume',
+            '--sort-by-headroom',
+        ]
+        verifylist = [
+            ('all_projects', True),
+            ('sort_by_headroom', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = list(data)
+
+        self.network.get_quota.assert_not_called()
+        self.assertEqual(2, self.compute_quotas_mock.get.call_count)
+        # Sorted by utilization, not by the quota left
+        self.assertEqual(
+            [('compute', 'instances', 0, None)] * 2 +
+            [('compute', 'cores', 50, 95.0)] * 2 +
+            [('volume', 'volumes', 1, 90.0)] * 2,
+            [(row[1], row[2], row[6], row[7]) for row in data[:6]])
+        self.assertEqual(
+            [('compute', 'ram', None, None)] * 2,
+            [(row[1], row[2], row[6], row[7]) for row in data[-2:]])
+
+    def test_quota_report_output_file(self):
+        path = self.useFixture(fixtures.TempDir()).join('quotas.ndjson')
+        arglist = [
+            '--volume',
+            '--output-file', path,
+            '--output-format', 'ndjson',
+        ]
+        verifylist = [
+            ('volume', True),
+            ('output_file', path),
+            ('output_format', 'ndjson'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([], list(data))
+        self.volume_quotas_mock.get.assert_called_once_with(
+            identity_fakes.project_id, usage=True)
+        with open(path) as f:
+            self.assertEqual([{
+                'Project ID': identity_fakes.project_id,
+                'Service': 'volume',
+                'Resource': 'volumes',
+                'In Use': 9,
+                'Reserved': 0,
+                'Limit': 10,
+                'Headroom': 1,
+                'Utilization (%)': 90.0,
+            }], [json.loads(line) for line in f])
+
+    @mock.patch.object(quota.LOG, 'error')
+    def test_quota_report_service_error(self, mock_error):
+        self.compute_quotas_mock.get.side_effect = (
+            exceptions.HTTPNotImplemented("Not implemented??"))
+        arglist = []
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = list(data)
+
+        self.assertEqual(
+            set(['volume', 'network']), set(row[1] for row in data))
+        self.assertEqual(1, mock_error.call_count)
+        self.assertEqual(
+            'Failed to get 1 of 3 service quotas', self.cmd.error)
+
+    def test_quota_report_service_error_output_file(self):
+        self.volume_quotas_mock.get.side_effect = (
+            exceptions.HTTPNotImplemented("Not implemented??"))
+        path = self.useFixture(fixtures.TempDir()).join('quotas.csv')
+        arglist = [
+            '--compute',
+            '--volume',
+            '--output-file', path,
+        ]
+        verifylist = [
+            ('output_file', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.run, parsed_args)
+
+        self.assertEqual('Failed to get 1 of 2 service quotas', str(e))
+        # The quotas which could be fetched are written first
+        with open(path) as f:
+            self.assertEqual(1 + 11, len(f.readlines()))
+
+    def test_quota_report_endpoint_not_found(self):
+        self.compute_quotas_mock.get.side_effect = (
+            ks_exc.EndpointNotFound())
+        arglist = []
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = list(data)
+
+        self.assertEqual(
+            set(['volume', 'network']), set(row[1] for row in data))
+        self.assertIsNone(self.cmd.error)
+
+
 class TestQuotaSet(TestQuota):
 
     def setUp(self):
@@ -950,6 +1185,143 @@ class TestQuotaSet(TestQuota):
         )
         self.assertIsNone(result)
 
+    def _set_current_quotas(self):
+        self.projects_mock.list.return_value = self.projects
+        self.compute_quotas_mock.get.return_value = fakes.FakeResource(
+            info={'cores': 20, 'ram': 51200, 'instances': 10}, loaded=True)
+        self.volume_quotas_mock.get.return_value = fakes.FakeResource(
+            info={'volumes': 10, 'gigabytes': 1000}, loaded=True)
+        self.network_mock.get_quota = mock.Mock(
+            return_value={'ports': 50, 'subnets': 10})
+
+    def test_quota_set_from_file(self):
+        self._set_current_quotas()
+        path = self.useFixture(fixtures.TempDir()).join('quotas.yaml')
+        with open(path, 'w') as f:
+            f.write(
+                '%s:\n'
+                '  cores: 40\n'
+                '  ram: 51200\n'
+                '  volumes: 10\n'
+                '  ports: 100\n'
+                '%s:\n'
+                '  cores: 20\n'
+                '  subnets: 10\n' % (
+                    self.projects[0].name, self.projects[1].id))
+        arglist = [
+            '--from-file', path,
+        ]
+        verifylist = [
+            ('from_file', path),
+            ('project', None),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        # Projects are resolved with a single listing
+        self.projects_mock.list.assert_called_once_with()
+        self.projects_mock.get.assert_not_called()
+        # Only the quotas changing are updated
+        self.compute_quotas_mock.update.assert_called_once_with(
+            self.projects[0].id, cores=40)
+        self.volume_quotas_mock.update.assert_not_called()
+        self.network_mock.update_quota.assert_called_once_with(
+            self.projects[0].id, port=100)
+        self.assertEqual(
+            'Updated the quotas of 1 of 2 projects\n',
+            self.app.stdout.make_string())
+        self.assertIsNone(result)
+
+    def test_quota_set_from_csv_file(self):
+        self._set_current_quotas()
+        path = self.useFixture(fixtures.TempDir()).join('quotas.csv')
+        with open(path, 'w') as f:
+            f.write('project,instances,gigabytes\n'
+                    'unlisted-project,20,\n')
+        self.projects_mock.get.side_effect = None
+        self.projects_mock.get.return_value = self.projects[1]
+        arglist = [
+            '--force',
+            '--from-file', path,
+        ]
+        verifylist = [
+            ('force', True),
+            ('from_file', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.projects_mock.get.assert_called_once_with('unlisted-project')
+        self.compute_quotas_mock.update.assert_called_once_with(
+            self.projects[1].id, force=True, instances=20)
+        self.volume_quotas_mock.update.assert_not_called()
+
+    def test_quota_set_from_file_unknown_quota(self):
+        path = self.useFixture(fixtures.TempDir()).join('quotas.yaml')
+        with open(path, 'w') as f:
+            f.write('%s:\n  carrots: 3\n' % self.projects[0].id)
+        arglist = [
+            '--from-file', path,
+        ]
+        verifylist = [
+            ('from_file', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual(
+            'Unknown quota carrots for project %s' % self.projects[0].id,
+            str(e))
+        self.compute_quotas_mock.update.assert_not_called()
+
+    def test_quota_set_from_file_quota_options(self):
+        path = self.useFixture(fixtures.TempDir()).join('quotas.yaml')
+        with open(path, 'w') as f:
+            f.write('%s:\n  cores: 3\n' % self.projects[0].id)
+        arglist = [
+            '--from-file', path,
+            '--cores', '10',
+            '--volume-type', 'ssd',
+        ]
+        verifylist = [
+            ('from_file', path),
+            ('cores', 10),
+            ('volume_type', 'ssd'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual(
+            '--cores, --volume-type cannot be used with --from-file', str(e))
+        self.compute_quotas_mock.update.assert_not_called()
+
+    @mock.patch.object(quota.LOG, 'error')
+    def test_quota_set_from_file_update_error(self, mock_error):
+        self._set_current_quotas()
+        self.compute_quotas_mock.update.side_effect = (
+            exceptions.BadRequest('Bad request'))
+        path = self.useFixture(fixtures.TempDir()).join('quotas.yaml')
+        with open(path, 'w') as f:
+            f.write('%s:\n  cores: 4\n  volumes: 5\n' % self.projects[0].id)
+        arglist = [
+            '--from-file', path,
+        ]
+        verifylist = [
+            ('from_file', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 2 quota updates failed', str(e))
+        self.volume_quotas_mock.update.assert_called_once_with(
+            self.projects[0].id, volumes=5)
+        self.assertEqual(1, mock_error.call_count)
+
 
 class TestQuotaShow(TestQuota):
 
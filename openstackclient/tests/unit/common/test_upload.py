@@ -0,0 +1,87 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import os
+import tempfile
+
+from requests import utils as requests_utils
+
+from openstackclient.common import progressbar
+from openstackclient.common import upload
+from openstackclient.tests.unit import utils
+
+
+class TestMappedFile(utils.TestCase):
+
+    def setUp(self):
+        super(TestMappedFile, self).setUp()
+        f = tempfile.NamedTemporaryFile(delete=False)
+        f.write(b'0123456789')
+        f.close()
+        self.path = f.name
+        self.addCleanup(os.unlink, self.path)
+
+    def test_read(self):
+        with upload.open_file(self.path) as f:
+            self.assertIsInstance(f, upload.MappedFile)
+            self.assertEqual(10, len(f))
+            chunk = f.read(4)
+            self.assertIsInstance(chunk, memoryview)
+            self.assertEqual(b'0123', chunk)
+            self.assertEqual(4, f.tell())
+            self.assertEqual(b'456789', f.read())
+            self.assertEqual(b'', f.read(4))
+        self.assertTrue(f.closed)
+        # slices handed out stay valid after the file is closed
+        self.assertEqual(b'0123', chunk.tobytes())
+        self.assertRaises(ValueError, f.read)
+
+    def test_seek(self):
+        with upload.open_file(self.path) as f:
+            f.read()
+            self.assertEqual(0, f.seek(0))
+            self.assertEqual(b'01', f.read(2))
+            self.assertEqual(8, f.seek(-2, os.SEEK_END))
+            self.assertEqual(b'89', f.read())
+            self.assertEqual(7, f.seek(-3, os.SEEK_CUR))
+
+    def test_range(self):
+        with upload.open_file(self.path, offset=2, length=5) as f:
+            self.assertEqual(5, len(f))
+            self.assertEqual(b'23456', b''.join(f))
+            f.seek(1)
+            buf = bytearray(10)
+            self.assertEqual(4, f.readinto(buf))
+            self.assertEqual(b'3456', buf[:4])
+
+    def test_empty_file(self):
+        f = tempfile.NamedTemporaryFile(delete=False)
+        f.close()
+        self.addCleanup(os.unlink, f.name)
+        with upload.open_file(f.name) as f:
+            self.assertNotIsInstance(f, upload.MappedFile)
+            self.assertEqual(b'', f.read())
+
+    def test_get_length(self):
+        with upload.open_file(self.path) as f:
+            self.assertEqual(10, upload.get_length(f))
+        with open(self.path, 'rb') as f:
+            self.assertEqual(10, upload.get_length(f))
+        self.assertEqual(0, upload.get_length(iter([b'data'])))
+
+    def test_wrapped_length(self):
+        with upload.open_file(self.path) as f:
+            wrapper = progressbar.VerboseFileWrapper(f, 10)
+            wrapper.read(4)
+            # The HTTP layer sends the rest of the body with a known length
+            self.assertEqual(6, requests_utils.super_len(wrapper))
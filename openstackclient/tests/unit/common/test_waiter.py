@@ -0,0 +1,162 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import argparse
+from unittest import mock
+
+from openstackclient.common import waiter
+from openstackclient.tests.unit import fakes
+from openstackclient.tests.unit import utils
+
+
+def _res(status, **attrs):
+    attrs['status'] = status
+    return fakes.FakeResource(info=attrs)
+
+
+@mock.patch('time.sleep')
+class TestStatusWaiter(utils.TestCase):
+
+    def test_wait_success(self, sleep_mock):
+        polls = [
+            {'a': _res('BUILD'), 'b': _res('BUILD')},
+            {'a': _res('ACTIVE')},
+            {},
+            {'b': _res('ACTIVE')},
+        ]
+        fetch = mock.Mock(side_effect=polls)
+        callback = mock.Mock()
+        w = waiter.StatusWaiter(fetch, poll_interval=1, callback=callback)
+
+        self.assertTrue(w.wait(['a', 'b']))
+
+        self.assertEqual({'a', 'b'}, w.succeeded)
+        self.assertEqual({}, w.failed)
+        # finished resources are not polled again
+        fetch.assert_has_calls([
+            mock.call(['a', 'b']),
+            mock.call(['a', 'b']),
+            mock.call(['b']),
+            mock.call(['b']),
+        ])
+        self.assertEqual(4, callback.call_count)
+        self.assertEqual((2, 2), w.progress)
+        # back off while nothing changes
+        delays = [c[0][0] for c in sleep_mock.call_args_list]
+        self.assertEqual(3, len(delays))
+        self.assertGreater(delays[2], delays[1])
+
+    def test_watch(self, sleep_mock):
+        polls = [
+            {'a': _res('BUILD'), 'b': _res('ERROR'), 'c': _res('BUILD')},
+            {'c': _res('ACTIVE')},
+            {'a': _res('ACTIVE')},
+        ]
+        w = waiter.StatusWaiter(mock.Mock(side_effect=polls))
+
+        # resources are reported in the order in which they finish
+        self.assertEqual(['b', 'c', 'a'], list(w.watch(['a', 'b', 'c'])))
+        self.assertEqual({'b': 'error'}, w.failed)
+
+    def test_watch_many(self, sleep_mock):
+        res_ids = ['res-%d' % i for i in range(2000)]
+
+        def fetch(pending):
+            # Finish one resource in two per poll
+            return {res_id: _res('active') for res_id in pending[::2]}
+
+        w = waiter.StatusWaiter(fetch)
+
+        self.assertEqual(set(res_ids), set(w.watch(res_ids)))
+        self.assertEqual(set(res_ids), w.succeeded)
+        self.assertEqual([], w.pending)
+
+    def test_wait_error(self, sleep_mock):
+        fetch = mock.Mock(return_value={
+            'a': _res('active'), 'b': _res('error'), 'c': None,
+        })
+        w = waiter.StatusWaiter(fetch)
+
+        self.assertFalse(w.wait(['a', 'b', 'c']))
+
+        self.assertEqual({'a'}, w.succeeded)
+        self.assertEqual({'b': 'error', 'c': 'not found'}, w.failed)
+        sleep_mock.assert_not_called()
+
+    @mock.patch('time.time', side_effect=[0, 0, 5, 11])
+    def test_wait_timeout(self, time_mock, sleep_mock):
+        fetch = mock.Mock(return_value={'a': _res('build')})
+        w = waiter.StatusWaiter(fetch, poll_interval=5, timeout=10)
+
+        self.assertFalse(w.wait(['a']))
+
+        self.assertEqual({'a': 'timeout'}, w.failed)
+        self.assertEqual(2, fetch.call_count)
+
+
+@mock.patch('time.sleep')
+class TestDeleteWaiter(utils.TestCase):
+
+    def test_wait_delete(self, sleep_mock):
+        fetch = mock.Mock(side_effect=[
+            {'a': _res('deleting'), 'b': None},
+            {'a': _res('error_deleting')},
+        ])
+        w = waiter.DeleteWaiter(fetch, error_status=['error_deleting'])
+
+        self.assertFalse(w.wait(['a', 'b']))
+
+        self.assertEqual({'b'}, w.succeeded)
+        self.assertEqual({'a': 'error_deleting'}, w.failed)
+
+
+@mock.patch('time.sleep')
+class TestWaitForStatus(utils.TestCase):
+
+    def test_wait_for_status(self, sleep_mock):
+        status_f = mock.Mock(side_effect=[
+            _res('build', progress=10),
+            _res('build', progress=60),
+            _res('active', progress=100),
+        ])
+        callback = mock.Mock()
+
+        self.assertTrue(waiter.wait_for_status(
+            status_f, 'a', callback=callback, poll_interval=1))
+
+        status_f.assert_has_calls([mock.call('a')] * 3)
+        callback.assert_has_calls(
+            [mock.call(10), mock.call(60), mock.call(100)])
+        # progress counts as a change, so polling does not back off
+        delays = [c[0][0] for c in sleep_mock.call_args_list]
+        self.assertTrue(all(d <= 1.2 for d in delays))
+
+    def test_wait_for_status_error(self, sleep_mock):
+        status_f = mock.Mock(return_value=_res('ERROR'))
+
+        self.assertFalse(waiter.wait_for_status(status_f, 'a'))
+
+    def test_wait_options(self, sleep_mock):
+        parser = argparse.ArgumentParser()
+        waiter.add_wait_options(parser, timeout=60)
+
+        parsed_args = parser.parse_args([])
+        self.assertEqual(
+            {'timeout': 60, 'poll_interval': waiter.DEFAULT_POLL_INTERVAL},
+            waiter.get_wait_kwargs(parsed_args))
+
+        parsed_args = parser.parse_args(
+            ['--wait-timeout', '5', '--poll-interval', '0.5'])
+        self.assertEqual(
+            {'timeout': 5, 'poll_interval': 0.5},
+            waiter.get_wait_kwargs(parsed_args))
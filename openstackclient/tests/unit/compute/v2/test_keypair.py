@@ -527,6 +527,7 @@ class TestKeypairList(TestKeypair):
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
 
         columns, data = self.cmd.take_action(parsed_args)
+        data = tuple(data)
 
         projects_mock.get.assert_called_with(identity_fakes.project_name)
         users_mock.list.assert_called_with(tenant_id=identity_fakes.project_id)
@@ -541,9 +542,71 @@ class TestKeypairList(TestKeypair):
                 self.keypairs[0].fingerprint,
                 self.keypairs[0].type,
             ), ),
-            tuple(data)
+            data
+        )
+
+    @mock.patch.object(sdk_utils, 'supports_microversion', return_value=True)
+    def test_keypair_list_with_project_many_users(self, sm_mock):
+        projects_mock = self.app.client_manager.identity.tenants
+        projects_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(identity_fakes.PROJECT),
+            loaded=True,
         )
 
+        users = [
+            fakes.FakeResource(None, {'id': 'user-%d' % i}, loaded=True)
+            for i in range(5)
+        ]
+        self.app.client_manager.identity.users.list.return_value = users
+        keypairs = {
+            u.id: compute_fakes.FakeKeypair.create_keypairs(count=2)
+            for u in users
+        }
+        self.sdk_client.keypairs.side_effect = (
+            lambda user_id, **kwargs: iter(keypairs[user_id]))
+
+        arglist = [
+            '--project', identity_fakes.project_name,
+            '--concurrency', '3',
+        ]
+        verifylist = [
+            ('project', identity_fakes.project_name),
+            ('concurrency', 3),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # keypairs are listed in the order of the users
+        self.assertEqual(
+            tuple(
+                (k.name, k.fingerprint, k.type)
+                for u in users for k in keypairs[u.id]
+            ),
+            tuple(data),
+        )
+        self.sdk_client.keypairs.assert_has_calls(
+            [call(user_id=u.id) for u in users], any_order=True)
+
+    @mock.patch.object(sdk_utils, 'supports_microversion', return_value=True)
+    def test_keypair_list_with_project_and_marker(self, sm_mock):
+        arglist = [
+            '--project', identity_fakes.project_name,
+            '--marker', 'test_kp',
+        ]
+        verifylist = [
+            ('project', identity_fakes.project_name),
+            ('marker', 'test_kp'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args)
+        self.assertIn('--project is not compatible with --marker', str(ex))
+
     @mock.patch.object(sdk_utils, 'supports_microversion', return_value=False)
     def test_keypair_list_with_project_pre_v210(self, sm_mock):
 
@@ -15,17 +15,24 @@
 import argparse
 import collections
 import copy
+import datetime
 import getpass
+import io
+import json
+import time
 from unittest import mock
 from unittest.mock import call
 
+import fixtures
 import iso8601
 from novaclient import api_versions
+from novaclient import exceptions as nova_exceptions
 from openstack import exceptions as sdk_exceptions
 from osc_lib.cli import format_columns
 from osc_lib import exceptions
 from osc_lib import utils as common_utils
 
+from openstackclient.common import waiter
 from openstackclient.compute.v2 import server
 from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
 from openstackclient.tests.unit.identity.v3 import fakes as identity_fakes
@@ -108,6 +115,9 @@ class TestServer(compute_fakes.TestComputev2):
         # Set object methods to be tested. Could be overwritten in subclass.
         self.methods = {}
 
+        # Do not let image and flavor names leak from one test to another
+        server._name_cache.clear()
+
     def setup_servers_mock(self, count):
         # If we are creating more than one server, make one of them
         # boot-from-volume
@@ -1143,6 +1153,52 @@ class TestServerCreate(TestServer):
         self.assertFalse(self.images_mock.called)
         self.assertFalse(self.flavors_mock.called)
 
+    def test_server_create_reuses_names(self):
+        self.new_server.info['image'] = {'id': self.image.id}
+        self.new_server.info['flavor'] = {'id': self.flavor.id}
+        arglist = [
+            '--image', 'image1',
+            '--flavor', 'flavor1',
+            self.new_server.name,
+        ]
+        verifylist = [
+            ('image', 'image1'),
+            ('flavor', 'flavor1'),
+            ('no_name_lookup', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        data = dict(zip(columns, data))
+        self.assertEqual(
+            '%s (%s)' % (self.image.name, self.image.id), data['image'])
+        self.assertEqual(
+            '%s (%s)' % (self.flavor.name, self.flavor.id), data['flavor'])
+        # the image and flavor resolved for the request are not fetched
+        # again to display the new server
+        self.get_image_mock.assert_not_called()
+        self.flavors_mock.get.assert_called_once_with('flavor1')
+
+    def test_server_create_no_name_lookup(self):
+        arglist = [
+            '--image', 'image1',
+            '--flavor', 'flavor1',
+            '--no-name-lookup',
+            self.new_server.name,
+        ]
+        verifylist = [
+            ('no_name_lookup', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        data = dict(zip(columns, data))
+        self.assertEqual(self.new_server.image['id'], data['image'])
+        self.assertEqual(self.new_server.flavor['id'], data['flavor'])
+        self.get_image_mock.assert_not_called()
+
     def test_server_create_with_options(self):
         arglist = [
             '--image', 'image1',
@@ -1660,8 +1716,8 @@ class TestServerCreate(TestServer):
                           self.cmd.take_action, parsed_args)
         self.assertNotCalled(self.servers_mock.create)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
-    def test_server_create_with_wait_ok(self, mock_wait_for_status):
+    def test_server_create_with_wait_ok(self):
+        self.new_server.status = 'ACTIVE'
         arglist = [
             '--image', 'image1',
             '--flavor', 'flavor1',
@@ -1678,11 +1734,9 @@ class TestServerCreate(TestServer):
 
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
         columns, data = self.cmd.take_action(parsed_args)
-        mock_wait_for_status.assert_called_once_with(
-            self.servers_mock.get,
-            self.new_server.id,
-            callback=mock.ANY,
-        )
+
+        # the server fetched by the waiter is shown, without another GET
+        self.servers_mock.get.assert_called_once_with(self.new_server.id)
 
         kwargs = dict(
             meta=None,
@@ -1709,8 +1763,8 @@ class TestServerCreate(TestServer):
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist(), data)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=False)
-    def test_server_create_with_wait_fails(self, mock_wait_for_status):
+    @mock.patch.object(waiter.StatusWaiter, 'wait', return_value=False)
+    def test_server_create_with_wait_fails(self, mock_wait):
         arglist = [
             '--image', 'image1',
             '--flavor', 'flavor1',
@@ -1729,11 +1783,7 @@ class TestServerCreate(TestServer):
 
         self.assertRaises(SystemExit, self.cmd.take_action, parsed_args)
 
-        mock_wait_for_status.assert_called_once_with(
-            self.servers_mock.get,
-            self.new_server.id,
-            callback=mock.ANY,
-        )
+        mock_wait.assert_called_once_with([self.new_server.id])
 
         kwargs = dict(
             meta=None,
@@ -2845,6 +2895,162 @@ class TestServerCreate(TestServer):
         self.assertFalse(self.flavors_mock.called)
 
 
+class TestServerCreateFromFile(TestServer):
+
+    def setUp(self):
+        super(TestServerCreateFromFile, self).setUp()
+
+        self.image = image_fakes.FakeImage.create_one_image()
+        self.find_image_mock.return_value = self.image
+        self.flavor = compute_fakes.FakeFlavor.create_one_flavor()
+        self.flavors_mock.get.return_value = self.flavor
+
+        self.new_servers = compute_fakes.FakeServer.create_servers(
+            attrs={'status': 'BUILD'}, count=3)
+        self.servers_mock.create.side_effect = self.new_servers
+
+        self.cmd = server.CreateServersFromFile(self.app, None)
+
+    def _manifest(self, content):
+        manifest = self.useFixture(fixtures.TempDir()).join('servers.yaml')
+        with open(manifest, 'w') as f:
+            f.write(content)
+        return manifest
+
+    def test_server_create_from_file(self):
+        manifest = self._manifest(
+            'defaults:\n'
+            '  image: %s\n'
+            '  flavor: %s\n'
+            '  property:\n'
+            '    owner: ops\n'
+            'servers:\n'
+            '  - name: %s\n'
+            '  - name: %s\n'
+            '  - name: %s\n'
+            '    key_name: key1\n' % (
+                self.image.name, self.flavor.name,
+                *[s.name for s in self.new_servers]))
+        arglist = [manifest, '--concurrency', '1']
+        verifylist = [
+            ('manifest', manifest),
+            ('wait', False),
+            ('concurrency', 1),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('ID', 'Name', 'Status', 'Message'), columns)
+        self.assertEqual(
+            [(s.id, s.name, 'BUILD', '') for s in self.new_servers],
+            list(data))
+        # Every distinct name is looked up once
+        self.find_image_mock.assert_called_once_with(
+            self.image.name, ignore_missing=False)
+        self.flavors_mock.get.assert_called_once_with(self.flavor.name)
+        self.assertEqual(3, self.servers_mock.create.call_count)
+        args, kwargs = self.servers_mock.create.call_args
+        self.assertEqual(
+            (self.new_servers[2].name, self.image, self.flavor), args)
+        self.assertEqual({'owner': 'ops'}, kwargs['meta'])
+        self.assertEqual('key1', kwargs['key_name'])
+
+    def test_server_create_from_file_concurrent_lookups(self):
+        manifest = self._manifest(''.join(
+            '- {name: %s, image: %s, flavor: %s}\n' % (
+                s.name, self.image.name, self.flavor.name)
+            for s in self.new_servers))
+        arglist = [manifest, '--concurrency', '8']
+        parsed_args = self.check_parser(
+            self.cmd, arglist, [('concurrency', 8)])
+
+        columns, data = self.cmd.take_action(parsed_args)
+        list(data)
+
+        # The names resolved concurrently are reused by every server
+        self.find_image_mock.assert_called_once_with(
+            self.image.name, ignore_missing=False)
+        self.flavors_mock.get.assert_called_once_with(self.flavor.name)
+        self.assertEqual(3, self.servers_mock.create.call_count)
+
+    def test_server_create_from_file_lookup_failure(self):
+        self.flavors_mock.get.side_effect = exceptions.NotFound(None)
+        self.flavors_mock.find.side_effect = exceptions.NotFound(None)
+        manifest = self._manifest(
+            '- name: server1\n'
+            '  image: %s\n'
+            '  flavor: unknown\n' % self.image.name)
+        parsed_args = self.check_parser(self.cmd, [manifest], [])
+
+        self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+        self.servers_mock.create.assert_not_called()
+
+    def test_server_create_from_file_invalid_entry(self):
+        manifest = self._manifest('- name: server1\n  no_such_option: 1\n')
+        parsed_args = self.check_parser(self.cmd, [manifest], [])
+
+        self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+        self.servers_mock.create.assert_not_called()
+
+    @mock.patch.object(server, '_fetch_servers')
+    def test_server_create_from_file_wait(self, mock_fetch):
+        self.servers_mock.create.side_effect = (
+            self.new_servers[:2] + [nova_exceptions.BadRequest(400)])
+        active = compute_fakes.FakeServer.create_one_server(
+            attrs={'id': self.new_servers[0].id, 'status': 'ACTIVE'})
+        error = compute_fakes.FakeServer.create_one_server(
+            attrs={'id': self.new_servers[1].id, 'status': 'ERROR',
+                   'fault': {'message': 'No valid host'}})
+        mock_fetch.return_value.side_effect = [
+            {active.id: active},
+            {error.id: error},
+        ]
+        manifest = self._manifest(''.join(
+            '- {name: %s, image: %s, flavor: %s}\n' % (
+                s.name, self.image.name, self.flavor.name)
+            for s in self.new_servers))
+        arglist = [manifest, '--wait', '--poll-interval', '0',
+                   '--concurrency', '1']
+        parsed_args = self.check_parser(self.cmd, arglist, [('wait', True)])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('', self.new_servers[2].name, 'ERROR', 'Bad request (HTTP 400)'),
+            (active.id, self.new_servers[0].name, 'ACTIVE', ''),
+            (error.id, self.new_servers[1].name, 'ERROR', 'No valid host'),
+        ], list(data))
+        self.assertEqual(
+            self.new_servers[:2], mock_fetch.call_args[0][1])
+        # The window of the changes reaches back before the builds
+        self.assertLessEqual(
+            mock_fetch.call_args[0][2],
+            (datetime.datetime.utcnow() - server.CLOCK_SKEW_MARGIN
+             ).strftime('%Y-%m-%dT%H:%M:%SZ'))
+        self.assertEqual(1800, parsed_args.wait_timeout)
+        self.assertEqual('2 of 3 servers failed', self.cmd.error)
+
+    def test_server_create_from_file_failed(self):
+        self.servers_mock.create.side_effect = (
+            self.new_servers[:2] + [nova_exceptions.BadRequest(400)])
+        manifest = self._manifest(''.join(
+            '- {name: %s, image: %s, flavor: %s}\n' % (
+                s.name, self.image.name, self.flavor.name)
+            for s in self.new_servers))
+        parsed_args = self.check_parser(self.cmd, [manifest], [])
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.run, parsed_args)
+
+        self.assertEqual('1 of 3 servers failed', str(ex))
+        # the outcome of every server is displayed first
+        for new_server in self.new_servers:
+            self.assertIn(new_server.name, ''.join(self.app.stdout.content))
+
+
 class TestServerDelete(TestServer):
 
     def setUp(self):
@@ -2913,9 +3119,27 @@ class TestServerDelete(TestServer):
         self.servers_mock.delete.assert_has_calls(calls)
         self.assertIsNone(result)
 
-    @mock.patch.object(common_utils, 'wait_for_delete', return_value=True)
-    def test_server_delete_wait_ok(self, mock_wait_for_delete):
+    def test_server_delete_multi_servers_exception(self):
+        servers = self.setup_servers_mock(count=2)
+        self.servers_mock.delete.side_effect = [
+            None, exceptions.CommandError('boom')]
+
+        arglist = [s.id for s in servers]
+        verifylist = [
+            ('server', arglist),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        # the remaining servers are still deleted when one fails
+        self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+        self.assertEqual(2, self.servers_mock.delete.call_count)
+
+    @mock.patch('time.sleep')
+    def test_server_delete_wait_ok(self, mock_sleep):
         servers = self.setup_servers_mock(count=1)
+        self.servers_mock.get = mock.Mock(side_effect=[
+            servers[0], servers[0], nova_exceptions.NotFound(404)])
 
         arglist = [
             servers[0].id, '--wait'
@@ -2928,16 +3152,79 @@ class TestServerDelete(TestServer):
         result = self.cmd.take_action(parsed_args)
 
         self.servers_mock.delete.assert_called_with(servers[0].id)
-        mock_wait_for_delete.assert_called_once_with(
-            self.servers_mock,
-            servers[0].id,
-            callback=mock.ANY,
-        )
+        self.servers_mock.get.assert_called_with(servers[0].id)
+        self.assertEqual(3, self.servers_mock.get.call_count)
         self.assertIsNone(result)
 
-    @mock.patch.object(common_utils, 'wait_for_delete', return_value=False)
-    def test_server_delete_wait_fails(self, mock_wait_for_delete):
+    @mock.patch('time.sleep')
+    def test_server_delete_wait_multi_servers(self, mock_sleep):
+        servers = compute_fakes.FakeServer.create_servers(
+            attrs={'status': 'ACTIVE', 'updated': '2020-01-01T00:00:00Z'},
+            count=3)
+        self.servers_mock.get = mock.Mock(
+            side_effect=servers + [nova_exceptions.NotFound(404)])
+        deleted = [
+            compute_fakes.FakeServer.create_one_server(
+                attrs={'id': s.id, 'status': 'DELETED'})
+            for s in servers
+        ]
+        self.servers_mock.list.return_value = [
+            servers[0], deleted[1], deleted[2]]
+
+        arglist = [s.id for s in servers] + ['--wait']
+        verifylist = [
+            ('server', [s.id for s in servers]),
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        # all servers are followed with one listing per poll, until a
+        # single one is left
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'changes-since': '2020-01-01T00:00:00Z'},
+            limit=-1)
+        self.servers_mock.get.assert_called_with(servers[0].id)
+        self.assertIsNone(result)
+
+    @mock.patch('time.sleep')
+    def test_server_delete_wait_other_project(self, mock_sleep):
+        servers = compute_fakes.FakeServer.create_servers(
+            attrs={'status': 'ACTIVE', 'updated': '2020-01-01T00:00:00Z',
+                   'tenant_id': 'other-project'},
+            count=2)
+        self.servers_mock.get = mock.Mock(side_effect=servers)
+        self.servers_mock.list.return_value = [
+            compute_fakes.FakeServer.create_one_server(
+                attrs={'id': s.id, 'status': 'DELETED'})
+            for s in servers
+        ]
+        self.app.client_manager.auth_ref = mock.Mock(project_id='admin')
+
+        arglist = [s.id for s in servers] + ['--wait']
+        verifylist = [
+            ('server', [s.id for s in servers]),
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        # the servers of the other project are only listed with all_tenants
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'changes-since': '2020-01-01T00:00:00Z',
+                         'all_tenants': True},
+            limit=-1)
+        self.assertIsNone(result)
+
+    @mock.patch('time.sleep')
+    def test_server_delete_wait_fails(self, mock_sleep):
         servers = self.setup_servers_mock(count=1)
+        error_server = compute_fakes.FakeServer.create_one_server(
+            attrs={'id': servers[0].id, 'status': 'ERROR'})
+        self.servers_mock.get = mock.Mock(side_effect=[
+            servers[0], servers[0], error_server])
 
         arglist = [
             servers[0].id, '--wait'
@@ -2950,11 +3237,7 @@ class TestServerDelete(TestServer):
         self.assertRaises(SystemExit, self.cmd.take_action, parsed_args)
 
         self.servers_mock.delete.assert_called_with(servers[0].id)
-        mock_wait_for_delete.assert_called_once_with(
-            self.servers_mock,
-            servers[0].id,
-            callback=mock.ANY,
-        )
+        self.servers_mock.get.assert_called_with(servers[0].id)
 
 
 class TestServerDumpCreate(TestServer):
@@ -3745,6 +4028,81 @@ class TestServerList(TestServer):
         self.assertEqual(self.columns, columns)
         self.assertEqual(tuple(self.data), tuple(data))
 
+    @mock.patch.object(server.time, 'sleep')
+    def test_server_list_watch_changes(self, sleep_mock):
+        sleep_mock.side_effect = [None, None, KeyboardInterrupt]
+        servers = [
+            compute_fakes.FakeServer.create_one_server(attrs={
+                'status': 'ACTIVE', 'updated': '2020-01-01T00:00:0%dZ' % i,
+            }) for i in range(2)
+        ]
+        changes = [
+            compute_fakes.FakeServer.create_one_server(attrs={
+                'id': servers[0].id, 'name': servers[0].name,
+                'status': 'SHUTOFF', 'updated': '2020-01-01T00:01:00Z',
+            }),
+            compute_fakes.FakeServer.create_one_server(attrs={
+                'id': servers[1].id, 'status': 'DELETED',
+                'updated': '2020-01-01T00:02:00Z',
+            }),
+            compute_fakes.FakeServer.create_one_server(attrs={
+                'status': 'BUILD', 'updated': '2020-01-01T00:03:00Z',
+            }),
+        ]
+        self.servers_mock.list.side_effect = [servers, changes, []]
+        self.app.stdout = io.StringIO()
+
+        arglist = ['--watch', '-n', '-f', 'json']
+        verifylist = [
+            ('watch', server.DEFAULT_WATCH_INTERVAL),
+            ('no_name_lookup', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(KeyboardInterrupt, self.cmd.run, parsed_args)
+
+        events = [
+            (e['change'], e['ID'], e['Status'])
+            for e in map(json.loads, self.app.stdout.getvalue().splitlines())
+        ]
+        self.assertEqual([
+            ('add', servers[0].id, 'ACTIVE'),
+            ('add', servers[1].id, 'ACTIVE'),
+            ('update', servers[0].id, 'SHUTOFF'),
+            ('delete', servers[1].id, 'ACTIVE'),
+            ('add', changes[2].id, 'BUILD'),
+        ], events)
+        # Only the servers changed since the previous poll are listed
+        self.assertEqual(3, self.servers_mock.list.call_count)
+        for call_args, since in zip(
+            self.servers_mock.list.call_args_list[1:],
+            ('2020-01-01T00:00:01Z', '2020-01-01T00:03:00Z'),
+        ):
+            self.assertEqual(
+                since, call_args[1]['search_opts']['changes-since'])
+            self.assertEqual(-1, call_args[1]['limit'])
+        sleep_mock.assert_called_with(server.DEFAULT_WATCH_INTERVAL)
+
+    @mock.patch.object(server.time, 'sleep')
+    def test_server_list_watch_table(self, sleep_mock):
+        sleep_mock.side_effect = [None, KeyboardInterrupt]
+        self.servers_mock.list.side_effect = [self.servers, []]
+        self.app.stdout = io.StringIO()
+
+        arglist = ['--watch', '10']
+        verifylist = [('watch', 10)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(KeyboardInterrupt, self.cmd.run, parsed_args)
+
+        # The table is not displayed again when nothing changed
+        output = self.app.stdout.getvalue()
+        self.assertEqual(1, output.count('| ID '))
+        for s in self.servers:
+            self.assertIn(s.id, output)
+        self.assertEqual(2, self.servers_mock.list.call_count)
+        sleep_mock.assert_called_with(10)
+
 
 class TestServerLock(TestServer):
 
@@ -3825,11 +4183,13 @@ class TestServerLockV273(TestServerLock):
             ('reason', "choo..choo"),
             ('server', [self.server.id, server2.id])
         ]
+        self.servers_mock.get.side_effect = {
+            self.server.id: self.server, server2.id: server2}.get
         parsed_args = self.check_parser(self.cmd, arglist, verifylist)
         self.cmd.take_action(parsed_args)
         self.assertEqual(2, self.servers_mock.get.call_count)
-        self.server.lock.assert_called_with(reason="choo..choo")
-        self.assertEqual(2, self.server.lock.call_count)
+        self.server.lock.assert_called_once_with(reason="choo..choo")
+        server2.lock.assert_called_once_with(reason="choo..choo")
 
 
 class TestServerMigrate(TestServer):
@@ -4212,7 +4572,7 @@ class TestServerMigrate(TestServer):
         self.assertNotCalled(self.servers_mock.migrate)
         self.assertIsNone(result)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=True)
     def test_server_migrate_with_wait(self, mock_wait_for_status):
         arglist = [
             '--wait', self.server.id,
@@ -4232,7 +4592,7 @@ class TestServerMigrate(TestServer):
         self.assertNotCalled(self.servers_mock.live_migrate)
         self.assertIsNone(result)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=False)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=False)
     def test_server_migrate_with_wait_fails(self, mock_wait_for_status):
         arglist = [
             '--wait', self.server.id,
@@ -5085,7 +5445,7 @@ class TestServerRebuild(TestServer):
             self.cmd.take_action,
             parsed_args)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=True)
     def test_rebuild_with_wait_ok(self, mock_wait_for_status):
         arglist = [
             '--wait',
@@ -5106,14 +5466,16 @@ class TestServerRebuild(TestServer):
             self.servers_mock.get,
             self.server.id,
             callback=mock.ANY,
-            # **kwargs
+            # **kwargs,
+            timeout=None,
+            poll_interval=2,
         )
 
         self.servers_mock.get.assert_called_with(self.server.id)
         self.get_image_mock.assert_called_with(self.image.id)
         self.server.rebuild.assert_called_with(self.image, None)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=False)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=False)
     def test_rebuild_with_wait_fails(self, mock_wait_for_status):
         arglist = [
             '--wait',
@@ -5131,6 +5493,8 @@ class TestServerRebuild(TestServer):
             self.servers_mock.get,
             self.server.id,
             callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
         )
 
         self.servers_mock.get.assert_called_with(self.server.id)
@@ -5561,7 +5925,7 @@ class TestEvacuateServer(TestServer):
             self.cmd.take_action,
             parsed_args)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=True)
     def test_evacuate_with_wait_ok(self, mock_wait_for_status):
         args = [
             self.server.id,
@@ -5579,6 +5943,8 @@ class TestEvacuateServer(TestServer):
             self.servers_mock.get,
             self.server.id,
             callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
         )
 
 
@@ -6041,7 +6407,7 @@ class TestServerResize(TestServer):
         self.assertIn('The --revert option has been deprecated.',
                       str(mock_warning.call_args[0][0]))
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=True)
     def test_server_resize_with_wait_ok(self, mock_wait_for_status):
 
         arglist = [
@@ -6071,6 +6437,8 @@ class TestServerResize(TestServer):
             self.servers_mock.get,
             self.server.id,
             callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
             **kwargs
         )
 
@@ -6081,7 +6449,7 @@ class TestServerResize(TestServer):
         self.assertNotCalled(self.servers_mock.confirm_resize)
         self.assertNotCalled(self.servers_mock.revert_resize)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=False)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=False)
     def test_server_resize_with_wait_fails(self, mock_wait_for_status):
 
         arglist = [
@@ -6111,6 +6479,8 @@ class TestServerResize(TestServer):
             self.servers_mock.get,
             self.server.id,
             callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
             **kwargs
         )
 
@@ -6481,7 +6851,7 @@ class TestServerShelve(TestServer):
 
         arglist = [server.name]
         verifylist = [
-            ('servers', [server.name]),
+            ('server', [server.name]),
             ('wait', False),
             ('offload', False),
         ]
@@ -6507,7 +6877,7 @@ class TestServerShelve(TestServer):
 
         arglist = [server.name]
         verifylist = [
-            ('servers', [server.name]),
+            ('server', [server.name]),
             ('wait', False),
             ('offload', False),
         ]
@@ -6520,7 +6890,7 @@ class TestServerShelve(TestServer):
         server.shelve.assert_not_called()
         server.shelve_offload.assert_not_called()
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter.StatusWaiter, 'wait', return_value=True)
     def test_shelve_with_wait(self, mock_wait_for_status):
         server_info = {'status': 'ACTIVE'}
         server_methods = {
@@ -6534,7 +6904,7 @@ class TestServerShelve(TestServer):
 
         arglist = ['--wait', server.name]
         verifylist = [
-            ('servers', [server.name]),
+            ('server', [server.name]),
             ('wait', True),
             ('offload', False),
         ]
@@ -6546,14 +6916,45 @@ class TestServerShelve(TestServer):
         self.servers_mock.get.assert_called_once_with(server.name)
         server.shelve.assert_called_once_with()
         server.shelve_offload.assert_not_called()
-        mock_wait_for_status.assert_called_once_with(
-            self.servers_mock.get,
-            server.id,
-            callback=mock.ANY,
-            success_status=('shelved', 'shelved_offloaded'),
-        )
+        mock_wait_for_status.assert_called_once_with([server.id])
+
+    @mock.patch('time.sleep')
+    def test_shelve_multiple_with_wait(self, sleep_mock):
+        server_info = {'status': 'ACTIVE', 'updated': '2021-01-01T00:00:00Z'}
+        server_methods = {
+            'shelve': None,
+            'shelve_offload': None,
+        }
+        servers = compute_fakes.FakeServer.create_servers(
+            attrs=server_info, methods=server_methods, count=2)
+        shelved = compute_fakes.FakeServer.create_servers(
+            attrs={'status': 'SHELVED'}, count=2)
+        for fake, real in zip(shelved, servers):
+            fake.id = real.id
+        self.servers_mock.get.side_effect = servers + shelved[1:]
+        self.servers_mock.list.return_value = shelved[:1]
+
+        arglist = ['--wait', '--poll-interval', '1'] + [
+            s.name for s in servers]
+        verifylist = [
+            ('server', [s.name for s in servers]),
+            ('wait', True),
+            ('poll_interval', 1),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+        self.assertIsNone(result)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+        for s in servers:
+            s.shelve.assert_called_once_with()
+        # one listing for both servers, then a GET for the last one pending
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'changes-since': '2021-01-01T00:00:00Z'},
+            limit=-1)
+        self.servers_mock.get.assert_called_with(servers[1].id)
+
+    @mock.patch.object(waiter.StatusWaiter, 'wait', return_value=True)
     def test_shelve_offload(self, mock_wait_for_status):
         server_info = {'status': 'ACTIVE'}
         server_methods = {
@@ -6567,7 +6968,7 @@ class TestServerShelve(TestServer):
 
         arglist = ['--offload', server.name]
         verifylist = [
-            ('servers', [server.name]),
+            ('server', [server.name]),
             ('wait', False),
             ('offload', True),
         ]
@@ -6578,16 +6979,11 @@ class TestServerShelve(TestServer):
 
         self.servers_mock.get.assert_has_calls([
             mock.call(server.name),
-            mock.call(server.name),
+            mock.call(server.id),
         ])
         server.shelve.assert_called_once_with()
         server.shelve_offload.assert_called_once_with()
-        mock_wait_for_status.assert_called_once_with(
-            self.servers_mock.get,
-            server.id,
-            callback=mock.ANY,
-            success_status=('shelved', 'shelved_offloaded'),
-        )
+        mock_wait_for_status.assert_called_once_with([server.id])
 
 
 class TestServerShow(TestServer):
@@ -6675,6 +7071,54 @@ class TestServerShow(TestServer):
         self.assertEqual(self.columns, columns)
         self.assertCountEqual(self.data, data)
 
+    def test_show_no_name_lookup(self):
+        arglist = [
+            '--no-name-lookup',
+            self.server.name,
+        ]
+        verifylist = [
+            ('no_name_lookup', True),
+            ('server', self.server.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(self.columns, columns)
+        data = dict(zip(columns, data))
+        self.assertEqual(self.image.id, data['image'])
+        self.assertEqual(self.flavor.id, data['flavor'])
+        self.get_image_mock.assert_not_called()
+        self.flavors_mock.get.assert_not_called()
+
+    def test_show_cached_names(self):
+        arglist = [
+            self.server.name,
+        ]
+        verifylist = [
+            ('server', self.server.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        # every show gets a pristine server, like from the API
+        server_info = copy.deepcopy(self.server.to_dict())
+        self.servers_mock.get.side_effect = \
+            lambda *args: compute_fakes.FakeServer.create_one_server(
+                attrs=copy.deepcopy(server_info))
+
+        self.cmd.take_action(parsed_args)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertCountEqual(self.data, data)
+        self.get_image_mock.assert_called_once_with(self.image.id)
+        self.flavors_mock.get.assert_called_once_with(self.flavor.id)
+
+        # the names are looked up again once the cache expired
+        with mock.patch('time.monotonic',
+                        return_value=time.monotonic() +
+                        server.NAME_CACHE_TTL + 1):
+            self.cmd.take_action(parsed_args)
+        self.assertEqual(2, self.get_image_mock.call_count)
+
     def test_show_embedded_flavor(self):
         # Tests using --os-compute-api-version >= 2.47 where the flavor
         # details are embedded in the server response body excluding the id.
@@ -6801,6 +7245,110 @@ class TestServerStop(TestServer):
     def test_server_stop_multi_servers(self):
         self.run_method_with_servers('stop', 3)
 
+    def test_server_stop_no_selection(self):
+        parsed_args = self.check_parser(self.cmd, [], [('server', [])])
+        self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+
+    def test_server_stop_by_filter(self):
+        servers = compute_fakes.FakeServer.create_servers(
+            methods=self.methods, count=3)
+        self.servers_mock.list.return_value = servers
+
+        arglist = [
+            '--host', 'compute-1',
+            '--status', 'ACTIVE',
+            '--all-projects',
+            '--concurrency', '2',
+        ]
+        verifylist = [
+            ('server', []),
+            ('host', 'compute-1'),
+            ('status', 'ACTIVE'),
+            ('all_projects', True),
+            ('concurrency', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        self.assertIsNone(result)
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={
+                'host': 'compute-1',
+                'status': 'ACTIVE',
+                'all_tenants': True,
+            },
+            limit=-1,
+        )
+        self.servers_mock.get.assert_not_called()
+        for s in servers:
+            s.stop.assert_called_once_with()
+            self.assertIn(
+                'Stopped server %s (%s)\n' % (s.name, s.id),
+                self.app.stdout.content)
+
+    def test_server_stop_all_projects_only(self):
+        arglist = ['--all-projects']
+        verifylist = [('all_projects', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+        self.assertIn('--all-projects must be combined', str(ex))
+        self.servers_mock.list.assert_not_called()
+
+    def test_server_stop_named_and_matched(self):
+        servers = compute_fakes.FakeServer.create_servers(
+            methods=self.methods, count=2)
+        self.servers_mock.get.return_value = servers[0]
+        self.servers_mock.list.return_value = servers
+
+        arglist = [servers[0].name, servers[0].id, '--host', 'compute-1']
+        verifylist = [
+            ('server', [servers[0].name, servers[0].id]),
+            ('host', 'compute-1'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        # the server given twice and matched by the filter is stopped once
+        servers[0].stop.assert_called_once_with()
+        servers[1].stop.assert_called_once_with()
+
+    def test_server_stop_tags_pre_v226(self):
+        arglist = ['--tags', 'maintenance']
+        verifylist = [('tags', ['maintenance'])]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+        self.assertIn('2.26 or greater is required', str(ex))
+
+    @mock.patch('time.sleep')
+    def test_server_stop_partial_failure(self, sleep_mock):
+        servers = compute_fakes.FakeServer.create_servers(
+            methods=self.methods, count=3)
+        servers[0].stop.side_effect = nova_exceptions.Conflict(409)
+        # throttled once, then accepted
+        servers[1].stop.side_effect = [
+            nova_exceptions.RateLimit(429, retry_after=3), None]
+        self.servers_mock.get.side_effect = lambda sid: {
+            s.id: s for s in servers}[sid]
+
+        arglist = [s.id for s in servers]
+        verifylist = [('server', arglist)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+
+        self.assertEqual('1 of 3 servers failed', str(ex))
+        self.assertEqual(2, servers[1].stop.call_count)
+        sleep_mock.assert_called_once_with(3)
+        servers[2].stop.assert_called_once_with()
+
 
 class TestServerSuspend(TestServer):
 
@@ -7057,7 +7605,7 @@ class TestServerUnshelve(TestServer):
         self.assertIn(
             '--os-compute-api-version 2.77 or greater is required', str(ex))
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter.StatusWaiter, 'wait', return_value=True)
     def test_unshelve_with_wait(self, mock_wait_for_status):
         server = compute_fakes.FakeServer.create_one_server(
             attrs=self.attrs, methods=self.methods)
@@ -7075,12 +7623,7 @@ class TestServerUnshelve(TestServer):
 
         self.servers_mock.get.assert_called_once_with(server.name)
         server.unshelve.assert_called_once_with()
-        mock_wait_for_status.assert_called_once_with(
-            self.servers_mock.get,
-            server.id,
-            callback=mock.ANY,
-            success_status=('active', 'shutoff'),
-        )
+        mock_wait_for_status.assert_called_once_with([server.id])
 
 
 class TestServerGeneral(TestServer):
@@ -15,8 +15,8 @@ from unittest import mock
 
 from osc_lib.cli import format_columns
 from osc_lib import exceptions
-from osc_lib import utils as common_utils
 
+from openstackclient.common import waiter
 from openstackclient.compute.v2 import server_backup
 from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
 from openstackclient.tests.unit.image.v2 import fakes as image_fakes
@@ -175,7 +175,7 @@ class TestServerBackupCreate(TestServerBackup):
         self.assertEqual(self.image_columns(images[0]), columns)
         self.assertItemsEqual(self.image_data(images[0]), data)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=False)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=False)
     def test_server_backup_wait_fail(self, mock_wait_for_status):
         servers = self.setup_servers_mock(count=1)
         images = self.setup_images_mock(count=1, servers=servers)
@@ -223,10 +223,12 @@ class TestServerBackupCreate(TestServerBackup):
         mock_wait_for_status.assert_called_once_with(
             self.images_mock.get_image,
             images[0].id,
-            callback=mock.ANY
+            callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
         )
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=True)
     def test_server_backup_wait_ok(self, mock_wait_for_status):
         servers = self.setup_servers_mock(count=1)
         images = self.setup_images_mock(count=1, servers=servers)
@@ -265,7 +267,9 @@ class TestServerBackupCreate(TestServerBackup):
         mock_wait_for_status.assert_called_once_with(
             self.images_mock.get_image,
             images[0].id,
-            callback=mock.ANY
+            callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
         )
 
         self.assertEqual(self.image_columns(images[0]), columns)
@@ -13,6 +13,10 @@
 #   under the License.
 #
 
+from novaclient import api_versions
+from osc_lib.cli import format_columns
+from osc_lib import exceptions
+
 from openstackclient.compute.v2 import server_event
 from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
 
@@ -113,6 +117,137 @@ class TestListServerEvent(TestServerEvent):
         self.assertEqual(self.long_columns, columns)
         self.assertEqual(self.long_data, tuple(data))
 
+    def _setup_timeline(self):
+        self.servers = compute_fakes.FakeServer.create_servers(count=3)
+        self.servers_mock.list.return_value = self.servers
+        starts = {
+            self.servers[0].id: ['2020-01-01T00:05:00', '2020-01-01T00:01:00'],
+            self.servers[1].id: ['2020-01-01T00:04:00'],
+            self.servers[2].id: ['2020-01-01T00:03:00', '2020-01-01T00:02:00'],
+        }
+        self.actions = {
+            server_id: [
+                compute_fakes.FakeServerEvent.create_one_server_event(
+                    attrs={'instance_uuid': server_id, 'start_time': start})
+                for start in times
+            ] for server_id, times in starts.items()
+        }
+        self.events_mock.list.side_effect = (
+            lambda server_id, **kwargs: self.actions[server_id])
+
+    def test_server_event_list_timeline(self):
+        self._setup_timeline()
+        arglist = [
+            '--host', 'host1',
+            '--all-projects',
+        ]
+        verifylist = [
+            ('server', None),
+            ('host', 'host1'),
+            ('all_projects', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': True, 'host': 'host1'}, limit=-1)
+        self.assertEqual(3, self.events_mock.list.call_count)
+        self.assertEqual(self.columns, columns)
+        self.assertEqual([
+            (self.servers[0].id, '2020-01-01T00:01:00'),
+            (self.servers[2].id, '2020-01-01T00:02:00'),
+            (self.servers[2].id, '2020-01-01T00:03:00'),
+            (self.servers[1].id, '2020-01-01T00:04:00'),
+            (self.servers[0].id, '2020-01-01T00:05:00'),
+        ], [(row[1], row[3]) for row in data])
+
+    def test_server_event_list_timeline_changes_since(self):
+        self._setup_timeline()
+        arglist = [
+            '--changes-since', '2020-01-01T00:03:00Z',
+        ]
+        verifylist = [
+            ('changes_since', '2020-01-01T00:03:00Z'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={
+                'all_tenants': False,
+                'changes-since': '2020-01-01T00:03:00Z',
+            },
+            limit=-1)
+        # Before 2.58 actions are filtered client side
+        self.assertEqual(
+            ['2020-01-01T00:03:00', '2020-01-01T00:04:00',
+             '2020-01-01T00:05:00'],
+            [row[3] for row in data])
+
+    def test_server_event_list_changes_since_v258(self):
+        self.app.client_manager.compute.api_version = \
+            api_versions.APIVersion('2.58')
+        arglist = [
+            '--changes-since', '2020-01-01T00:03:00Z',
+            self.fake_server.name,
+        ]
+        verifylist = [
+            ('changes_since', '2020-01-01T00:03:00Z'),
+            ('server', self.fake_server.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.events_mock.list.assert_called_once_with(
+            self.fake_server.id, changes_since='2020-01-01T00:03:00Z')
+        self.assertEqual(self.data, tuple(data))
+
+    def test_server_event_list_details(self):
+        self._setup_timeline()
+        details = {}
+        for actions in self.actions.values():
+            for action in actions:
+                details[action.request_id] = (
+                    compute_fakes.FakeServerEvent.create_one_server_event(
+                        attrs={
+                            'request_id': action.request_id,
+                            'instance_uuid': action.instance_uuid,
+                            'start_time': action.start_time,
+                        }))
+        self.events_mock.get.side_effect = (
+            lambda server_id, request_id: details[request_id])
+        arglist = ['--details']
+        verifylist = [('details', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = list(data)
+
+        self.assertEqual(self.columns + ('Events',), columns)
+        self.assertEqual(5, self.events_mock.get.call_count)
+        self.assertEqual(5, len(data))
+        for row in data:
+            self.assertEqual(
+                format_columns.ListDictColumn(details[row[0]].events),
+                row[4])
+
+    def test_server_event_list_server_and_selection(self):
+        arglist = [
+            '--host', 'host1',
+            self.fake_server.name,
+        ]
+        verifylist = [
+            ('host', 'host1'),
+            ('server', self.fake_server.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+
 
 class TestShowServerEvent(TestServerEvent):
 
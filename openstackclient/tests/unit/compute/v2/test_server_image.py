@@ -14,8 +14,8 @@ from unittest import mock
 
 from osc_lib.cli import format_columns
 from osc_lib import exceptions
-from osc_lib import utils as common_utils
 
+from openstackclient.common import waiter
 from openstackclient.compute.v2 import server_image
 from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
 from openstackclient.tests.unit.image.v2 import fakes as image_fakes
@@ -167,7 +167,7 @@ class TestServerImageCreate(TestServerImage):
         self.assertEqual(self.image_columns(images[0]), columns)
         self.assertItemsEqual(self.image_data(images[0]), data)
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=False)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=False)
     def test_server_create_image_wait_fail(self, mock_wait_for_status):
         servers = self.setup_servers_mock(count=1)
         images = self.setup_images_mock(count=1, servers=servers)
@@ -198,10 +198,12 @@ class TestServerImageCreate(TestServerImage):
         mock_wait_for_status.assert_called_once_with(
             self.images_mock.get_image,
             images[0].id,
-            callback=mock.ANY
+            callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
         )
 
-    @mock.patch.object(common_utils, 'wait_for_status', return_value=True)
+    @mock.patch.object(waiter, 'wait_for_status', return_value=True)
     def test_server_create_image_wait_ok(self, mock_wait_for_status):
         servers = self.setup_servers_mock(count=1)
         images = self.setup_images_mock(count=1, servers=servers)
@@ -231,7 +233,9 @@ class TestServerImageCreate(TestServerImage):
         mock_wait_for_status.assert_called_once_with(
             self.images_mock.get_image,
             images[0].id,
-            callback=mock.ANY
+            callback=mock.ANY,
+            timeout=None,
+            poll_interval=2,
         )
 
         self.assertEqual(self.image_columns(images[0]), columns)
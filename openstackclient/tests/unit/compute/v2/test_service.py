@@ -21,6 +21,7 @@ from osc_lib import exceptions
 
 from openstackclient.compute.v2 import service
 from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
+from openstackclient.tests.unit import fakes
 
 
 class TestService(compute_fakes.TestComputev2):
@@ -104,6 +105,208 @@ class TestServiceDelete(TestService):
         self.service_mock.delete.assert_any_call('unexist_service')
 
 
+def _migration(mid, server, status, dest='dest-host'):
+    return fakes.FakeResource(info={
+        'id': mid,
+        'instance_uuid': server.id,
+        'status': status,
+        'dest_compute': dest,
+    })
+
+
+@mock.patch('time.sleep')
+class TestServiceDrain(TestService):
+
+    columns = (
+        'ID', 'Name', 'Status', 'Destination Host', 'Attempts', 'Message',
+    )
+
+    def setUp(self):
+        super(TestServiceDrain, self).setUp()
+
+        self.servers_mock = self.app.client_manager.compute.servers
+        self.servers_mock.reset_mock()
+        self.migrations_mock = self.app.client_manager.compute.migrations
+        self.migrations_mock.reset_mock()
+        self.server_migrations_mock = \
+            self.app.client_manager.compute.server_migrations
+        self.server_migrations_mock.reset_mock()
+
+        self.servers = compute_fakes.FakeServer.create_servers(
+            attrs={'status': 'ACTIVE'},
+            methods={'live_migrate': None},
+            count=2,
+        )
+        self.stopped = compute_fakes.FakeServer.create_one_server(
+            attrs={'status': 'SHUTOFF'})
+        self.servers_mock.list.return_value = self.servers + [self.stopped]
+
+        self.cmd = service.DrainService(self.app, None)
+
+    def test_service_drain(self, sleep_mock):
+        s1, s2 = self.servers
+        old = _migration(1, s1, 'completed', dest='host1')
+        self.migrations_mock.list.side_effect = [
+            [old],
+            [old, _migration(2, s1, 'running')],
+            [old, _migration(2, s1, 'completed')],
+            [old, _migration(2, s1, 'completed'),
+             _migration(3, s2, 'completed')],
+        ]
+        arglist = [
+            'host1',
+            '--max-in-flight', '1',
+        ]
+        verifylist = [
+            ('host', 'host1'),
+            ('max_in_flight', 1),
+            ('disable', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.service_mock.disable.assert_called_once_with(
+            'host1', 'nova-compute')
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'host': 'host1', 'all_tenants': True}, limit=-1)
+        self.migrations_mock.list.assert_called_with(
+            host='host1', migration_type='live-migration')
+        s1.live_migrate.assert_called_once_with(
+            host=None, block_migration=False, disk_over_commit=False)
+        s2.live_migrate.assert_called_once_with(
+            host=None, block_migration=False, disk_over_commit=False)
+        self.assertEqual(self.columns, columns)
+        self.assertEqual([
+            (s1.id, s1.name, 'migrated', 'dest-host', 1, ''),
+            (s2.id, s2.name, 'migrated', 'dest-host', 1, ''),
+            (self.stopped.id, self.stopped.name, 'skipped', '', 0,
+             'server is SHUTOFF'),
+        ], list(data))
+
+    @mock.patch('time.time')
+    def test_service_drain_retry_and_abort(self, time_mock, sleep_mock):
+        self.app.client_manager.compute.api_version = \
+            api_versions.APIVersion('2.59')
+        time_mock.side_effect = [1000.0] + [0.0] * 3 + [100.0] * 10
+        s1, s2 = self.servers
+        self.migrations_mock.list.side_effect = [
+            [],
+            [_migration(1, s1, 'error'), _migration(2, s2, 'running')],
+            [_migration(1, s1, 'error'), _migration(2, s2, 'running'),
+             _migration(3, s1, 'completed')],
+        ]
+        arglist = [
+            'host1',
+            '--no-disable',
+            '--migration-timeout', '60',
+        ]
+        verifylist = [
+            ('host', 'host1'),
+            ('disable', False),
+            ('migration_timeout', 60),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.service_mock.disable.assert_not_called()
+        self.migrations_mock.list.assert_called_with(
+            host='host1', migration_type='live-migration',
+            changes_since='1970-01-01T00:11:40Z')
+        self.assertEqual(2, s1.live_migrate.call_count)
+        s1.live_migrate.assert_called_with(host=None, block_migration='auto')
+        self.server_migrations_mock.live_migration_abort \
+            .assert_called_once_with(s2.id, 2)
+        # the failed migration is retried after a delay
+        sleep_mock.assert_has_calls([mock.call(2), mock.call(2.0)])
+        self.assertEqual([
+            (s1.id, s1.name, 'migrated', 'dest-host', 2, ''),
+            (s2.id, s2.name, 'failed', '', 1, 'timed out'),
+            (self.stopped.id, self.stopped.name, 'skipped', '', 0,
+             'server is SHUTOFF'),
+        ], list(data))
+
+    def test_service_drain_servers_left(self, sleep_mock):
+        s1, s2 = self.servers
+        self.migrations_mock.list.side_effect = [
+            [],
+            [_migration(1, s1, 'completed'), _migration(2, s2, 'completed')],
+        ]
+        arglist = ['host1']
+        verifylist = [('host', 'host1')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.run, parsed_args)
+
+        # the stopped server could not be migrated
+        self.assertEqual(
+            '1 of 3 servers cannot be live migrated, they are still on '
+            'host host1', str(ex))
+        # the outcome of every server is displayed first
+        for server in self.servers + [self.stopped]:
+            self.assertIn(server.id, ''.join(self.app.stdout.content))
+
+    @mock.patch('time.time')
+    def test_service_drain_retry_backoff(self, time_mock, sleep_mock):
+        clock = [0.0]
+        time_mock.side_effect = lambda: clock[0]
+        sleep_mock.side_effect = \
+            lambda delay: clock.append(clock.pop() + delay)
+        s1, s2 = self.servers
+        s1.live_migrate.side_effect = [
+            Exception('No valid host'), Exception('No valid host'), None]
+        self.servers_mock.list.return_value = [s1, self.stopped]
+        self.migrations_mock.list.side_effect = [
+            [],
+            [_migration(1, s1, 'completed')],
+        ]
+        arglist = ['host1', '--retries', '2']
+        verifylist = [('host', 'host1'), ('retries', 2)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.run, parsed_args)
+
+        self.assertEqual(3, s1.live_migrate.call_count)
+        # wait twice as long before each new attempt, then poll
+        self.assertEqual(
+            [mock.call(2), mock.call(4), mock.call(2)],
+            sleep_mock.call_args_list)
+        self.assertEqual(
+            '1 of 2 servers cannot be live migrated, they are still on '
+            'host host1', str(ex))
+
+    def test_service_drain_failed_and_skipped(self, sleep_mock):
+        s1, s2 = self.servers
+        s1.live_migrate.side_effect = Exception('No valid host')
+        self.migrations_mock.list.side_effect = [
+            [],
+            [_migration(1, s2, 'completed')],
+        ]
+        arglist = ['host1', '--retries', '0']
+        verifylist = [('host', 'host1'), ('retries', 0)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.run, parsed_args)
+
+        self.assertEqual(
+            '1 of 3 servers failed to migrate; 1 of 3 servers cannot be '
+            'live migrated, they are still on host host1', str(ex))
+
+    def test_service_drain_target_host_pre_v230(self, sleep_mock):
+        arglist = ['host1', '--target-host', 'host2']
+        verifylist = [('host', 'host1'), ('target_host', 'host2')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        ex = self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+        self.assertIn('2.30 or greater is required', str(ex))
+        self.servers_mock.list.assert_not_called()
+
+
 class TestServiceList(TestService):
 
     service = compute_fakes.FakeService.create_one_service()
@@ -11,10 +11,14 @@
 #   under the License.
 #
 
+import csv
 import datetime
+import json
 from unittest import mock
 
+import fixtures
 from novaclient import api_versions
+from osc_lib import exceptions
 
 from openstackclient.compute.v2 import usage as usage_cmds
 from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
@@ -130,6 +134,129 @@ class TestUsageList(TestUsage):
         self.assertCountEqual(self.columns, columns)
         self.assertCountEqual(tuple(self.data), tuple(data))
 
+    def _setup_windows(self):
+        self.app.client_manager.compute.api_version = api_versions.APIVersion(
+            '2.40')
+        server_usage = {'instance_id': 'server-1'}
+        self.window_usages = {
+            datetime.datetime(2016, 11, 1): [
+                compute_fakes.FakeUsage.create_one_usage(attrs={
+                    'tenant_id': self.project.id,
+                    'total_hours': 10.0,
+                    'server_usages': [server_usage],
+                }),
+            ],
+            datetime.datetime(2016, 11, 6): [
+                compute_fakes.FakeUsage.create_one_usage(attrs={
+                    'tenant_id': self.project.id,
+                    'total_hours': 20.0,
+                    'server_usages': [
+                        server_usage, {'instance_id': 'server-2'},
+                    ],
+                }),
+            ],
+        }
+
+        def _list(start, end, detailed, marker=None):
+            if marker:
+                return []
+            return self.window_usages[start]
+
+        self.usage_mock.list.side_effect = _list
+
+    def test_usage_list_window(self):
+        self._setup_windows()
+        arglist = [
+            '--start', '2016-11-01',
+            '--end', '2016-11-11',
+            '--window', '5',
+        ]
+        verifylist = [
+            ('window', 5),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.usage_mock.list.assert_has_calls([
+            mock.call(datetime.datetime(2016, 11, 1),
+                      datetime.datetime(2016, 11, 6), detailed=True),
+            mock.call(datetime.datetime(2016, 11, 6),
+                      datetime.datetime(2016, 11, 11), detailed=True),
+        ], any_order=True)
+        self.assertEqual(self.columns, columns)
+        self.assertEqual([(
+            usage_cmds.ProjectColumn(self.project.id),
+            # server-1 is counted in both windows
+            3,
+            usage_cmds.FloatColumn(1024.0),
+            usage_cmds.FloatColumn(2.0),
+            usage_cmds.FloatColumn(2.0),
+        )], list(data))
+
+    def test_usage_list_window_invalid(self):
+        arglist = ['--window', '0']
+        parsed_args = self.check_parser(self.cmd, arglist, [('window', 0)])
+
+        self.assertRaises(
+            exceptions.CommandError, self.cmd.take_action, parsed_args)
+
+    def test_usage_list_output_file(self):
+        self._setup_windows()
+        path = self.useFixture(fixtures.TempDir()).join('usage.csv')
+        arglist = [
+            '--start', '2016-11-01',
+            '--end', '2016-11-11',
+            '--window', '5',
+            '--output-file', path,
+        ]
+        verifylist = [
+            ('output_file', path),
+            ('output_format', 'csv'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([], list(data))
+        with open(path) as f:
+            rows = list(csv.reader(f))
+        self.assertEqual([
+            ['Project ID', 'Project', 'Servers', 'Hours', 'RAM MB-Hours',
+             'CPU Hours', 'Disk GB-Hours'],
+            [self.project.id, self.project.name, '3', '30.0', '1024.0',
+             '2.0', '2.0'],
+        ], rows)
+
+    def test_usage_list_output_file_ndjson(self):
+        self._setup_windows()
+        path = self.useFixture(fixtures.TempDir()).join('usage.json')
+        arglist = [
+            '--start', '2016-11-01',
+            '--end', '2016-11-06',
+            '--output-file', path,
+            '--output-format', 'ndjson',
+        ]
+        verifylist = [
+            ('window', None),
+            ('output_format', 'ndjson'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([{
+            'Project ID': self.project.id,
+            'Project': self.project.name,
+            'Servers': 1,
+            'Hours': 10.0,
+            'RAM MB-Hours': 512.0,
+            'CPU Hours': 1.0,
+            'Disk GB-Hours': 1.0,
+        }], rows)
+
 
 class TestUsageShow(TestUsage):
 
@@ -14,9 +14,13 @@
 import copy
 from unittest import mock
 
+from osc_lib import exceptions
+
+from openstackclient.identity import common as identity_common
 from openstackclient.identity.v3 import role_assignment
 from openstackclient.tests.unit import fakes
 from openstackclient.tests.unit.identity.v3 import fakes as identity_fakes
+from openstackclient.tests.unit import utils as tests_utils
 
 
 class TestRoleAssignment(identity_fakes.TestIdentityv3):
@@ -721,3 +725,132 @@ class TestRoleAssignmentList(TestRoleAssignment):
             False
         ),)
         self.assertEqual(datalist, tuple(data))
+
+    def _set_up_client_names(self):
+        self.role_assignments_mock.list.return_value = [
+            fakes.FakeResource(
+                None,
+                copy.deepcopy(
+                    identity_fakes.ASSIGNMENT_WITH_PROJECT_ID_AND_USER_ID),
+                loaded=True,
+            ),
+            fakes.FakeResource(
+                None,
+                copy.deepcopy(
+                    identity_fakes.ASSIGNMENT_WITH_DOMAIN_ID_AND_GROUP_ID),
+                loaded=True,
+            ),
+        ]
+        self.users_mock.get.return_value = fakes.FakeResource(
+            None, copy.deepcopy(identity_fakes.USER), loaded=True)
+        self.projects_mock.get.return_value = fakes.FakeResource(
+            None, copy.deepcopy(identity_fakes.PROJECT), loaded=True)
+        self.domains_mock.get.return_value = fakes.FakeResource(
+            None, copy.deepcopy(identity_fakes.DOMAIN), loaded=True)
+        self.roles_mock.get.return_value = fakes.FakeResource(
+            None, copy.deepcopy(identity_fakes.ROLE), loaded=True)
+        # The group does not exist anymore
+        self.groups_mock.get.side_effect = exceptions.NotFound(404)
+
+    def test_role_assignment_list_client_names(self):
+        self._set_up_client_names()
+
+        arglist = ['--client-names']
+        verifylist = [
+            ('names', False),
+            ('client_names', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.role_assignments_mock.list.assert_called_with(
+            domain=None,
+            system=None,
+            group=None,
+            effective=False,
+            project=None,
+            role=None,
+            user=None,
+            os_inherit_extension_inherited_to=None,
+            include_names=False)
+        self.users_mock.get.assert_called_once_with(identity_fakes.user_id)
+        self.groups_mock.get.assert_called_once_with(identity_fakes.group_id)
+        self.projects_mock.get.assert_called_once_with(
+            identity_fakes.project_id)
+        self.domains_mock.get.assert_called_once_with(
+            identity_fakes.domain_id)
+        self.roles_mock.get.assert_called_once_with(identity_fakes.role_id)
+
+        self.assertEqual(self.columns, columns)
+        datalist = ((
+            identity_fakes.role_name,
+            '@'.join([identity_fakes.user_name, identity_fakes.domain_name]),
+            '',
+            '@'.join([identity_fakes.project_name,
+                      identity_fakes.domain_name]),
+            '',
+            '',
+            False
+        ), (
+            identity_fakes.role_name,
+            '',
+            identity_fakes.group_id,
+            '',
+            identity_fakes.domain_name,
+            '',
+            False
+        ),)
+        self.assertEqual(datalist, tuple(data))
+
+    def test_role_assignment_list_client_names_listed(self):
+        self._set_up_client_names()
+        self.users_mock.list.return_value = [self.users_mock.get.return_value]
+        self.groups_mock.list.return_value = []
+
+        arglist = ['--client-names']
+        verifylist = [
+            ('client_names', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(identity_common, 'RESOURCE_LIST_THRESHOLD', 0):
+            columns, data = self.cmd.take_action(parsed_args)
+            data = tuple(data)
+
+        self.users_mock.list.assert_called_once_with()
+        self.users_mock.get.assert_not_called()
+        self.groups_mock.list.assert_called_once_with()
+        self.groups_mock.get.assert_called_once_with(identity_fakes.group_id)
+        self.assertEqual(
+            '@'.join([identity_fakes.user_name, identity_fakes.domain_name]),
+            data[0][1])
+        self.assertEqual(identity_fakes.group_id, data[1][2])
+
+    def test_role_assignment_list_client_names_lookup_by_id(self):
+        self._set_up_client_names()
+
+        arglist = ['--client-names', '--lookup-by-id']
+        verifylist = [
+            ('client_names', True),
+            ('lookup_by_id', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(identity_common, 'RESOURCE_LIST_THRESHOLD', 0):
+            columns, data = self.cmd.take_action(parsed_args)
+            data = tuple(data)
+
+        self.users_mock.list.assert_not_called()
+        self.groups_mock.list.assert_not_called()
+        self.users_mock.get.assert_called_once_with(identity_fakes.user_id)
+        self.assertEqual(
+            '@'.join([identity_fakes.user_name, identity_fakes.domain_name]),
+            data[0][1])
+
+    def test_role_assignment_list_names_and_client_names(self):
+        arglist = ['--names', '--client-names']
+        verifylist = []
+
+        self.assertRaises(tests_utils.ParserException, self.check_parser,
+                          self.cmd, arglist, verifylist)
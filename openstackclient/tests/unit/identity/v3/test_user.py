@@ -1150,10 +1150,101 @@ class TestUserList(TestUser):
         }
 
         self.role_assignments_mock.list.assert_called_with(**kwargs)
-        self.users_mock.get.assert_called_with(self.user.id)
 
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
+        self.users_mock.get.assert_called_with(self.user.id)
+
+    def test_user_list_project_many_users(self):
+        users = identity_fakes.FakeUser.create_users(count=3)
+        self.role_assignments_mock.list.return_value = [
+            identity_fakes.FakeRoleAssignment.create_one_role_assignment(
+                attrs={'user': {'id': user.id}})
+            for user in users
+        ]
+        # The last user does not belong to the listing
+        self.users_mock.list.return_value = users[:2]
+        self.users_mock.get.return_value = users[2]
+
+        arglist = [
+            '--project', self.project.name,
+        ]
+        verifylist = [
+            ('project', self.project.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(common, 'RESOURCE_LIST_THRESHOLD', 2):
+            columns, data = self.cmd.take_action(parsed_args)
+            data = list(data)
+
+        self.users_mock.list.assert_called_once_with(
+            domain=self.project.domain_id)
+        self.users_mock.get.assert_called_once_with(users[2].id)
+        self.assertEqual(self.columns, columns)
+        self.assertEqual(
+            sorted((user.id, user.name) for user in users), sorted(data))
+
+    def test_user_list_project_lookup_by_id(self):
+        users = identity_fakes.FakeUser.create_users(count=3)
+        self.role_assignments_mock.list.return_value = [
+            identity_fakes.FakeRoleAssignment.create_one_role_assignment(
+                attrs={'user': {'id': user.id}})
+            for user in users
+        ]
+        self.users_mock.get.side_effect = {u.id: u for u in users}.get
+
+        arglist = [
+            '--project', self.project.name,
+            '--lookup-by-id',
+        ]
+        verifylist = [
+            ('project', self.project.name),
+            ('lookup_by_id', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(common, 'RESOURCE_LIST_THRESHOLD', 2):
+            columns, data = self.cmd.take_action(parsed_args)
+            data = list(data)
+
+        self.users_mock.list.assert_not_called()
+        self.assertEqual(3, self.users_mock.get.call_count)
+        self.assertEqual(
+            sorted((user.id, user.name) for user in users), sorted(data))
+
+    def test_user_list_project_user_not_found(self):
+        users = identity_fakes.FakeUser.create_users(count=2)
+        self.role_assignments_mock.list.return_value = [
+            identity_fakes.FakeRoleAssignment.create_one_role_assignment(
+                attrs={'user': {'id': user.id}})
+            for user in users
+        ]
+
+        def get_user(user_id):
+            if user_id != users[0].id:
+                raise exceptions.NotFound(404)
+            return users[0]
+
+        self.users_mock.get.side_effect = get_user
+
+        arglist = [
+            '--project', self.project.name,
+            '--concurrency', '2',
+        ]
+        verifylist = [
+            ('project', self.project.name),
+            ('concurrency', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(self.columns, columns)
+        self.assertEqual([(users[0].id, users[0].name)], list(data))
+        self.users_mock.get.assert_has_calls(
+            [mock.call(users[0].id), mock.call(users[1].id)],
+            any_order=True)
 
 
 class TestUserSet(TestUser):
@@ -13,6 +13,7 @@
 #   under the License.
 #
 
+from base64 import b64encode
 import copy
 import io
 import os
@@ -22,10 +23,14 @@ from unittest import mock
 from openstack import exceptions as sdk_exceptions
 from osc_lib.cli import format_columns
 from osc_lib import exceptions
+from requests import utils as requests_utils
 
+from openstackclient.common import upload
 from openstackclient.image.v2 import image
+from openstackclient.tests.unit.compute.v2 import fakes as compute_fakes
 from openstackclient.tests.unit.identity.v3 import fakes as identity_fakes
 from openstackclient.tests.unit.image.v2 import fakes as image_fakes
+from openstackclient.tests.unit.volume.v2 import fakes as volume_fakes
 
 
 class TestImage(image_fakes.TestImagev2):
@@ -249,8 +254,13 @@ class TestImageCreate(TestImage):
             Alpha='1',
             Beta='2',
             tags=self.new_image.tags,
-            filename=imagefile.name,
+            validate_checksum=False,
+            data=mock.ANY,
         )
+        # the file is uploaded from a memory map
+        body = self.client.create_image.call_args[1]['data']
+        self.assertIsInstance(body, upload.MappedFile)
+        self.assertTrue(body.closed)
 
         self.assertEqual(
             self.expected_columns,
@@ -259,6 +269,66 @@ class TestImageCreate(TestImage):
             self.expected_data,
             data)
 
+    @mock.patch('osc_lib.utils.get_password', return_value='')
+    @mock.patch('openstackclient.image.v2.image.image_signer.ImageSigner')
+    def test_image_create_file_signed(self, signer_class, get_password):
+        imagefile = tempfile.NamedTemporaryFile(delete=False)
+        imagefile.write(b'image data')
+        imagefile.close()
+
+        signer = signer_class.return_value
+        signer.hash_method = 'SHA-256'
+        signer.padding_method = 'RSA-PSS'
+        signer.generate_signature.return_value = b'signature'
+        lengths = []
+
+        def _create_image(**kwargs):
+            # The upload is sent with a known length
+            lengths.append(requests_utils.super_len(kwargs['data']))
+            # Consume the data like an upload would, re-reading it once as
+            # on a retry.
+            kwargs['data'].read(4)
+            kwargs['data'].seek(0)
+            while kwargs['data'].read(3):
+                pass
+            return self.new_image
+        self.client.create_image.side_effect = _create_image
+
+        arglist = [
+            '--file', imagefile.name,
+            '--sign-key-path', 'key.pem',
+            '--sign-cert-id', 'cert-id',
+            self.new_image.name,
+        ]
+        verifylist = [
+            ('file', imagefile.name),
+            ('sign_key_path', 'key.pem'),
+            ('sign_cert_id', 'cert-id'),
+            ('name', self.new_image.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        signer.load_private_key.assert_called_once_with(
+            'key.pem', password=None)
+        self.assertEqual([len(b'image data')], lengths)
+        # The data is hashed once, while it is being uploaded
+        self.assertEqual(
+            b'image data',
+            b''.join(c[0][0] for c in signer.hasher.update.call_args_list))
+        self.client.create_image.assert_called_once()
+        self.assertNotIn(
+            'filename', self.client.create_image.call_args[1])
+        self.client.update_image.assert_called_once_with(
+            self.new_image,
+            img_signature=b64encode(b'signature'),
+            img_signature_certificate_uuid='cert-id',
+            img_signature_hash_method='SHA-256',
+            img_signature_key_type='RSA-PSS',
+        )
+        self.assertEqual(self.expected_columns, columns)
+
     def test_image_create_dead_options(self):
 
         arglist = [
@@ -297,6 +367,286 @@ class TestImageCreate(TestImage):
             use_import=True
         )
 
+    def _image_file(self):
+        imagefile = tempfile.NamedTemporaryFile(delete=False)
+        imagefile.write(b'\0')
+        imagefile.close()
+        self.addCleanup(os.unlink, imagefile.name)
+        return imagefile.name
+
+    @mock.patch('time.sleep')
+    def test_image_create_import_stores_wait(self, sleep_mock):
+        imagefile = self._image_file()
+        importing = image_fakes.FakeImage.create_one_image({
+            'id': self.new_image.id,
+            'status': 'active',
+            'stores': 'store1',
+            'os_glance_importing_to_stores': 'store2',
+        })
+        imported = image_fakes.FakeImage.create_one_image({
+            'id': self.new_image.id,
+            'status': 'active',
+            'stores': 'store1,store2',
+        })
+        self.client.get_image.side_effect = [importing, imported]
+
+        arglist = [
+            '--file', imagefile,
+            '--stores', 'store1,store2',
+            '--wait',
+            self.new_image.name,
+        ]
+        verifylist = [
+            ('stores', 'store1,store2'),
+            ('wait', True),
+            ('wait_timeout', image.DEFAULT_IMPORT_TIMEOUT),
+            ('name', self.new_image.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # The data is staged, then imported to the stores
+        self.client.create_image.assert_called_with(
+            name=self.new_image.name,
+            allow_duplicates=True,
+            container_format=image.DEFAULT_CONTAINER_FORMAT,
+            disk_format=image.DEFAULT_DISK_FORMAT,
+        )
+        self.client.stage_image.assert_called_once_with(
+            self.new_image, data=mock.ANY)
+        self.client.import_image.assert_called_once_with(
+            self.new_image, method='glance-direct',
+            stores=['store1', 'store2'])
+        self.client.get_image.assert_called_with(self.new_image.id)
+        self.assertEqual(2, self.client.get_image.call_count)
+        self.assertIn('importing to store2', self.app.stdout.make_string())
+
+    @mock.patch('time.sleep')
+    def test_image_create_import_wait_failed(self, sleep_mock):
+        imagefile = self._image_file()
+        self.client.get_image.return_value = (
+            image_fakes.FakeImage.create_one_image({
+                'id': self.new_image.id,
+                'status': 'active',
+                'stores': 'store1',
+                'os_glance_failed_import': 'store2',
+            })
+        )
+
+        arglist = [
+            '--file', imagefile,
+            '--all-stores',
+            '--wait',
+            self.new_image.name,
+        ]
+        verifylist = [
+            ('all_stores', True),
+            ('allow_failure', False),
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action, parsed_args)
+        self.client.create_image.assert_called_with(
+            name=self.new_image.name,
+            allow_duplicates=True,
+            container_format=image.DEFAULT_CONTAINER_FORMAT,
+            disk_format=image.DEFAULT_DISK_FORMAT,
+        )
+        self.client.import_image.assert_called_once_with(
+            self.new_image, method='glance-direct', all_stores=True)
+
+    @mock.patch('sys.stdin', side_effect=[None])
+    def test_image_create_wait_no_data(self, raw_input):
+        arglist = [
+            '--import',
+            '--wait',
+            self.new_image.name,
+        ]
+        verifylist = [
+            ('use_import', True),
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action, parsed_args)
+        self.client.create_image.assert_not_called()
+
+    def test_image_create_wait_no_import(self):
+        arglist = [
+            '--file', self._image_file(),
+            '--wait',
+            self.new_image.name,
+        ]
+        verifylist = [
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action, parsed_args)
+        self.client.create_image.assert_not_called()
+
+
+class TestImageImportManifest(TestImage):
+
+    def setUp(self):
+        super(TestImageImportManifest, self).setUp()
+
+        self.images = image_fakes.FakeImage.create_images(
+            attrs={'status': 'queued'}, count=2)
+        self.client.create_image.side_effect = self.images
+
+        self.cmd = image.ImportImageManifest(self.app, None)
+
+    def _write_manifest(self, content):
+        manifest = tempfile.NamedTemporaryFile(
+            mode='w', suffix='.yaml', delete=False)
+        manifest.write(content)
+        manifest.close()
+        self.addCleanup(os.unlink, manifest.name)
+        return manifest.name
+
+    @mock.patch('time.sleep')
+    def test_import_manifest_wait(self, sleep_mock):
+        imagefile = self._write_manifest('')
+        manifest = self._write_manifest(
+            '- name: one\n'
+            '  file: %s\n'
+            '  disk_format: qcow2\n'
+            '  stores: [store1]\n'
+            '- name: two\n'
+            '  uri: http://example.com/two.img\n' % imagefile
+        )
+        active = [
+            image_fakes.FakeImage.create_one_image({
+                'id': i.id, 'name': i.name, 'status': 'active',
+                'stores': 'store1',
+            }) for i in self.images
+        ]
+        self.client.images.return_value = active
+
+        arglist = [
+            '--wait',
+            '--concurrency', '1',
+            manifest,
+        ]
+        verifylist = [
+            ('manifest', manifest),
+            ('wait', True),
+            ('concurrency', 1),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.client.create_image.assert_has_calls([
+            mock.call(
+                name='one',
+                allow_duplicates=True,
+                container_format=image.DEFAULT_CONTAINER_FORMAT,
+                disk_format='qcow2',
+            ),
+            mock.call(
+                name='two',
+                allow_duplicates=True,
+                container_format=image.DEFAULT_CONTAINER_FORMAT,
+                disk_format=image.DEFAULT_DISK_FORMAT,
+            ),
+        ])
+        self.client.stage_image.assert_called_once_with(
+            self.images[0], data=mock.ANY)
+        self.client.import_image.assert_has_calls([
+            mock.call(self.images[0], method='glance-direct',
+                      stores=['store1']),
+            mock.call(self.images[1], method='web-download',
+                      uri='http://example.com/two.img'),
+        ])
+        # all images are refreshed with a single listing per poll
+        self.client.images.assert_called_once_with()
+        self.client.get_image.assert_not_called()
+
+        self.assertEqual(
+            ('ID', 'Name', 'Status', 'Stores', 'Failed Stores'), columns)
+        self.assertEqual(
+            [(i.id, i.name, 'active') for i in active],
+            [row[:3] for row in data])
+
+    @mock.patch('time.sleep')
+    def test_import_manifest_wait_image_gone(self, sleep_mock):
+        manifest = self._write_manifest(
+            '- name: one\n'
+            '  uri: http://example.com/one.img\n'
+            '- name: two\n'
+            '  uri: http://example.com/two.img\n'
+        )
+        # The second image was deleted during the import
+        self.client.images.return_value = [
+            image_fakes.FakeImage.create_one_image({
+                'id': self.images[0].id, 'name': self.images[0].name,
+                'status': 'active',
+            }),
+        ]
+        self.client.get_image.side_effect = (
+            sdk_exceptions.ResourceNotFound())
+
+        arglist = [
+            '--wait',
+            '--wait-timeout', '60',
+            manifest,
+        ]
+        verifylist = [
+            ('manifest', manifest),
+            ('wait', True),
+            ('wait_timeout', 60),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action, parsed_args)
+        self.client.get_image.assert_called_once_with(self.images[1].id)
+
+    def test_import_manifest_create_failed(self):
+        manifest = self._write_manifest(
+            '- name: one\n'
+            '  file: /tmp/one.img\n'
+            '- name: two\n'
+            '  file: /tmp/two.img\n'
+        )
+        self.client.create_image.side_effect = [
+            self.images[0], sdk_exceptions.HttpException()]
+
+        arglist = [
+            '--concurrency', '1',
+            manifest,
+        ]
+        verifylist = [
+            ('manifest', manifest),
+            ('concurrency', 1),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action, parsed_args)
+        self.assertEqual(2, self.client.create_image.call_count)
+
+    def test_import_manifest_invalid(self):
+        manifest = self._write_manifest('name: one\n')
+        parsed_args = self.check_parser(
+            self.cmd, [manifest], [('manifest', manifest)])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action, parsed_args)
+
 
 class TestAddProjectToImage(TestImage):
 
@@ -898,6 +1248,77 @@ class TestListImageProjects(TestImage):
         self.assertEqual(self.datalist, list(data))
 
 
+class TestImageUsage(TestImage):
+
+    def setUp(self):
+        super(TestImageUsage, self).setUp()
+
+        self.images = image_fakes.FakeImage.create_images(count=2)
+        self.client.images.return_value = self.images
+        self.client.find_image.return_value = self.images[0]
+
+        self.servers = [
+            compute_fakes.FakeServer.create_one_server(
+                attrs={'image': {'id': self.images[0].id},
+                       'tenant_id': 'project'}),
+            compute_fakes.FakeServer.create_one_server(
+                attrs={'image': ''}),
+        ]
+        self.volumes = [
+            volume_fakes.FakeVolume.create_one_volume(
+                attrs={'volume_image_metadata': {
+                    'image_id': self.images[0].id}}),
+            volume_fakes.FakeVolume.create_one_volume(
+                attrs={'volume_image_metadata': {
+                    'image_id': 'deleted-image'}}),
+        ]
+        self.app.client_manager.compute = mock.Mock()
+        self.servers_mock = self.app.client_manager.compute.servers
+        self.servers_mock.list.return_value = self.servers
+        self.app.client_manager.volume = mock.Mock()
+        self.volumes_mock = self.app.client_manager.volume.volumes
+        self.volumes_mock.list.return_value = self.volumes
+
+        self.cmd = image.ListImageUsage(self.app, None)
+
+    def test_image_usage_all(self):
+        arglist = ['--all-projects']
+        verifylist = [('image', None), ('all_projects', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': True}, limit=-1)
+        self.volumes_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': True})
+        self.assertEqual(
+            ('Image ID', 'Image Name', 'Servers', 'Volumes'), columns)
+        self.assertEqual([
+            (self.images[0].id, self.images[0].name, 1, 1),
+            (self.images[1].id, self.images[1].name, 0, 0),
+            ('deleted-image', '', 0, 1),
+        ], list(data))
+
+    def test_image_usage_one_image_long(self):
+        arglist = ['--long', self.images[0].name]
+        verifylist = [('image', self.images[0].name), ('long', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': False, 'image': self.images[0].id},
+            limit=-1)
+        self.client.images.assert_not_called()
+        self.assertEqual([
+            (self.images[0].id, self.images[0].name, 'server',
+             self.servers[0].id, self.servers[0].name, 'project'),
+            (self.images[0].id, self.images[0].name, 'volume',
+             self.volumes[0].id, self.volumes[0].name, ''),
+        ], list(data))
+
+
 class TestRemoveProjectImage(TestImage):
 
     project = identity_fakes.FakeProject.create_one_project()
@@ -0,0 +1,172 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+from unittest import mock
+
+from cinderclient import exceptions as cinder_exceptions
+
+from openstackclient.tests.unit import utils
+from openstackclient.tests.unit.volume.v2 import fakes as volume_fakes
+from openstackclient.volume import common
+
+
+class TestIterWithAttachedServers(utils.TestCase):
+
+    @mock.patch.object(common, 'ATTACHMENT_PAGE_SIZE', 2)
+    def test_iter_with_attached_servers(self):
+        volumes = volume_fakes.FakeVolume.create_volumes(count=3)
+        server_ids = [v.attachments[0]['server_id'] for v in volumes]
+        compute_client = mock.Mock()
+        compute_client.servers.get.side_effect = (
+            lambda server_id: mock.Mock(id=server_id))
+        server_cache = {server_ids[1]: mock.Mock()}
+
+        result = common.iter_with_attached_servers(
+            compute_client, iter(volumes), server_cache)
+
+        # Servers are looked up a page of volumes at a time
+        self.assertEqual(volumes[0], next(result))
+        compute_client.servers.get.assert_called_once_with(server_ids[0])
+        self.assertEqual(volumes[1], next(result))
+        self.assertEqual(volumes[2], next(result))
+        compute_client.servers.get.assert_called_with(server_ids[2])
+        self.assertEqual(2, compute_client.servers.get.call_count)
+        self.assertEqual(set(server_ids), set(server_cache))
+        self.assertEqual([], list(result))
+
+    def test_iter_with_attached_servers_not_found(self):
+        volumes = volume_fakes.FakeVolume.create_volumes(count=2)
+        compute_client = mock.Mock()
+        compute_client.servers.get.side_effect = Exception('not found')
+        server_cache = {}
+
+        self.assertEqual(volumes, list(common.iter_with_attached_servers(
+            compute_client, volumes, server_cache)))
+        self.assertEqual({}, server_cache)
+
+
+class TestFindVolumes(utils.TestCase):
+
+    def setUp(self):
+        super(TestFindVolumes, self).setUp()
+        self.addCleanup(common._volume_cache.clear)
+        self.volumes = volume_fakes.FakeVolume.create_volumes(count=3)
+        self.volume_client = mock.Mock()
+        self.volume_client.volumes.get.side_effect = {
+            v.id: v for v in self.volumes}.get
+        self.volume_client.volumes.list.return_value = self.volumes
+
+    def test_find_volumes(self):
+        ids = [self.volumes[0].id, self.volumes[1].id, self.volumes[0].id]
+
+        self.assertEqual(
+            {v.id: v for v in self.volumes[:2]},
+            common.find_volumes(self.volume_client, ids))
+        self.assertEqual(2, self.volume_client.volumes.get.call_count)
+
+        # Volumes are remembered
+        self.assertEqual(
+            {v.id: v for v in self.volumes},
+            common.find_volumes(
+                self.volume_client, [v.id for v in self.volumes]))
+        self.assertEqual(3, self.volume_client.volumes.get.call_count)
+        self.volume_client.volumes.list.assert_not_called()
+
+    def test_find_volumes_not_found(self):
+        self.volume_client.volumes.get.side_effect = Exception('not found')
+
+        self.assertEqual(
+            {}, common.find_volumes(self.volume_client, ['unknown']))
+        self.assertEqual(
+            {}, common.find_volumes(self.volume_client, ['unknown']))
+        self.volume_client.volumes.get.assert_called_once_with('unknown')
+
+    @mock.patch.object(common, 'VOLUME_LIST_THRESHOLD', 1)
+    def test_find_volumes_list(self):
+        ids = [self.volumes[0].id, self.volumes[2].id, 'unknown']
+
+        self.assertEqual(
+            {v.id: v for v in (self.volumes[0], self.volumes[2])},
+            common.find_volumes(
+                self.volume_client, ids, all_projects=True))
+        self.volume_client.volumes.list.assert_called_once_with(
+            search_opts={'all_tenants': True}, limit=6)
+        self.volume_client.volumes.get.assert_not_called()
+
+    @mock.patch.object(common, 'VOLUME_LIST_THRESHOLD', 1)
+    def test_find_volumes_list_partial(self):
+        # The listing stops before the last volume, which is fetched
+        self.volume_client.volumes.list.return_value = (
+            self.volumes[:2] + volume_fakes.FakeVolume.create_volumes(count=2))
+        self.volume_client.volumes.get.side_effect = (
+            {self.volumes[2].id: self.volumes[2]}.get)
+        ids = [self.volumes[0].id, self.volumes[2].id]
+
+        self.assertEqual(
+            {v.id: v for v in (self.volumes[0], self.volumes[2])},
+            common.find_volumes(self.volume_client, ids))
+        self.volume_client.volumes.list.assert_called_once_with(
+            search_opts={'all_tenants': False}, limit=4)
+        self.volume_client.volumes.get.assert_called_once_with(
+            self.volumes[2].id)
+
+
+class TestWaitForResources(utils.TestCase):
+
+    def test_fetch_resources(self):
+        volumes = volume_fakes.FakeVolume.create_volumes(count=3)
+        errors = {
+            volumes[1].id: cinder_exceptions.NotFound(404),
+            volumes[2].id: cinder_exceptions.ClientException(500),
+        }
+
+        def get(volume_id):
+            if volume_id in errors:
+                raise errors[volume_id]
+            return volumes[0]
+
+        manager = mock.Mock()
+        manager.get.side_effect = get
+
+        # Unexpected errors leave the resource unchanged
+        self.assertEqual(
+            {volumes[0].id: volumes[0], volumes[1].id: None},
+            common.fetch_resources(manager)([v.id for v in volumes]))
+
+    def test_wait_for_resources(self):
+        volumes = volume_fakes.FakeVolume.create_volumes(
+            attrs={'status': 'available'}, count=2)
+        volumes[1].status = 'error_extending'
+        manager = mock.Mock()
+        manager.get.side_effect = {v.id: v for v in volumes}.get
+
+        status_waiter = common.wait_for_resources(
+            manager, [v.id for v in volumes])
+
+        self.assertEqual({volumes[0].id}, status_waiter.succeeded)
+        self.assertEqual(
+            {volumes[1].id: 'error_extending'}, status_waiter.failed)
+
+    def test_wait_for_resources_delete(self):
+        volumes = volume_fakes.FakeVolume.create_volumes(
+            attrs={'status': 'error_deleting'}, count=2)
+        manager = mock.Mock()
+        manager.get.side_effect = [
+            volumes[0], cinder_exceptions.NotFound(404)]
+
+        status_waiter = common.wait_for_resources(
+            manager, [v.id for v in volumes], delete=True)
+
+        self.assertEqual(1, len(status_waiter.succeeded))
+        self.assertEqual(['error_deleting'],
+                         list(status_waiter.failed.values()))
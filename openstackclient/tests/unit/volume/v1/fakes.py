@@ -21,6 +21,7 @@ import uuid
 from openstackclient.tests.unit import fakes
 from openstackclient.tests.unit.identity.v2_0 import fakes as identity_fakes
 from openstackclient.tests.unit import utils
+from openstackclient.volume import common as volume_common
 
 
 class FakeTransfer(object):
@@ -384,6 +385,8 @@ class TestVolumev1(utils.TestCommand):
     def setUp(self):
         super(TestVolumev1, self).setUp()
 
+        self.addCleanup(volume_common._volume_cache.clear)
+
         self.app.client_manager.volume = FakeVolumev1Client(
             endpoint=fakes.AUTH_URL,
             token=fakes.AUTH_TOKEN,
@@ -23,6 +23,7 @@ from openstackclient.tests.unit import fakes
 from openstackclient.tests.unit.identity.v3 import fakes as identity_fakes
 from openstackclient.tests.unit.image.v2 import fakes as image_fakes
 from openstackclient.tests.unit import utils
+from openstackclient.volume import common as volume_common
 
 
 QUOTA = {
@@ -338,6 +339,8 @@ class TestVolume(utils.TestCommand):
     def setUp(self):
         super(TestVolume, self).setUp()
 
+        self.addCleanup(volume_common._volume_cache.clear)
+
         self.app.client_manager.volume = FakeVolumeClient(
             endpoint=fakes.AUTH_URL,
             token=fakes.AUTH_TOKEN
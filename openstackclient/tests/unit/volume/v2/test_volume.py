@@ -13,6 +13,7 @@
 #
 
 import argparse
+import io
 from unittest import mock
 from unittest.mock import call
 
@@ -24,6 +25,7 @@ from openstackclient.tests.unit.identity.v3 import fakes as identity_fakes
 from openstackclient.tests.unit.image.v2 import fakes as image_fakes
 from openstackclient.tests.unit import utils as tests_utils
 from openstackclient.tests.unit.volume.v2 import fakes as volume_fakes
+from openstackclient.volume import common as volume_common
 from openstackclient.volume.v2 import volume
 
 
@@ -500,6 +502,77 @@ class TestVolumeCreate(TestVolume):
         self.assertRaises(tests_utils.ParserException, self.check_parser,
                           self.cmd, arglist, verifylist)
 
+    def test_volume_create_count(self):
+        new_volumes = volume_fakes.FakeVolume.create_volumes(count=3)
+        self.volumes_mock.create.side_effect = (
+            lambda **kwargs: new_volumes[int(kwargs['name'][4]) - 1])
+        self.app.stderr = io.StringIO()
+        arglist = [
+            '--size', '1',
+            '--count', '3',
+            'vol-{index}-data',
+        ]
+        verifylist = [
+            ('count', 3),
+            ('name', 'vol-{index}-data'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        names = sorted(
+            c[1]['name'] for c in self.volumes_mock.create.call_args_list)
+        self.assertEqual(
+            ['vol-1-data', 'vol-2-data', 'vol-3-data'], names)
+        self.assertIn(new_volumes[0].id, data)
+        self.assertEqual(3, self.app.stderr.getvalue().count('Created'))
+
+    def test_volume_create_count_append_index(self):
+        self.assertEqual(
+            ['vol-1', 'vol-2'], volume.CreateVolume._get_names('vol', 2))
+        self.assertEqual(['vol'], volume.CreateVolume._get_names('vol', 1))
+
+    @mock.patch.object(volume_common, 'wait_for_resources')
+    def test_volume_create_wait(self, wait_mock):
+        wait_mock.return_value = mock.Mock(
+            failed={}, resources={self.new_volume.id: self.new_volume})
+        arglist = [
+            '--size', str(self.new_volume.size),
+            '--wait',
+            self.new_volume.name,
+        ]
+        verifylist = [
+            ('wait', True),
+            ('name', self.new_volume.name),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        wait_mock.assert_called_once_with(
+            self.volumes_mock, [self.new_volume.id],
+            timeout=None, poll_interval=2)
+        self.assertEqual(self.columns, columns)
+        self.assertIn(self.new_volume.id, data)
+
+    @mock.patch.object(volume_common, 'wait_for_resources')
+    def test_volume_create_wait_error(self, wait_mock):
+        wait_mock.return_value = mock.Mock(
+            failed={self.new_volume.id: 'error'}, resources={})
+        arglist = [
+            '--size', str(self.new_volume.size),
+            '--wait',
+            self.new_volume.name,
+        ]
+        verifylist = [
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 1 volumes failed to be created', str(e))
+
 
 class TestVolumeDelete(TestVolume):
 
@@ -544,7 +617,7 @@ class TestVolumeDelete(TestVolume):
         result = self.cmd.take_action(parsed_args)
 
         calls = [call(v.id, cascade=False) for v in volumes]
-        self.volumes_mock.delete.assert_has_calls(calls)
+        self.volumes_mock.delete.assert_has_calls(calls, any_order=True)
         self.assertIsNone(result)
 
     def test_volume_delete_multi_volumes_with_exception(self):
@@ -617,6 +690,26 @@ class TestVolumeDelete(TestVolume):
         self.volumes_mock.force_delete.assert_called_once_with(volumes[0].id)
         self.assertIsNone(result)
 
+    @mock.patch.object(volume_common, 'wait_for_resources')
+    def test_volume_delete_wait(self, wait_mock):
+        volumes = self.setup_volumes_mock(count=2)
+        wait_mock.return_value = mock.Mock(
+            failed={volumes[1].id: 'error_deleting'})
+
+        arglist = ['--wait'] + [v.id for v in volumes]
+        verifylist = [
+            ('wait', True),
+            ('volumes', [v.id for v in volumes]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 2 volumes failed to delete.', str(e))
+        wait_mock.assert_called_once_with(
+            self.volumes_mock, [v.id for v in volumes], delete=True,
+            timeout=None, poll_interval=2)
+
 
 class TestVolumeList(TestVolume):
 
@@ -1104,6 +1197,36 @@ class TestVolumeList(TestVolume):
         for each_volume in data:
             self.assertIn(self.mock_volume.name, each_volume)
 
+    def test_volume_list_attached_servers(self):
+        server_id = self.mock_volume.attachments[0]['server_id']
+        volumes = [self.mock_volume] + volume_fakes.FakeVolume.create_volumes(
+            attrs={'attachments': [
+                {'device': '/dev/vdb', 'server_id': server_id},
+            ]},
+            count=2,
+        ) + volume_fakes.FakeVolume.create_volumes(count=1)
+        self.volumes_mock.list.return_value = volumes
+        compute_client = mock.Mock()
+        self.app.client_manager.compute = compute_client
+        servers = {
+            server_id: mock.Mock(),
+            volumes[3].attachments[0]['server_id']: mock.Mock(),
+        }
+        compute_client.servers.get.side_effect = servers.get
+
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+        data = list(data)
+
+        # Only the servers the volumes are attached to are looked up, once
+        compute_client.servers.list.assert_not_called()
+        self.assertEqual(2, compute_client.servers.get.call_count)
+        compute_client.servers.get.assert_has_calls(
+            [call(s) for s in servers], any_order=True)
+        self.assertEqual(
+            'Attached to %s on /dev/vdb ' % servers[server_id].name,
+            data[1][4].human_readable())
+
 
 class TestVolumeMigrate(TestVolume):
 
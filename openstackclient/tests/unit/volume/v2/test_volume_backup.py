@@ -15,6 +15,7 @@
 from unittest import mock
 from unittest.mock import call
 
+from cinderclient import exceptions as cinder_exceptions
 from osc_lib import exceptions
 from osc_lib import utils
 
@@ -141,6 +142,48 @@ class TestBackupCreate(TestBackup):
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.data, data)
 
+    def test_backup_create_wait(self):
+        creating = volume_fakes.FakeBackup.create_one_backup(
+            attrs={'id': self.new_backup.id, 'status': 'creating'})
+        available = volume_fakes.FakeBackup.create_one_backup(
+            attrs={'id': self.new_backup.id, 'status': 'available'})
+        self.backups_mock.create.return_value = creating
+        self.backups_mock.get.return_value = available
+        arglist = [
+            "--wait",
+            self.new_backup.volume_id,
+        ]
+        verifylist = [
+            ("wait", True),
+            ("volume", self.new_backup.volume_id),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.backups_mock.get.assert_called_with(self.new_backup.id)
+        self.assertEqual(self.columns, columns)
+        self.assertIn('available', data)
+
+    def test_backup_create_wait_error(self):
+        self.backups_mock.get.return_value = (
+            volume_fakes.FakeBackup.create_one_backup(
+                attrs={'id': self.new_backup.id, 'status': 'error'}))
+        arglist = [
+            "--wait",
+            self.new_backup.volume_id,
+        ]
+        verifylist = [
+            ("wait", True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual(
+            'Backup %s did not become available: error' % self.new_backup.id,
+            str(e))
+
 
 class TestBackupDelete(TestBackup):
 
@@ -201,7 +244,7 @@ class TestBackupDelete(TestBackup):
         calls = []
         for b in self.backups:
             calls.append(call(b.id, False))
-        self.backups_mock.delete.assert_has_calls(calls)
+        self.backups_mock.delete.assert_has_calls(calls, any_order=True)
         self.assertIsNone(result)
 
     def test_delete_multiple_backups_with_exception(self):
@@ -233,6 +276,48 @@ class TestBackupDelete(TestBackup):
                 self.backups[0].id, False
             )
 
+    def test_backup_delete_wait(self):
+        self.backups_mock.get = mock.Mock(side_effect=[
+            self.backups[0],
+            cinder_exceptions.NotFound(404),
+        ])
+        arglist = [
+            '--wait',
+            self.backups[0].id,
+        ]
+        verifylist = [
+            ('wait', True),
+            ("backups", [self.backups[0].id])
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        self.backups_mock.delete.assert_called_with(
+            self.backups[0].id, False)
+        self.assertEqual(2, self.backups_mock.get.call_count)
+        self.assertIsNone(result)
+
+    def test_backup_delete_wait_error_deleting(self):
+        failed = volume_fakes.FakeBackup.create_one_backup(
+            attrs={'id': self.backups[0].id, 'status': 'error_deleting'})
+        self.backups_mock.get = mock.Mock(side_effect=[
+            self.backups[0],
+            failed,
+        ])
+        arglist = [
+            '--wait',
+            self.backups[0].id,
+        ]
+        verifylist = [
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 1 backups failed to delete.', str(e))
+
 
 class TestBackupList(TestBackup):
 
@@ -355,6 +440,28 @@ class TestBackupList(TestBackup):
         self.assertEqual(self.columns_long, columns)
         self.assertItemsEqual(self.data_long, list(data))
 
+    def test_backup_list_long_volume_names(self):
+        volumes = volume_fakes.FakeVolume.create_volumes(count=2)
+        backups = [
+            volume_fakes.FakeBackup.create_one_backup(
+                attrs={'volume_id': v.id})
+            for v in (volumes[0], volumes[1], volumes[0])
+        ]
+        self.backups_mock.list.return_value = backups
+        self.volumes_mock.get.side_effect = {v.id: v for v in volumes}.get
+
+        arglist = ['--long']
+        verifylist = [('long', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            [volumes[0].name, volumes[1].name, volumes[0].name],
+            [row[6].human_readable() for row in data])
+        # Only the volumes of the backups are looked up, once
+        self.volumes_mock.list.assert_not_called()
+        self.assertEqual(2, self.volumes_mock.get.call_count)
+
 
 class TestBackupRestore(TestBackup):
 
@@ -0,0 +1,205 @@
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+from unittest import mock
+from unittest.mock import call
+
+from cinderclient import exceptions as cinder_exceptions
+from osc_lib import exceptions
+
+from openstackclient.tests.unit.volume.v2 import fakes as volume_fakes
+from openstackclient.volume.v2 import volume_snapshot
+
+
+class TestVolumeSnapshot(volume_fakes.TestVolume):
+
+    def setUp(self):
+        super(TestVolumeSnapshot, self).setUp()
+
+        self.snapshots_mock = self.app.client_manager.volume.volume_snapshots
+        self.snapshots_mock.reset_mock()
+        self.volumes_mock = self.app.client_manager.volume.volumes
+        self.volumes_mock.reset_mock()
+
+
+class TestVolumeSnapshotCreate(TestVolumeSnapshot):
+
+    def setUp(self):
+        super(TestVolumeSnapshotCreate, self).setUp()
+
+        self.volume = volume_fakes.FakeVolume.create_one_volume()
+        self.new_snapshot = volume_fakes.FakeSnapshot.create_one_snapshot(
+            attrs={'volume_id': self.volume.id, 'status': 'creating'})
+        self.volumes_mock.get.return_value = self.volume
+        self.snapshots_mock.create.return_value = self.new_snapshot
+
+        # Get the command object to test
+        self.cmd = volume_snapshot.CreateVolumeSnapshot(self.app, None)
+
+    def test_snapshot_create(self):
+        arglist = [
+            "--volume", self.volume.id,
+            self.new_snapshot.name,
+        ]
+        verifylist = [
+            ("volume", self.volume.id),
+            ("snapshot_name", self.new_snapshot.name),
+            ("wait", False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.snapshots_mock.create.assert_called_with(
+            self.volume.id,
+            force=False,
+            name=self.new_snapshot.name,
+            description=None,
+            metadata=None,
+        )
+        self.snapshots_mock.get.assert_not_called()
+        self.assertIn('status', columns)
+        self.assertIn('creating', data)
+
+    def test_snapshot_create_wait(self):
+        available = volume_fakes.FakeSnapshot.create_one_snapshot(
+            attrs={'id': self.new_snapshot.id, 'status': 'available'})
+        self.snapshots_mock.get.return_value = available
+        arglist = [
+            "--volume", self.volume.id,
+            "--wait",
+            "--wait-timeout", "60",
+            self.new_snapshot.name,
+        ]
+        verifylist = [
+            ("wait", True),
+            ("wait_timeout", 60),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.snapshots_mock.get.assert_called_once_with(self.new_snapshot.id)
+        self.assertIn('available', data)
+
+    def test_snapshot_create_wait_error(self):
+        self.snapshots_mock.get.return_value = (
+            volume_fakes.FakeSnapshot.create_one_snapshot(
+                attrs={'id': self.new_snapshot.id, 'status': 'error'}))
+        arglist = [
+            "--volume", self.volume.id,
+            "--wait",
+            self.new_snapshot.name,
+        ]
+        verifylist = [
+            ("wait", True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual(
+            'Snapshot %s did not become available: error'
+            % self.new_snapshot.id,
+            str(e))
+
+
+class TestVolumeSnapshotDelete(TestVolumeSnapshot):
+
+    def setUp(self):
+        super(TestVolumeSnapshotDelete, self).setUp()
+
+        self.snapshots = volume_fakes.FakeSnapshot.create_snapshots(count=3)
+        self.snapshots_by_id = {s.id: s for s in self.snapshots}
+        self.snapshots_mock.get.side_effect = self._get_snapshot
+        self.snapshots_mock.delete.return_value = None
+
+        # Get the command object to test
+        self.cmd = volume_snapshot.DeleteVolumeSnapshot(self.app, None)
+
+    def _get_snapshot(self, snapshot_id):
+        try:
+            return self.snapshots_by_id[snapshot_id]
+        except KeyError:
+            raise cinder_exceptions.NotFound(404)
+
+    def test_snapshot_delete_multiple(self):
+        arglist = [s.id for s in self.snapshots] + ['--concurrency', '3']
+        verifylist = [
+            ("snapshots", [s.id for s in self.snapshots]),
+            ("concurrency", 3),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        self.snapshots_mock.delete.assert_has_calls(
+            [call(s.id, False) for s in self.snapshots], any_order=True)
+        self.assertIsNone(result)
+
+    def test_snapshot_delete_multiple_with_exception(self):
+        arglist = [self.snapshots[0].id, 'unexist_snapshot']
+        verifylist = [
+            ("snapshots", arglist),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        with mock.patch.object(volume_snapshot.utils, 'find_resource',
+                               side_effect=[self.snapshots[0],
+                                            exceptions.CommandError]):
+            e = self.assertRaises(exceptions.CommandError,
+                                  self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 2 snapshots failed to delete.', str(e))
+        self.snapshots_mock.delete.assert_called_once_with(
+            self.snapshots[0].id, False)
+
+    def test_snapshot_delete_wait(self):
+        def _delete(snapshot_id, force):
+            del self.snapshots_by_id[snapshot_id]
+        self.snapshots_mock.delete.side_effect = _delete
+        arglist = [
+            '--wait',
+            '--force',
+        ] + [s.id for s in self.snapshots]
+        verifylist = [
+            ('wait', True),
+            ('force', True),
+            ("snapshots", [s.id for s in self.snapshots]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        result = self.cmd.take_action(parsed_args)
+
+        self.snapshots_mock.delete.assert_has_calls(
+            [call(s.id, True) for s in self.snapshots], any_order=True)
+        # every snapshot is found, then polled once until it is gone
+        self.assertEqual(6, self.snapshots_mock.get.call_count)
+        self.assertIsNone(result)
+
+    def test_snapshot_delete_wait_error_deleting(self):
+        failed = volume_fakes.FakeSnapshot.create_one_snapshot(
+            attrs={'id': self.snapshots[0].id, 'status': 'error_deleting'})
+        self.snapshots_mock.get.side_effect = [self.snapshots[0], failed]
+        arglist = [
+            '--wait',
+            self.snapshots[0].id,
+        ]
+        verifylist = [
+            ('wait', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
+        self.assertEqual('1 of 1 snapshots failed to delete.', str(e))
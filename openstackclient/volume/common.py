@@ -0,0 +1,205 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Helpers shared by the volume commands"""
+
+import itertools
+import logging
+
+from cinderclient import exceptions as cinder_exceptions
+
+from openstackclient.common import parallel
+from openstackclient.common import waiter
+
+
+LOG = logging.getLogger(__name__)
+
+# Number of volumes whose attached servers are looked up at once
+ATTACHMENT_PAGE_SIZE = 100
+
+# Above this many volumes to look up, listing the volumes is assumed to be
+# cheaper than fetching them one at a time
+VOLUME_LIST_THRESHOLD = 200
+# The listing stops after this many volumes per volume to look up, so that
+# clouds with many more volumes than those are not listed entirely
+VOLUME_LIST_RATIO = 2
+
+# Volumes looked up so far by this process, None for the IDs not found
+_volume_cache = {}
+
+# Final status of volumes, snapshots and backups which failed to be
+# created or restored
+ERROR_STATUS = ('error', 'error_restoring', 'error_extending')
+# Final status of volumes, snapshots and backups which failed to be deleted
+DELETE_ERROR_STATUS = ('error_deleting',)
+
+
+def iter_with_attached_servers(
+    compute_client, volumes, server_cache,
+    concurrency=parallel.DEFAULT_CONCURRENCY,
+):
+    """Yield volumes, looking up the servers they are attached to on the way
+
+    Volumes are processed by pages. Before a page is yielded, the servers
+    its volumes are attached to and which are not in ``server_cache`` yet
+    are fetched concurrently and added to it, so only the servers actually
+    displayed are looked up. Servers which cannot be found are skipped.
+
+    :param volumes: an iterable of volumes
+    :param server_cache: a dict mapping server IDs to servers, updated
+        in place
+    :returns: a generator of the volumes
+    """
+    volumes = iter(volumes)
+    while True:
+        page = list(itertools.islice(volumes, ATTACHMENT_PAGE_SIZE))
+        if not page:
+            return
+
+        server_ids = set()
+        for volume in page:
+            for attachment in getattr(volume, 'attachments', None) or []:
+                server_id = attachment.get('server_id')
+                if server_id and server_id not in server_cache:
+                    server_ids.add(server_id)
+
+        for server_id, server, e in parallel.run(
+            lambda server_id: compute_client.servers.get(server_id),
+            server_ids,
+            concurrency=concurrency,
+        ):
+            if e:
+                # Just display the server ID
+                LOG.debug('Unable to look up server %s: %s', server_id, e)
+            else:
+                server_cache[server_id] = server
+
+        for volume in page:
+            yield volume
+
+
+def find_volumes(
+    volume_client, volume_ids, all_projects=False,
+    concurrency=parallel.DEFAULT_CONCURRENCY,
+):
+    """Look up volumes by ID
+
+    Volumes are remembered for the life of the process, so each of them is
+    looked up once. When many volumes are not known yet, the volumes are
+    listed, up to a few times as many as are looked up: this covers all the
+    volumes of most clouds. The volumes still unknown are then fetched
+    concurrently. Volumes which cannot be found are skipped.
+
+    :param volume_ids: an iterable of volume IDs, possibly with duplicates
+    :param all_projects: whether the volumes may belong to other projects,
+        for the full listing
+    :returns: a dict mapping the IDs of the volumes found to the volumes
+    """
+    volume_ids = set(filter(None, volume_ids))
+    missing = volume_ids.difference(_volume_cache)
+
+    if len(missing) > VOLUME_LIST_THRESHOLD:
+        limit = len(missing) * VOLUME_LIST_RATIO
+        try:
+            volumes = volume_client.volumes.list(
+                search_opts={'all_tenants': all_projects}, limit=limit,
+            )
+        except Exception as e:
+            LOG.debug('Unable to list volumes: %s', e)
+        else:
+            for volume in volumes:
+                _volume_cache[volume.id] = volume
+            if len(volumes) < limit:
+                # every volume was listed, the others do not exist
+                for volume_id in missing.difference(_volume_cache):
+                    _volume_cache[volume_id] = None
+        missing.difference_update(_volume_cache)
+
+    for volume_id, volume, e in parallel.run(
+        lambda volume_id: volume_client.volumes.get(volume_id),
+        missing,
+        concurrency=concurrency,
+    ):
+        if e:
+            LOG.debug('Unable to look up volume %s: %s', volume_id, e)
+        _volume_cache[volume_id] = volume
+
+    return {
+        volume_id: _volume_cache[volume_id] for volume_id in volume_ids
+        if _volume_cache[volume_id] is not None
+    }
+
+
+def iter_with_volumes(volume_client, items, volume_cache, all_projects=False):
+    """Yield snapshots or backups, looking up their volumes first
+
+    The volumes the items refer to are looked up with :func:`find_volumes`
+    and added to ``volume_cache`` when the first item is requested.
+
+    :param items: an iterable of resources with a ``volume_id`` attribute
+    :param volume_cache: a dict mapping volume IDs to volumes, updated in
+        place
+    :returns: a generator of the items
+    """
+    items = list(items)
+    volume_cache.update(find_volumes(
+        volume_client,
+        (getattr(item, 'volume_id', None) for item in items),
+        all_projects=all_projects,
+    ))
+    for item in items:
+        yield item
+
+
+def fetch_resources(manager, concurrency=parallel.DEFAULT_CONCURRENCY):
+    """Build a waiter fetch function for volumes, snapshots or backups
+
+    The Block Storage API cannot list resources by ID, so every pending
+    resource is fetched, concurrently.
+
+    :param manager: the client manager of the resources, such as
+        ``volume_client.volumes``
+    """
+    return waiter.fetch_each(
+        manager.get, cinder_exceptions.NotFound, concurrency=concurrency)
+
+
+def wait_for_resources(manager, res_ids, delete=False, **kwargs):
+    """Wait for volumes, snapshots or backups to be ready or deleted
+
+    All resources are polled together by one :class:`StatusWaiter`.
+
+    :param manager: the client manager of the resources
+    :param res_ids: the IDs of the resources to wait for
+    :param delete: wait for the resources to be deleted instead of
+        available
+    :param kwargs: further arguments for the waiter, such as the ones of
+        :func:`openstackclient.common.waiter.get_wait_kwargs`
+    :returns: the waiter, whose ``failed`` attribute maps the ID of every
+        resource which failed to a reason
+    """
+    if delete:
+        status_waiter = waiter.DeleteWaiter(
+            fetch_resources(manager),
+            error_status=DELETE_ERROR_STATUS,
+            **kwargs
+        )
+    else:
+        status_waiter = waiter.StatusWaiter(
+            fetch_resources(manager),
+            success_status=('available',),
+            error_status=ERROR_STATUS,
+            **kwargs
+        )
+    status_waiter.wait(res_ids)
+    return status_waiter
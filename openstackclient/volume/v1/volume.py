@@ -27,6 +27,7 @@ from osc_lib import exceptions
 from osc_lib import utils
 
 from openstackclient.i18n import _
+from openstackclient.volume import common as volume_common
 
 
 LOG = logging.getLogger(__name__)
@@ -378,14 +379,8 @@ class ListVolume(command.Lister):
                 'Attached to',
             )
 
-        # Cache the server list
+        # Filled with the servers the listed volumes are attached to
         server_cache = {}
-        try:
-            for s in compute_client.servers.list():
-                server_cache[s.id] = s
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
         AttachmentsColumnWithCache = functools.partial(
             AttachmentsColumn, server_cache=server_cache)
 
@@ -399,6 +394,8 @@ class ListVolume(command.Lister):
             search_opts=search_opts,
             limit=parsed_args.limit,
         )
+        data = volume_common.iter_with_attached_servers(
+            compute_client, data, server_cache)
         column_headers = utils.backward_compat_col_lister(
             column_headers, parsed_args.columns, {'Display Name': 'Name'})
 
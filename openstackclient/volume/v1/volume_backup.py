@@ -25,6 +25,7 @@ from osc_lib import exceptions
 from osc_lib import utils
 
 from openstackclient.i18n import _
+from openstackclient.volume import common as volume_common
 
 
 LOG = logging.getLogger(__name__)
@@ -186,14 +187,8 @@ class ListVolumeBackup(command.Lister):
             columns = ['ID', 'Name', 'Description', 'Status', 'Size']
             column_headers = columns
 
-        # Cache the volume list
+        # Filled with the volumes of the listed items, if displayed
         volume_cache = {}
-        try:
-            for s in volume_client.volumes.list():
-                volume_cache[s.id] = s
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
         VolumeIdColumnWithCache = functools.partial(VolumeIdColumn,
                                                     volume_cache=volume_cache)
 
@@ -211,6 +206,10 @@ class ListVolumeBackup(command.Lister):
             search_opts=search_opts,
         )
 
+        if parsed_args.long:
+            data = volume_common.iter_with_volumes(
+                volume_client, data, volume_cache,
+                all_projects=parsed_args.all_projects)
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
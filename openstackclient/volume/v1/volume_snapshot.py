@@ -27,6 +27,7 @@ from osc_lib import exceptions
 from osc_lib import utils
 
 from openstackclient.i18n import _
+from openstackclient.volume import common as volume_common
 
 
 LOG = logging.getLogger(__name__)
@@ -205,14 +206,8 @@ class ListVolumeSnapshot(command.Lister):
         column_headers[1] = 'Name'
         column_headers[2] = 'Description'
 
-        # Cache the volume list
+        # Filled with the volumes of the listed items, if displayed
         volume_cache = {}
-        try:
-            for s in volume_client.volumes.list():
-                volume_cache[s.id] = s
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
         VolumeIdColumnWithCache = functools.partial(VolumeIdColumn,
                                                     volume_cache=volume_cache)
 
@@ -230,6 +225,10 @@ class ListVolumeSnapshot(command.Lister):
 
         data = volume_client.volume_snapshots.list(
             search_opts=search_opts)
+        if parsed_args.long:
+            data = volume_common.iter_with_volumes(
+                volume_client, data, volume_cache,
+                all_projects=parsed_args.all_projects)
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
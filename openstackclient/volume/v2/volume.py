@@ -26,8 +26,11 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 from openstackclient.identity import common as identity_common
+from openstackclient.volume import common as volume_common
 
 
 LOG = logging.getLogger(__name__)
@@ -86,7 +89,9 @@ class CreateVolume(command.ShowOne):
         parser.add_argument(
             "name",
             metavar="<name>",
-            help=_("Volume name"),
+            help=_("Volume name. With --count, '{index}' in the name is "
+                   "replaced by the number of the volume, which is appended "
+                   "to the name otherwise"),
         )
         parser.add_argument(
             "--size",
@@ -172,10 +177,36 @@ class CreateVolume(command.ShowOne):
             action="store_true",
             help=_("Set volume to read-write access mode (default)")
         )
+        parser.add_argument(
+            "--count",
+            metavar="<count>",
+            type=int,
+            default=1,
+            help=_("Number of volumes to create (default: 1). The details "
+                   "of the first volume are displayed."),
+        )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help=_("Wait for the volume(s) to be available"),
+        )
+        waiter.add_wait_options(parser)
+        parallel.add_concurrency_option(parser)
         return parser
 
+    @staticmethod
+    def _get_names(name, count):
+        if count == 1:
+            return [name]
+        if '{index}' not in name:
+            name += '-{index}'
+        return [name.replace('{index}', str(i)) for i in range(1, count + 1)]
+
     def take_action(self, parsed_args):
         _check_size_arg(parsed_args)
+        if parsed_args.count < 1:
+            msg = _("--count must be at least 1")
+            raise exceptions.CommandError(msg)
         volume_client = self.app.client_manager.volume
         image_client = self.app.client_manager.image
 
@@ -212,34 +243,76 @@ class CreateVolume(command.ShowOne):
             # snapshot size.
             size = max(size or 0, snapshot_obj.size)
 
-        volume = volume_client.volumes.create(
-            size=size,
-            snapshot_id=snapshot,
-            name=parsed_args.name,
-            description=parsed_args.description,
-            volume_type=parsed_args.type,
-            availability_zone=parsed_args.availability_zone,
-            metadata=parsed_args.property,
-            imageRef=image,
-            source_volid=source_volume,
-            consistencygroup_id=consistency_group,
-            scheduler_hints=parsed_args.hint,
-        )
+        def _create(name):
+            volume = volume_client.volumes.create(
+                size=size,
+                snapshot_id=snapshot,
+                name=name,
+                description=parsed_args.description,
+                volume_type=parsed_args.type,
+                availability_zone=parsed_args.availability_zone,
+                metadata=parsed_args.property,
+                imageRef=image,
+                source_volid=source_volume,
+                consistencygroup_id=consistency_group,
+                scheduler_hints=parsed_args.hint,
+            )
+
+            if parsed_args.bootable or parsed_args.non_bootable:
+                try:
+                    volume_client.volumes.set_bootable(
+                        volume.id, parsed_args.bootable)
+                except Exception as e:
+                    LOG.error(_("Failed to set volume bootable property: "
+                                "%s"), e)
+            if parsed_args.read_only or parsed_args.read_write:
+                try:
+                    volume_client.volumes.update_readonly_flag(
+                        volume.id,
+                        parsed_args.read_only)
+                except Exception as e:
+                    LOG.error(_("Failed to set volume read-only access "
+                                "mode flag: %s"), e)
+            return volume
+
+        names = self._get_names(parsed_args.name, parsed_args.count)
+        if len(names) == 1:
+            volumes = [_create(names[0])]
+        else:
+            volumes = []
+            for name, volume, e in parallel.run(
+                _create, names,
+                concurrency=parsed_args.concurrency, ordered=True,
+            ):
+                if e:
+                    LOG.error(_("Failed to create volume %(name)s: %(e)s"),
+                              {'name': name, 'e': e})
+                else:
+                    self.app.stderr.write(
+                        _("Created volume %(name)s (%(id)s)\n") %
+                        {'name': name, 'id': volume.id})
+                    volumes.append(volume)
+        failures = len(names) - len(volumes)
+
+        if parsed_args.wait and volumes:
+            status_waiter = volume_common.wait_for_resources(
+                volume_client.volumes, [v.id for v in volumes],
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            for volume_id, reason in status_waiter.failed.items():
+                LOG.error(_("Volume %(volume)s did not become available: "
+                            "%(reason)s"),
+                          {'volume': volume_id, 'reason': reason})
+            failures += len(status_waiter.failed)
+            volumes = [
+                status_waiter.resources.get(v.id) or v for v in volumes
+            ]
 
-        if parsed_args.bootable or parsed_args.non_bootable:
-            try:
-                volume_client.volumes.set_bootable(
-                    volume.id, parsed_args.bootable)
-            except Exception as e:
-                LOG.error(_("Failed to set volume bootable property: %s"), e)
-        if parsed_args.read_only or parsed_args.read_write:
-            try:
-                volume_client.volumes.update_readonly_flag(
-                    volume.id,
-                    parsed_args.read_only)
-            except Exception as e:
-                LOG.error(_("Failed to set volume read-only access "
-                            "mode flag: %s"), e)
+        if failures:
+            msg = _("%(failures)s of %(total)s volumes failed to be "
+                    "created") % {'failures': failures, 'total': len(names)}
+            raise exceptions.CommandError(msg)
+        volume = volumes[0]
 
         # Remove key links from being displayed
         volume._info.update(
@@ -277,26 +350,51 @@ class DeleteVolume(command.Command):
             help=_("Remove any snapshots along with volume(s) "
                    "(defaults to False)")
         )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help=_("Wait for the volume(s) to be deleted"),
+        )
+        waiter.add_wait_options(parser)
+        parallel.add_concurrency_option(parser)
         return parser
 
     def take_action(self, parsed_args):
         volume_client = self.app.client_manager.volume
         result = 0
 
-        for i in parsed_args.volumes:
-            try:
-                volume_obj = utils.find_resource(
-                    volume_client.volumes, i)
-                if parsed_args.force:
-                    volume_client.volumes.force_delete(volume_obj.id)
-                else:
-                    volume_client.volumes.delete(volume_obj.id,
-                                                 cascade=parsed_args.purge)
-            except Exception as e:
+        def _delete(volume):
+            volume_obj = utils.find_resource(volume_client.volumes, volume)
+            if parsed_args.force:
+                volume_client.volumes.force_delete(volume_obj.id)
+            else:
+                volume_client.volumes.delete(volume_obj.id,
+                                             cascade=parsed_args.purge)
+            return volume_obj
+
+        deleted = []
+        for i, volume_obj, e in parallel.run(
+            _delete, parsed_args.volumes,
+            concurrency=parsed_args.concurrency, ordered=True,
+        ):
+            if e:
                 result += 1
                 LOG.error(_("Failed to delete volume with "
                             "name or ID '%(volume)s': %(e)s"),
                           {'volume': i, 'e': e})
+            else:
+                deleted.append(volume_obj.id)
+
+        if parsed_args.wait and deleted:
+            status_waiter = volume_common.wait_for_resources(
+                volume_client.volumes, deleted, delete=True,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            for volume_id, reason in status_waiter.failed.items():
+                result += 1
+                LOG.error(_("Failed to delete volume %(volume)s: "
+                            "%(reason)s"),
+                          {'volume': volume_id, 'reason': reason})
 
         if result > 0:
             total = len(parsed_args.volumes)
@@ -390,14 +488,8 @@ class ListVolume(command.Lister):
             column_headers = copy.deepcopy(columns)
             column_headers[4] = 'Attached to'
 
-        # Cache the server list
+        # Filled with the servers the listed volumes are attached to
         server_cache = {}
-        try:
-            for s in compute_client.servers.list():
-                server_cache[s.id] = s
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
         AttachmentsColumnWithCache = functools.partial(
             AttachmentsColumn, server_cache=server_cache)
 
@@ -430,6 +522,8 @@ class ListVolume(command.Lister):
             marker=parsed_args.marker,
             limit=parsed_args.limit,
         )
+        data = volume_common.iter_with_attached_servers(
+            compute_client, data, server_cache)
         column_headers = utils.backward_compat_col_lister(
             column_headers, parsed_args.columns, {'Display Name': 'Name'})
 
@@ -24,7 +24,10 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
+from openstackclient.common import waiter
 from openstackclient.i18n import _
+from openstackclient.volume import common as volume_common
 
 
 LOG = logging.getLogger(__name__)
@@ -99,6 +102,12 @@ class CreateVolumeBackup(command.ShowOne):
             default=False,
             help=_("Perform an incremental backup")
         )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help=_("Wait for the backup to be available"),
+        )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -118,6 +127,19 @@ class CreateVolumeBackup(command.ShowOne):
             incremental=parsed_args.incremental,
             snapshot_id=snapshot_id,
         )
+        if parsed_args.wait:
+            status_waiter = volume_common.wait_for_resources(
+                volume_client.backups, [backup.id],
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            if status_waiter.failed:
+                msg = _("Backup %(backup)s did not become available: "
+                        "%(reason)s") % {
+                    'backup': backup.id,
+                    'reason': status_waiter.failed[backup.id],
+                }
+                raise exceptions.CommandError(msg)
+            backup = status_waiter.resources[backup.id]
         backup._info.pop("links", None)
         return zip(*sorted(backup._info.items()))
 
@@ -139,22 +161,48 @@ class DeleteVolumeBackup(command.Command):
             default=False,
             help=_("Allow delete in state other than error or available")
         )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help=_("Wait for the backup(s) to be deleted"),
+        )
+        waiter.add_wait_options(parser)
+        parallel.add_concurrency_option(parser)
         return parser
 
     def take_action(self, parsed_args):
         volume_client = self.app.client_manager.volume
         result = 0
 
-        for i in parsed_args.backups:
-            try:
-                backup_id = utils.find_resource(
-                    volume_client.backups, i).id
-                volume_client.backups.delete(backup_id, parsed_args.force)
-            except Exception as e:
+        def _delete(backup):
+            backup_id = utils.find_resource(
+                volume_client.backups, backup).id
+            volume_client.backups.delete(backup_id, parsed_args.force)
+            return backup_id
+
+        deleted = []
+        for i, backup_id, e in parallel.run(
+            _delete, parsed_args.backups,
+            concurrency=parsed_args.concurrency, ordered=True,
+        ):
+            if e:
                 result += 1
                 LOG.error(_("Failed to delete backup with "
                             "name or ID '%(backup)s': %(e)s")
                           % {'backup': i, 'e': e})
+            else:
+                deleted.append(backup_id)
+
+        if parsed_args.wait and deleted:
+            status_waiter = volume_common.wait_for_resources(
+                volume_client.backups, deleted, delete=True,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            for backup_id, reason in status_waiter.failed.items():
+                result += 1
+                LOG.error(_("Failed to delete backup %(backup)s: "
+                            "%(reason)s")
+                          % {'backup': backup_id, 'reason': reason})
 
         if result > 0:
             total = len(parsed_args.backups)
@@ -226,14 +274,8 @@ class ListVolumeBackup(command.Lister):
             columns = ['ID', 'Name', 'Description', 'Status', 'Size']
             column_headers = columns
 
-        # Cache the volume list
+        # Filled with the volumes of the listed items, if displayed
         volume_cache = {}
-        try:
-            for s in volume_client.volumes.list():
-                volume_cache[s.id] = s
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
         _VolumeIdColumn = functools.partial(VolumeIdColumn,
                                             volume_cache=volume_cache)
 
@@ -257,6 +299,10 @@ class ListVolumeBackup(command.Lister):
             limit=parsed_args.limit,
         )
 
+        if parsed_args.long:
+            data = volume_common.iter_with_volumes(
+                volume_client, data, volume_cache,
+                all_projects=parsed_args.all_projects)
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
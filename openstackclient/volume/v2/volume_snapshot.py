@@ -25,8 +25,11 @@ from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from openstackclient.common import parallel
+from openstackclient.common import waiter
 from openstackclient.i18n import _
 from openstackclient.identity import common as identity_common
+from openstackclient.volume import common as volume_common
 
 
 LOG = logging.getLogger(__name__)
@@ -103,6 +106,12 @@ class CreateVolumeSnapshot(command.ShowOne):
                    "attributes) e.g.: '--remote-source source-name=test_name "
                    "--remote-source source-id=test_id'"),
         )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help=_("Wait for the snapshot to be available"),
+        )
+        waiter.add_wait_options(parser)
         return parser
 
     def take_action(self, parsed_args):
@@ -135,6 +144,19 @@ class CreateVolumeSnapshot(command.ShowOne):
                 description=parsed_args.description,
                 metadata=parsed_args.property,
             )
+        if parsed_args.wait:
+            status_waiter = volume_common.wait_for_resources(
+                volume_client.volume_snapshots, [snapshot.id],
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            if status_waiter.failed:
+                msg = _("Snapshot %(snapshot)s did not become available: "
+                        "%(reason)s") % {
+                    'snapshot': snapshot.id,
+                    'reason': status_waiter.failed[snapshot.id],
+                }
+                raise exceptions.CommandError(msg)
+            snapshot = status_waiter.resources[snapshot.id]
         snapshot._info.update(
             {'properties':
              format_columns.DictColumn(snapshot._info.pop('metadata'))}
@@ -159,23 +181,49 @@ class DeleteVolumeSnapshot(command.Command):
             help=_("Attempt forced removal of snapshot(s), "
                    "regardless of state (defaults to False)")
         )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help=_("Wait for the snapshot(s) to be deleted"),
+        )
+        waiter.add_wait_options(parser)
+        parallel.add_concurrency_option(parser)
         return parser
 
     def take_action(self, parsed_args):
         volume_client = self.app.client_manager.volume
         result = 0
 
-        for i in parsed_args.snapshots:
-            try:
-                snapshot_id = utils.find_resource(
-                    volume_client.volume_snapshots, i).id
-                volume_client.volume_snapshots.delete(
-                    snapshot_id, parsed_args.force)
-            except Exception as e:
+        def _delete(snapshot):
+            snapshot_id = utils.find_resource(
+                volume_client.volume_snapshots, snapshot).id
+            volume_client.volume_snapshots.delete(
+                snapshot_id, parsed_args.force)
+            return snapshot_id
+
+        deleted = []
+        for i, snapshot_id, e in parallel.run(
+            _delete, parsed_args.snapshots,
+            concurrency=parsed_args.concurrency, ordered=True,
+        ):
+            if e:
                 result += 1
                 LOG.error(_("Failed to delete snapshot with "
                             "name or ID '%(snapshot)s': %(e)s")
                           % {'snapshot': i, 'e': e})
+            else:
+                deleted.append(snapshot_id)
+
+        if parsed_args.wait and deleted:
+            status_waiter = volume_common.wait_for_resources(
+                volume_client.volume_snapshots, deleted, delete=True,
+                **waiter.get_wait_kwargs(parsed_args)
+            )
+            for snapshot_id, reason in status_waiter.failed.items():
+                result += 1
+                LOG.error(_("Failed to delete snapshot %(snapshot)s: "
+                            "%(reason)s")
+                          % {'snapshot': snapshot_id, 'reason': reason})
 
         if result > 0:
             total = len(parsed_args.snapshots)
@@ -256,14 +304,8 @@ class ListVolumeSnapshot(command.Lister):
             columns = ['ID', 'Name', 'Description', 'Status', 'Size']
             column_headers = copy.deepcopy(columns)
 
-        # Cache the volume list
+        # Filled with the volumes of the listed items, if displayed
         volume_cache = {}
-        try:
-            for s in volume_client.volumes.list():
-                volume_cache[s.id] = s
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
         _VolumeIdColumn = functools.partial(VolumeIdColumn,
                                             volume_cache=volume_cache)
 
@@ -296,6 +338,10 @@ class ListVolumeSnapshot(command.Lister):
             marker=parsed_args.marker,
             limit=parsed_args.limit,
         )
+        if parsed_args.long:
+            data = volume_common.iter_with_volumes(
+                volume_client, data, volume_cache,
+                all_projects=all_projects)
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+"""Compare the client CPU cost of uploading a local file
+
+The file is PUT with requests to a local HTTP server discarding the body,
+once from a plain file object and once from the memory mapped upload body
+used by ``image create`` and ``object create``.
+
+Usage: upload-benchmark.py [--size-mb N] [--runs N] [<file>]
+"""
+
+import argparse
+import http.server
+import io
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+from openstackclient.common import upload
+
+
+class DiscardHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_PUT(self):
+        remaining = int(self.headers['Content-Length'])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(url, open_body, runs):
+    best = None
+    for _ in range(runs):
+        with open_body() as body:
+            start = time.thread_time()
+            requests.put(url, data=body).raise_for_status()
+            elapsed = time.thread_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('file', nargs='?')
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.file
+    if not path:
+        f = tempfile.NamedTemporaryFile(delete=False)
+        chunk = os.urandom(1 << 20)
+        for _ in range(args.size_mb):
+            f.write(chunk)
+        f.close()
+        path = f.name
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), DiscardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:%d/upload' % server.server_port
+
+    try:
+        gb = os.path.getsize(path) / float(1 << 30)
+        for label, open_body in (
+            ('file object', lambda: io.open(path, 'rb')),
+            ('memory map', lambda: upload.open_file(path)),
+        ):
+            cpu = measure(url, open_body, args.runs)
+            print('%-12s %.3f CPU seconds per GB' % (label, cpu / gb))
+    finally:
+        server.shutdown()
+        if not args.file:
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()